@@ -1,9 +1,10 @@
 """Admin CRUD endpoints for club news and fleet management (T10).
 
 All endpoints require admin/instructor role via `require_club_admin`.
-Data lives in Firestore subcollections: clubs/{slug}/news, clubs/{slug}/fleet.
+Data lives in Firestore subcollections: clubs/{slug}/news, clubs/{slug}/fleet,
+plus the nightly reports in clubs/{slug}/reports.
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
 
@@ -99,3 +100,19 @@ async def delete_fleet(slug: str, fleet_id: str, user: dict = Depends(require_cl
         raise HTTPException(status_code=404, detail="Aircraft not found")
     doc_ref.delete()
     return {"status": "deleted", "id": fleet_id}
+
+
+# --- Reports ---
+
+@router.get("/{slug}/reports/legality")
+async def get_legality_report(slug: str, page: int = Query(0, ge=0), user: dict = Depends(require_club_admin)):
+    """Latest nightly "who is current" report for the club, with one page of members. Requires admin."""
+    db = get_db()
+    report_ref = db.collection("clubs").document(slug).collection("reports").document("legality")
+    doc = report_ref.get()
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="No legality report yet; the sweep runs nightly")
+    report = doc.to_dict()
+    members_doc = report_ref.collection("member_pages").document(f"{page:04d}").get()
+    members = (members_doc.to_dict() or {}).get("members", []) if members_doc.exists else []
+    return {**report, "page": page, "members": members}
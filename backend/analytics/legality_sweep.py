@@ -0,0 +1,243 @@
+"""Nightly club-wide "who is current" legality sweep.
+
+For every club, streams member profiles from Firestore in chunks and
+evaluates each pilot's 12-in-24 recency, the date it lapses and their medical
+expiry on a ProcessPoolExecutor, so thousands of pilots never tie up the API
+event loop. Fleet permit expiry is summarised alongside.
+
+Each club gets a summary document at clubs/{slug}/reports/legality (counts
+and fleet). Member rows go in pages of MEMBER_PAGE_SIZE under its
+member_pages subcollection, so a large club stays well under Firestore's
+1 MiB document limit.
+
+Every API instance runs the nightly loop, but only the one that claims the
+day's lease document (system/legality_sweep) does the work.
+"""
+import asyncio
+import os
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import get_context
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from google.cloud.firestore import transactional
+
+from backend.db import get_db
+from backend.legality import legality_timeline
+
+SWEEP_HOUR_UTC = 2  # run nightly at 02:00 UTC
+SWEEP_CHUNK_SIZE = 250
+SWEEP_WORKERS = int(os.environ.get("LEGALITY_SWEEP_WORKERS", "2"))
+EXPIRY_WARNING_DAYS = 30
+REPORT_DOC = "legality"
+MEMBER_PAGES = "member_pages"
+MEMBER_PAGE_SIZE = 500
+LEASE_DOC = "legality_sweep"  # in the "system" collection
+LEASE_STALE_SECONDS = 3 * 3600  # a claimed run that never finished can be retaken after this
+
+
+def evaluate_members(members: List[Tuple[str, dict]], as_of: str, aircraft: str = "C42") -> List[dict]:
+    """Evaluate a chunk of (uid, profile) pairs. Runs in a worker process."""
+    results = []
+    for uid, profile in members:
+        pilot = {**profile, "logbook": profile.get("logbook") or []}
+        try:
+            timeline = legality_timeline(pilot, aircraft, [as_of])
+        except (TypeError, ValueError, KeyError) as e:
+            results.append({"uid": uid, "legal": False, "reason": f"Unreadable profile: {e}"})
+            continue
+        verdict = timeline["verdicts"][0]
+        results.append({
+            "uid": uid,
+            "name": profile.get("display_name") or profile.get("email"),
+            "legal": verdict["legal"],
+            "reason": verdict["reason"],
+            "lapses_on": timeline["lapses_on"],
+            "medical_expiry": _iso(profile.get("medical_expiry")),
+        })
+    return results
+
+
+def _iso(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _expiry_status(expiry: Optional[str], today: date) -> str:
+    if not expiry:
+        return "unknown"
+    expiry_day = datetime.fromisoformat(expiry).date() if isinstance(expiry, str) else expiry.date()
+    if expiry_day < today:
+        return "expired"
+    if expiry_day <= today + timedelta(days=EXPIRY_WARNING_DAYS):
+        return "expiring"
+    return "ok"
+
+
+def _member_chunks(slug: str, size: int) -> Iterator[List[Tuple[str, dict]]]:
+    """Stream a club's member profiles in fixed-size chunks."""
+    docs = get_db().collection("users").where("club_slugs", "array_contains", slug).stream()
+    while True:
+        chunk = [(doc.id, doc.to_dict()) for doc in islice(docs, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fleet_permits(slug: str, today: date) -> List[dict]:
+    fleet = get_db().collection("clubs").document(slug).collection("fleet").stream()
+    permits = []
+    for doc in fleet:
+        data = doc.to_dict()
+        expiry = _iso(data.get("permit_expiry"))
+        try:
+            status = _expiry_status(expiry, today)
+        except ValueError:
+            status = "unknown"
+        permits.append({
+            "id": doc.id,
+            "registration": data.get("registration"),
+            "permit_expiry": expiry,
+            "status": status,
+        })
+    return permits
+
+
+async def sweep_club(slug: str, executor: Executor, as_of: Optional[date] = None) -> dict:
+    """Evaluate every member of a club and write the report; returns the summary plus all members."""
+    loop = asyncio.get_running_loop()
+    today = as_of or datetime.utcnow().date()
+
+    # Pull chunks off Firestore in a thread and fan them out to the pool,
+    # keeping at most a couple of chunks per worker in flight
+    chunks = _member_chunks(slug, SWEEP_CHUNK_SIZE)
+    pending = set()
+    members: List[dict] = []
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        pending.add(loop.run_in_executor(executor, evaluate_members, chunk, today.isoformat()))
+        if len(pending) >= 2 * SWEEP_WORKERS:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                members.extend(future.result())
+    for future in asyncio.as_completed(pending):
+        members.extend(await future)
+
+    for member in members:
+        try:
+            member["medical_status"] = _expiry_status(member.get("medical_expiry"), today)
+        except ValueError:
+            member["medical_status"] = "unknown"
+    members.sort(key=lambda m: (m["legal"], m.get("lapses_on") or "9999-12-31"))
+
+    fleet = await asyncio.to_thread(_fleet_permits, slug, today)
+    pages = [members[i:i + MEMBER_PAGE_SIZE] for i in range(0, len(members), MEMBER_PAGE_SIZE)]
+    summary = {
+        "club_slug": slug,
+        "as_of": today.isoformat(),
+        "generated_at": datetime.utcnow(),
+        "member_count": len(members),
+        "current_count": sum(1 for m in members if m["legal"]),
+        "medical_expiring_count": sum(1 for m in members if m["medical_status"] in ("expired", "expiring")),
+        "permit_expiring_count": sum(1 for a in fleet if a["status"] in ("expired", "expiring")),
+        "member_page_size": MEMBER_PAGE_SIZE,
+        "member_page_count": len(pages),
+        "fleet": fleet,
+    }
+    await asyncio.to_thread(_write_report, slug, summary, pages)
+    return {**summary, "members": members}
+
+
+def _write_report(slug: str, summary: dict, pages: List[List[dict]]):
+    """Write member pages, drop pages left over from a larger run, then the summary."""
+    db = get_db()
+    report_ref = db.collection("clubs").document(slug).collection("reports").document(REPORT_DOC)
+    pages_ref = report_ref.collection(MEMBER_PAGES)
+    stale = [doc.reference for doc in pages_ref.stream() if not doc.id.isdigit() or int(doc.id) >= len(pages)]
+    writes = [("set", pages_ref.document(f"{i:04d}"), {"page": i, "members": page}) for i, page in enumerate(pages)]
+    writes += [("delete", ref, None) for ref in stale]
+    for i in range(0, len(writes), SWEEP_CHUNK_SIZE):
+        batch = db.batch()
+        for op, ref, data in writes[i:i + SWEEP_CHUNK_SIZE]:
+            if op == "set":
+                batch.set(ref, data)
+            else:
+                batch.delete(ref)
+        batch.commit()
+    report_ref.set(summary)
+
+
+async def run_legality_sweep(executor: Executor, as_of: Optional[date] = None) -> Dict[str, int]:
+    """Sweep every club; returns {slug: member_count}."""
+    slugs = await asyncio.to_thread(lambda: [club.id for club in get_db().collection("clubs").stream()])
+    counts = {}
+    for slug in slugs:
+        try:
+            report = await sweep_club(slug, executor, as_of)
+            counts[slug] = report["member_count"]
+        except Exception as e:
+            print(f"⚠️ Legality sweep failed for club {slug}: {e}")
+    return counts
+
+
+def _seconds_until_next_run(now: datetime) -> float:
+    next_run = now.replace(hour=SWEEP_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def _claim_sweep(run_day: str, owner: str) -> bool:
+    """Claim today's sweep; False if another instance already has it."""
+    db = get_db()
+    lease_ref = db.collection("system").document(LEASE_DOC)
+
+    @transactional
+    def _txn(transaction):
+        snapshot = lease_ref.get(transaction=transaction)
+        lease = (snapshot.to_dict() or {}) if snapshot.exists else {}
+        if lease.get("run_date") == run_day:
+            if lease.get("status") == "done":
+                return False
+            leased_at = lease.get("leased_at")
+            if isinstance(leased_at, datetime):
+                age = (datetime.utcnow() - leased_at.replace(tzinfo=None)).total_seconds()
+                if age < LEASE_STALE_SECONDS:
+                    return False
+        transaction.set(lease_ref, {"run_date": run_day, "owner": owner, "status": "running",
+                                    "leased_at": datetime.utcnow()})
+        return True
+
+    return _txn(db.transaction())
+
+
+def _finish_sweep(run_day: str, owner: str, counts: Dict[str, int]):
+    get_db().collection("system").document(LEASE_DOC).set({
+        "run_date": run_day, "owner": owner, "status": "done",
+        "finished_at": datetime.utcnow(), "clubs": len(counts), "members": sum(counts.values()),
+    })
+
+
+async def start_legality_sweep(app):
+    """Background task: run the sweep nightly at SWEEP_HOUR_UTC on whichever instance claims it."""
+    owner = f"{os.environ.get('K_REVISION', 'local')}-{uuid.uuid4().hex[:8]}"
+    while True:
+        await asyncio.sleep(_seconds_until_next_run(datetime.utcnow()))
+        run_day = datetime.utcnow().date().isoformat()
+        try:
+            if not await asyncio.to_thread(_claim_sweep, run_day, owner):
+                print("📋 Legality sweep already claimed by another instance.")
+                continue
+            print("📋 Running nightly legality sweep...")
+            # Spawned (not forked) workers don't inherit this process's gRPC Firestore channel
+            with ProcessPoolExecutor(max_workers=SWEEP_WORKERS, mp_context=get_context("spawn")) as executor:
+                counts = await run_legality_sweep(executor)
+            await asyncio.to_thread(_finish_sweep, run_day, owner, counts)
+            print(f"✅ Legality sweep complete: {len(counts)} clubs, {sum(counts.values())} members.")
+        except Exception as e:
+            print(f"⚠️ Legality sweep error: {e}")
@@ -0,0 +1,181 @@
+"""Per-instance interval index of confirmed bookings, one per aircraft.
+
+create_booking asks the index for bookings that might overlap the requested
+slot before opening a Firestore transaction. A conflict it knows about is
+rejected with a 409 after a single point read, with no transaction and no
+range query. Every write on this instance updates the index, and each
+aircraft is reloaded from Firestore every INDEX_REFRESH_SECONDS. That reload
+picks up bookings made or cancelled on other instances. It can miss bookings
+made elsewhere since its last load, so the transactional range query stays
+the source of truth and never depends on it.
+
+The index provides the early 409 and nothing else. A booking that goes
+ahead still runs the full transactional query, so the index only saves
+reads on rejected requests, and it costs reloads and candidate point reads
+on every request. booking_index_stats() counts both sides (docs_loaded +
+point_reads against early_rejects) so that trade can be measured.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+INDEX_REFRESH_SECONDS = 300
+COUNTERS = ("loads", "docs_loaded", "point_reads", "early_rejects")
+
+Interval = Tuple[datetime, datetime, str]  # (start, end, booking_id)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Firestore returns aware UTC datetimes; requests carry naive UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class AircraftIntervals:
+    """Confirmed bookings for one aircraft, sorted by start time.
+
+    The longest duration seen so far bounds how far back an overlapping
+    booking can start. An overlap query is therefore a bisect over
+    [start - max_duration, end) plus an end-time filter on the few entries
+    in that range.
+    """
+
+    __slots__ = ("_entries", "_by_id", "max_duration", "loaded_at")
+
+    def __init__(self, loaded_at: float):
+        self._entries: List[Interval] = []
+        self._by_id: Dict[str, Interval] = {}
+        self.max_duration = timedelta(0)
+        self.loaded_at = loaded_at
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, booking_id: str, start: datetime, end: datetime):
+        self.remove(booking_id)
+        entry = (_naive_utc(start), _naive_utc(end), booking_id)
+        insort(self._entries, entry)
+        self._by_id[booking_id] = entry
+        # Never shrinks on remove: a stale upper bound only widens the scan
+        self.max_duration = max(self.max_duration, entry[1] - entry[0])
+
+    def remove(self, booking_id: str):
+        entry = self._by_id.pop(booking_id, None)
+        if entry is not None:
+            del self._entries[bisect_left(self._entries, entry)]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Interval]:
+        start, end = _naive_utc(start), _naive_utc(end)
+        lo = bisect_left(self._entries, (start - self.max_duration,))
+        hi = bisect_left(self._entries, (end,))
+        return [entry for entry in self._entries[lo:hi] if entry[1] > start]
+
+
+class BookingIndex:
+    """Lazily loaded AircraftIntervals keyed by aircraft_reg."""
+
+    def __init__(self, refresh_seconds: float = INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._counters = dict.fromkeys(COUNTERS, 0)
+        self._aircraft: Dict[str, AircraftIntervals] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._aircraft.clear()
+            self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def count(self, **increments: int):
+        with self._lock:
+            for name, n in increments.items():
+                self._counters[name] += n
+
+    def _load(self, db, aircraft_reg: str, floor: datetime) -> AircraftIntervals:
+        docs = (
+            db.collection("bookings")
+            .where("aircraft_reg", "==", aircraft_reg)
+            .where("status", "==", "confirmed")
+            .where("start_time", ">=", floor)
+            .stream()
+        )
+        intervals = AircraftIntervals(loaded_at=time.monotonic())
+        loaded = 0
+        for doc in docs:
+            data = doc.to_dict()
+            start, end = data.get("start_time"), data.get("end_time")
+            if isinstance(start, datetime) and isinstance(end, datetime):
+                intervals.add(doc.id, start, end)
+            loaded += 1
+        self.count(loads=1, docs_loaded=loaded)
+        return intervals
+
+    def intervals_for(self, db, aircraft_reg: str, floor: datetime) -> AircraftIntervals:
+        with self._lock:
+            intervals = self._aircraft.get(aircraft_reg)
+            if intervals is not None and time.monotonic() - intervals.loaded_at < self.refresh_seconds:
+                return intervals
+        intervals = self._load(db, aircraft_reg, floor)
+        with self._lock:
+            self._aircraft[aircraft_reg] = intervals
+        return intervals
+
+    def record(self, aircraft_reg: str, booking_id: str, start: datetime, end: datetime):
+        """Add a confirmed booking. A no-op until the aircraft has been loaded."""
+        with self._lock:
+            intervals = self._aircraft.get(aircraft_reg)
+            if intervals is not None:
+                intervals.add(booking_id, start, end)
+
+    def forget(self, aircraft_reg: Optional[str], booking_id: str):
+        """Drop a booking that is no longer confirmed."""
+        with self._lock:
+            if aircraft_reg in self._aircraft:
+                self._aircraft[aircraft_reg].remove(booking_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "aircraft": len(self._aircraft),
+                "bookings": sum(len(i) for i in self._aircraft.values()),
+                **self._counters,
+            }
+
+
+_index = BookingIndex()
+
+
+def find_confirmed_conflict(db, aircraft_reg: str, start: datetime, end: datetime, floor: datetime) -> Optional[str]:
+    """Return the id of a confirmed booking overlapping [start, end), if the index knows one.
+
+    Each candidate is re-read with a point read before it is trusted, so a
+    stale entry can never cause a false rejection. Stale entries are dropped
+    as they are found.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    for _, _, booking_id in _index.intervals_for(db, aircraft_reg, floor).overlapping(start, end):
+        snapshot = db.collection("bookings").document(booking_id).get()
+        _index.count(point_reads=1)
+        data = snapshot.to_dict() if snapshot.exists else None
+        if data and data.get("status") == "confirmed":
+            existing_start, existing_end = data.get("start_time"), data.get("end_time")
+            if (isinstance(existing_start, datetime) and isinstance(existing_end, datetime)
+                    and _naive_utc(existing_start) < end and _naive_utc(existing_end) > start):
+                _index.count(early_rejects=1)
+                return booking_id
+        _index.forget(aircraft_reg, booking_id)
+    return None
+
+
+def record_booking(aircraft_reg: str, booking_id: str, start: datetime, end: datetime):
+    _index.record(aircraft_reg, booking_id, start, end)
+
+
+def forget_booking(aircraft_reg: Optional[str], booking_id: str):
+    _index.forget(aircraft_reg, booking_id)
+
+
+def booking_index_stats() -> dict:
+    return _index.stats()
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import asyncio
+import base64
+import json
+import time
+import uuid
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Optional
 from datetime import datetime, timedelta
 from google.cloud import firestore
 from google.cloud.firestore import transactional
+from google.cloud.firestore_v1.field_path import FieldPath
 
 from backend.auth import verify_token
 import backend.db
+from backend.booking_index import (
+    AircraftIntervals, _naive_utc, booking_index_stats, find_confirmed_conflict, record_booking, forget_booking,
+)
+from backend.legality import legal_on
+from backend.pilot_stats import admission_stats, read_pilot_stats, with_booking, stats_ref, close_booking
 from backend.integrations.calendar_sync import sync_booking_to_calendar, delete_booking_from_calendar
 
 router = APIRouter(prefix="/api/v1/bookings", tags=["bookings"])
@@ -34,31 +45,91 @@ class BookingResponse(BaseModel):
     end_time: datetime
     notes: Optional[str] = None
     status: str  # 'confirmed', 'cancelled'
+    series_id: Optional[str] = None
+
+# Hard cap on one booking's length. Overlap queries rely on it: a booking that
+# overlaps [start, end) must start after start - MAX_BOOKING_DURATION.
+MAX_BOOKING_DAYS = 14
+MAX_BOOKING_DURATION = timedelta(days=MAX_BOOKING_DAYS)
+
+
+def _overlap_floor(start: datetime, date_floor: datetime) -> datetime:
+    """Lower start_time bound for an overlap query on slots starting at start."""
+    return max(date_floor, _naive_utc(start) - MAX_BOOKING_DURATION)
 
 # --- Endpoints ---
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_LIST_DAYS = 31
+MAX_LIST_DAYS = 92
+
+_booking_list = TypeAdapter(List[BookingResponse])
+
+
+def _encode_cursor(start_time: datetime, booking_id: str) -> str:
+    payload = json.dumps({"start_time": start_time.isoformat(), "id": booking_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["start_time"]), str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/{club_slug}", response_model=List[BookingResponse])
-async def list_bookings(club_slug: str):
+async def list_bookings(
+    club_slug: str,
+    start: Optional[datetime] = Query(None, description="Window start; bookings still in progress then are included (default: 24h ago)"),
+    end: Optional[datetime] = Query(None, description=f"Latest start_time, exclusive (default: start + {DEFAULT_LIST_DAYS} days)"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+):
     """
-    List all confirmed bookings for a specific club.
+    List confirmed bookings for a specific club, ordered by start time.
     Public endpoint — no auth required (so the calendar grid can load).
+
+    Returns bookings overlapping a window of at most MAX_LIST_DAYS, including
+    ones that started before it and are still in progress. Results come in
+    pages of page_size. When more remain, the X-Next-Cursor response header
+    holds the cursor for the next page. A page may hold fewer than page_size
+    bookings (even none) while more remain.
     """
+    range_start = _naive_utc(start) if start else datetime.utcnow() - timedelta(days=1)
+    range_end = _naive_utc(end) if end else range_start + timedelta(days=DEFAULT_LIST_DAYS)
+    if range_end <= range_start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if range_end - range_start > timedelta(days=MAX_LIST_DAYS):
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_LIST_DAYS} days")
+
     db = backend.db.get_db()
-    docs = (
+    query = (
         db.collection("bookings")
         .where("club_slug", "==", club_slug)
         .where("status", "==", "confirmed")
+        .where("start_time", ">=", range_start - MAX_BOOKING_DURATION)  # in progress at range_start
+        .where("start_time", "<", range_end)
         .order_by("start_time")
-        .stream()
+        .order_by(FieldPath.document_id())  # tie-break so equal start times page cleanly
     )
-    results = []
-    for doc in docs:
-        data = doc.to_dict()
-        # Firestore timestamps → Python datetime
-        if hasattr(data.get("start_time"), "isoformat"):
-            pass  # already datetime-compatible
-        results.append(BookingResponse(id=doc.id, **data))
-    return results
+    if cursor:
+        after_start, after_id = _decode_cursor(cursor)
+        query = query.start_after({"start_time": after_start, FieldPath.document_id(): after_id})
+
+    # One extra document tells us whether another page exists
+    docs = await asyncio.to_thread(lambda: list(query.limit(page_size + 1).stream()))
+    page = docs[:page_size]
+    bookings = _booking_list.validate_python([{**doc.to_dict(), "id": doc.id} for doc in page])
+
+    headers = {}
+    if len(docs) > page_size:
+        # From the last document read, whether or not it overlaps the window
+        headers["X-Next-Cursor"] = _encode_cursor(bookings[-1].start_time, bookings[-1].id)
+    bookings = [b for b in bookings if _naive_utc(b.end_time) > range_start]
+    return Response(content=_booking_list.dump_json(bookings), media_type="application/json", headers=headers)
 
 
 @router.post("/", response_model=BookingResponse)
@@ -73,6 +144,9 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
     # --- Validation ---
     if booking.end_time <= booking.start_time:
          raise HTTPException(status_code=400, detail="End time must be after start time")
+
+    if booking.end_time - booking.start_time > MAX_BOOKING_DURATION:
+         raise HTTPException(status_code=400, detail=f"A booking is limited to {MAX_BOOKING_DAYS} days")
          
     if booking.start_time < datetime.utcnow() - timedelta(minutes=15):
          # Allow 15 min grace period for "just missed it" or clock skew
@@ -82,22 +156,31 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
     MAX_ACTIVE_BOOKINGS = 3
     CLUB_RECENCY_DAYS = 60
     
-    # 0. Get User Profile (to check for instructor role exemption)
+    # Date floor: only check bookings starting from 24h ago onwards.
+    # This prevents unbounded historical reads as the collection grows.
+    now = datetime.utcnow()
+    date_floor = now - timedelta(days=1)
+    timings = {}
+
+    # The admission reads don't depend on each other: issue them together so
+    # the request waits for the slowest one rather than the sum:
+    #   - user profile (instructor role exemption, stored legal_until)
+    #   - active/recency counters (one point read on pilot_stats)
+    #   - overlap pre-check against this instance's interval index
+    #   - club calendar_id for the post-write sync
     from backend.auth import get_user_profile
-    profile = get_user_profile(user["uid"])
+    reads_started = time.perf_counter()
+    profile, (active_count, last_flown_at), known_conflict, cal_id = await asyncio.gather(
+        _timed(timings, "profile", get_user_profile, user["uid"]),
+        _timed(timings, "pilot_stats", admission_stats, db, user["uid"], now),
+        _timed(timings, "overlap_precheck", find_confirmed_conflict,
+               db, booking.aircraft_reg, booking.start_time, booking.end_time, date_floor),
+        _timed(timings, "club", _club_calendar_id, db, booking.club_slug),
+    )
+    timings["admission_reads"] = _elapsed_ms(reads_started)
     user_role = profile.get("role", "pilot")
     
     # Constraint A: Max Active Bookings
-    # Count confirmed bookings in the future for this user
-    future_bookings = (
-        db.collection("bookings")
-        .where("pilot_uid", "==", user["uid"])
-        .where("status", "==", "confirmed")
-        .where("start_time", ">", datetime.utcnow())
-        .stream()
-    )
-    active_count = sum(1 for _ in future_bookings)
-    
     if active_count >= MAX_ACTIVE_BOOKINGS:
         raise HTTPException(
             status_code=403,
@@ -108,19 +191,9 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
     # Skip for instructors or admins
     if user_role not in ("instructor", "admin"):
         # Check for ANY confirmed booking in the last 60 days
-        cutoff_date = datetime.utcnow() - timedelta(days=CLUB_RECENCY_DAYS)
-        
-        recent_bookings = (
-            db.collection("bookings")
-            .where("pilot_uid", "==", user["uid"])
-            .where("status", "==", "confirmed")
-            .where("start_time", ">", cutoff_date)
-            .where("start_time", "<", datetime.utcnow()) # Must be in the past/completed
-            .limit(1)
-            .stream()
-        )
+        cutoff_date = now - timedelta(days=CLUB_RECENCY_DAYS)
         
-        has_recent = any(True for _ in recent_bookings)
+        has_recent = last_flown_at is not None and last_flown_at > cutoff_date
         
         # If no recent bookings found, check if they are a "New" member? 
         # For now, strict rule: Must have flown. 
@@ -133,10 +206,26 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
                 detail=f"Recency check failed. You haven't flown in {CLUB_RECENCY_DAYS} days. Please book with an instructor."
             )
 
+    # Constraint C: pilot legality on the booking date (stored legal_until)
+    # Dual flights are exempt: the instructor is pilot in command
+    if user_role not in ("instructor", "admin") and not booking.instructor_id:
+        if legal_on(profile, booking.start_time.date()) is False:
+            raise HTTPException(
+                status_code=403,
+                detail="Legality check failed. You are not current on this date. Please book with an instructor."
+            )
+
     # --- ATOMIC Overlap Check + Write (Firestore Transaction) ---
-    # Date floor: only check bookings starting from 24h ago onwards.
-    # This prevents unbounded historical reads as the collection grows.
-    date_floor = datetime.utcnow() - timedelta(days=1)
+    # Fast path: reject conflicts this instance already knows about without
+    # opening a transaction (the index verifies them with a point read)
+    if known_conflict:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Aircraft {booking.aircraft_reg} is already booked for an overlapping time slot."
+        )
+
+    # Only bookings starting within MAX_BOOKING_DURATION before ours can overlap it
+    overlap_start_floor = _overlap_floor(booking.start_time, date_floor)
 
     booking_data = {
         **booking.model_dump(),
@@ -148,6 +237,7 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
     # Pre-generate document references so the transaction can write to them
     new_booking_ref = db.collection("bookings").document()
     new_audit_ref = db.collection("booking_audit_logs").document()
+    pilot_stats_ref = stats_ref(db, user["uid"])
 
     @transactional
     def _create_booking_txn(transaction):
@@ -157,7 +247,7 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
             db.collection("bookings")
             .where("aircraft_reg", "==", booking.aircraft_reg)
             .where("status", "==", "confirmed")
-            .where("start_time", ">=", date_floor)
+            .where("start_time", ">=", overlap_start_floor)
             .where("start_time", "<", booking.end_time)
         )
         # Read inside the transaction for consistency
@@ -171,13 +261,24 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
                 if hasattr(existing_end, 'tzinfo') and existing_end.tzinfo:
                     existing_end = existing_end.replace(tzinfo=None)
                 if existing_end > booking.start_time:
+                    # Booked on another instance since our index last loaded
+                    if isinstance(data.get("start_time"), datetime):
+                        record_booking(booking.aircraft_reg, doc.id, data["start_time"], data["end_time"])
                     raise HTTPException(
                         status_code=409,
                         detail=f"Aircraft {booking.aircraft_reg} is already booked for an overlapping time slot."
                     )
 
+        # Pilot aggregates are read (all reads precede writes) and updated in the same transaction
+        txn_now = datetime.utcnow()
+        pilot_stats = read_pilot_stats(db, user["uid"], txn_now, transaction)
+
         # 2. No overlap found — write the booking atomically
         transaction.set(new_booking_ref, booking_data)
+        transaction.set(
+            pilot_stats_ref,
+            with_booking(pilot_stats, new_booking_ref.id, booking.start_time, txn_now),
+        )
 
         # 3. Truth Machine Audit Log (Snapshot Pattern) — also inside the transaction
         audit_data = {
@@ -192,7 +293,8 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
         transaction.set(new_audit_ref, audit_data)
 
     # Execute the transaction (retries automatically on contention)
-    _create_booking_txn(db.transaction())
+    await _timed(timings, "transaction", _create_booking_txn, db.transaction())
+    record_booking(booking.aircraft_reg, new_booking_ref.id, booking.start_time, booking.end_time)
 
     # 4. Build response (exclude internal fields)
     response_data = BookingResponse(id=new_booking_ref.id, **{
@@ -204,19 +306,286 @@ async def create_booking(booking: BookingRequest, user: dict = Depends(verify_to
         from backend.logger import log_event
         log_event("booking_created", {"booking_id": new_booking_ref.id, "club": booking.club_slug, "aircraft": booking.aircraft_reg, "pilot": user["uid"]})
         
-        # Get club calendar_id
-        club_doc = db.collection("clubs").document(booking.club_slug).get()
-        cal_id = "primary"
-        if club_doc.exists:
-            cal_id = club_doc.to_dict().get("calendar_id", "primary")
-            
+        calendar_started = time.perf_counter()
         await sync_booking_to_calendar(response_data.model_dump(), cal_id)
+        timings["calendar_sync"] = _elapsed_ms(calendar_started)
     except Exception as e:
         print(f"⚠️ Calendar sync failed (non-blocking): {e}")
 
+    from backend.logger import log_event
+    log_event("booking_create_timing", {"booking_id": new_booking_ref.id, "ms": timings,
+                                        "booking_index": booking_index_stats()})
+
     return response_data
 
 
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _timed(timings: dict, phase: str, fn, *args):
+    """Run a blocking Firestore call off the event loop, recording its duration."""
+    started = time.perf_counter()
+    try:
+        return await asyncio.to_thread(fn, *args)
+    finally:
+        timings[phase] = _elapsed_ms(started)
+
+
+def _club_calendar_id(db, club_slug: str) -> str:
+    try:
+        club_doc = db.collection("clubs").document(club_slug).get()
+        if club_doc.exists:
+            return club_doc.to_dict().get("calendar_id", "primary")
+    except Exception as e:
+        print(f"⚠️ Club calendar lookup failed (non-blocking): {e}")
+    return "primary"
+
+
+# --- Recurring / bulk bookings ---
+
+# Two writes per occurrence (booking + audit log) keep a whole series inside
+# one transaction, under Firestore's 500-write limit
+MAX_SERIES_OCCURRENCES = 200
+
+class RecurrenceRule(BaseModel):
+    freq: str  # 'daily' or 'weekly'
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    by_weekday: Optional[List[int]] = None  # 0=Mon … 6=Sun, weekly only
+
+class SeriesSlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class BookingSeriesRequest(BaseModel):
+    club_slug: str
+    aircraft_reg: str
+    instructor_id: Optional[str] = None
+    notes: Optional[str] = None
+    # Either a first slot plus a recurrence rule...
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    recurrence: Optional[RecurrenceRule] = None
+    # ...or an explicit list of slots
+    slots: Optional[List[SeriesSlot]] = None
+
+class SeriesConflict(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    conflicts_with: Optional[str] = None  # existing booking id; None for a clash within the series
+    reason: str
+
+class BookingSeriesResponse(BaseModel):
+    series_id: str
+    created: List[BookingResponse]
+    conflicts: List[SeriesConflict]
+
+
+def expand_recurrence(start: datetime, end: datetime, rule: RecurrenceRule, limit: int = MAX_SERIES_OCCURRENCES):
+    """Expand a first slot and a rule into (start, end) occurrences, at most limit + 1 of them."""
+    if rule.freq not in ("daily", "weekly"):
+        raise HTTPException(status_code=400, detail="recurrence.freq must be 'daily' or 'weekly'")
+    if rule.interval < 1:
+        raise HTTPException(status_code=400, detail="recurrence.interval must be at least 1")
+    if rule.count is None and rule.until is None:
+        raise HTTPException(status_code=400, detail="recurrence needs a count or an until date")
+    if rule.by_weekday and (rule.freq != "weekly" or any(d not in range(7) for d in rule.by_weekday)):
+        raise HTTPException(status_code=400, detail="recurrence.by_weekday takes weekdays 0-6 with weekly freq")
+
+    duration = end - start
+    wanted = min(rule.count if rule.count is not None else limit + 1, limit + 1)
+    if rule.freq == "daily":
+        step, offsets = timedelta(days=rule.interval), [timedelta(0)]
+    else:
+        # Offsets from the first slot's week start (Monday), e.g. Tue/Thu lessons
+        week_start = start - timedelta(days=start.weekday())
+        step = timedelta(weeks=rule.interval)
+        offsets = [week_start + timedelta(days=d) - start for d in sorted(set(rule.by_weekday or [start.weekday()]))]
+
+    occurrences = []
+    base = start
+    while len(occurrences) < wanted:
+        for offset in offsets:
+            occ_start = base + offset
+            if occ_start < start:
+                continue
+            if rule.until is not None and occ_start > rule.until:
+                return occurrences
+            occurrences.append((occ_start, occ_start + duration))
+            if len(occurrences) >= wanted:
+                break
+        base += step
+    return occurrences
+
+
+def _series_occurrences(request: BookingSeriesRequest):
+    if request.slots is not None:
+        if request.recurrence is not None:
+            raise HTTPException(status_code=400, detail="Send either slots or a recurrence rule, not both")
+        occurrences = [(slot.start_time, slot.end_time) for slot in request.slots]
+    elif request.recurrence is not None and request.start_time and request.end_time:
+        if request.end_time <= request.start_time:
+            raise HTTPException(status_code=400, detail="End time must be after start time")
+        occurrences = expand_recurrence(request.start_time, request.end_time, request.recurrence)
+    else:
+        raise HTTPException(status_code=400, detail="Provide slots, or start_time, end_time and recurrence")
+
+    if not occurrences:
+        raise HTTPException(status_code=400, detail="The series has no occurrences")
+    if len(occurrences) > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(status_code=400, detail=f"A series is limited to {MAX_SERIES_OCCURRENCES} bookings")
+    for occ_start, occ_end in occurrences:
+        if occ_end <= occ_start:
+            raise HTTPException(status_code=400, detail="End time must be after start time")
+        if occ_end - occ_start > MAX_BOOKING_DURATION:
+            raise HTTPException(status_code=400, detail=f"A booking is limited to {MAX_BOOKING_DAYS} days")
+        if occ_start < datetime.utcnow() - timedelta(minutes=15):
+            raise HTTPException(status_code=400, detail="Cannot book slots in the past")
+    return sorted(occurrences)
+
+
+def _existing_intervals(docs) -> AircraftIntervals:
+    intervals = AircraftIntervals(loaded_at=time.monotonic())
+    for doc in docs:
+        data = doc.to_dict()
+        if isinstance(data.get("start_time"), datetime) and isinstance(data.get("end_time"), datetime):
+            intervals.add(doc.id, data["start_time"], data["end_time"])
+    return intervals
+
+
+def _partition_occurrences(occurrences, existing: AircraftIntervals):
+    """Split occurrences into (free, conflicts) against existing bookings and each other."""
+    free, conflicts = [], []
+    accepted = AircraftIntervals(loaded_at=0)
+    for occ_start, occ_end in occurrences:
+        clash = existing.overlapping(occ_start, occ_end)
+        if clash:
+            conflicts.append(SeriesConflict(start_time=occ_start, end_time=occ_end, conflicts_with=clash[0][2],
+                                            reason="Aircraft already booked"))
+        elif accepted.overlapping(occ_start, occ_end):
+            conflicts.append(SeriesConflict(start_time=occ_start, end_time=occ_end,
+                                            reason="Overlaps an earlier slot in this series"))
+        else:
+            accepted.add(str(len(free)), occ_start, occ_end)
+            free.append((occ_start, occ_end))
+    return free, conflicts
+
+
+@router.post("/series", response_model=BookingSeriesResponse)
+async def create_booking_series(request: BookingSeriesRequest, user: dict = Depends(verify_token)):
+    """
+    Create a recurring lesson series or a bulk block (e.g. maintenance) on one aircraft.
+    Instructors and admins only.
+
+    All occurrences are checked against the aircraft's bookings in one range
+    read, then written in a single transaction that re-checks the span first.
+    Occurrences that clash are skipped and reported in `conflicts`; the rest
+    are booked.
+
+    Series bookings are not added to the creator's pilot_stats: they are
+    lessons or maintenance blocks, not the creator's own flying, and would
+    otherwise use up their MAX_ACTIVE_BOOKINGS allowance.
+    """
+    db = backend.db.get_db()
+    occurrences = _series_occurrences(request)
+
+    from backend.auth import get_user_profile
+    profile = await asyncio.to_thread(get_user_profile, user["uid"])
+    if profile.get("role", "pilot") not in ("instructor", "admin"):
+        raise HTTPException(status_code=403, detail="Only instructors and admins can create booking series")
+
+    series_id = uuid.uuid4().hex
+    date_floor = datetime.utcnow() - timedelta(days=1)
+
+    def _overlap_query(first_start: datetime, last_end: datetime):
+        return (
+            db.collection("bookings")
+            .where("aircraft_reg", "==", request.aircraft_reg)
+            .where("status", "==", "confirmed")
+            .where("start_time", ">=", _overlap_floor(first_start, date_floor))
+            .where("start_time", "<", last_end)
+        )
+
+    # One sweep over the aircraft's bookings for the whole series
+    last_end = max(occ_end for _, occ_end in occurrences)
+    existing = await asyncio.to_thread(
+        lambda: _existing_intervals(_overlap_query(occurrences[0][0], last_end).stream())
+    )
+    free, conflicts = _partition_occurrences(occurrences, existing)
+
+    # Refs are generated outside the transaction so retries reuse the same ids
+    refs = [(db.collection("bookings").document(), db.collection("booking_audit_logs").document()) for _ in free]
+
+    @transactional
+    def _create_series_txn(transaction):
+        """Re-check the series' span and write its bookings and audit logs."""
+        free_end = max(occ_end for _, occ_end in free)
+        current = _existing_intervals(_overlap_query(free[0][0], free_end).get(transaction=transaction))
+        now = datetime.utcnow()
+
+        written, clashed = [], []
+        for (occ_start, occ_end), (booking_ref, audit_ref) in zip(free, refs):
+            clash = current.overlapping(occ_start, occ_end)
+            if clash:
+                # Booked elsewhere since the sweep
+                clashed.append(SeriesConflict(start_time=occ_start, end_time=occ_end,
+                                              conflicts_with=clash[0][2], reason="Aircraft already booked"))
+                continue
+            booking_data = {
+                "club_slug": request.club_slug,
+                "aircraft_reg": request.aircraft_reg,
+                "instructor_id": request.instructor_id,
+                "start_time": occ_start,
+                "end_time": occ_end,
+                "notes": request.notes,
+                "pilot_uid": user["uid"],
+                "status": "confirmed",
+                "series_id": series_id,
+                "created_at": now,
+            }
+            transaction.set(booking_ref, booking_data)
+            transaction.set(audit_ref, {
+                "booking_id": booking_ref.id,
+                "user_id": user["uid"],
+                "club_slug": request.club_slug,
+                "aircraft_reg": request.aircraft_reg,
+                "series_id": series_id,
+                "timestamp": now,
+            })
+            written.append(BookingResponse(id=booking_ref.id, **{
+                k: v for k, v in booking_data.items() if k != "created_at"
+            }))
+        return written, clashed
+
+    created: List[BookingResponse] = []
+    if free:
+        created, clashed = await asyncio.to_thread(_create_series_txn, db.transaction())
+        conflicts.extend(clashed)
+
+    for response in created:
+        record_booking(request.aircraft_reg, response.id, response.start_time, response.end_time)
+    conflicts.sort(key=lambda c: c.start_time)
+
+    from backend.logger import log_event
+    log_event("booking_series_created", {
+        "series_id": series_id, "club": request.club_slug, "aircraft": request.aircraft_reg,
+        "pilot": user["uid"], "created": len(created), "conflicts": len(conflicts),
+    })
+
+    # Calendar sync (stub — never fails the series)
+    if created:
+        cal_id = await asyncio.to_thread(_club_calendar_id, db, request.club_slug)
+        for response in created:
+            try:
+                await sync_booking_to_calendar(response.model_dump(), cal_id)
+            except Exception as e:
+                print(f"⚠️ Calendar sync failed for series booking {response.id} (non-blocking): {e}")
+
+    return BookingSeriesResponse(series_id=series_id, created=created, conflicts=conflicts)
+
+
 @router.put("/{booking_id}/cancel")
 async def cancel_booking(booking_id: str, user: dict = Depends(verify_token)):
     """
@@ -237,7 +606,8 @@ async def cancel_booking(booking_id: str, user: dict = Depends(verify_token)):
     if booking_data.get("pilot_uid") != user["uid"]:
         raise HTTPException(status_code=403, detail="You can only cancel your own bookings")
 
-    doc_ref.update({"status": "cancelled"})
+    close_booking(db, doc_ref, {"status": "cancelled"})
+    forget_booking(booking_data.get("aircraft_reg"), booking_id)
     
     from backend.logger import log_event
     log_event("booking_cancelled", {"booking_id": booking_id, "pilot": user["uid"]})
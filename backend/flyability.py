@@ -1,3 +1,10 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
 from backend.schemas import (
     WeatherForecast,
     PilotProfile,
@@ -6,6 +13,55 @@ from backend.schemas import (
     FlyabilityResponse
 )
 
+# --- Limits ---
+
+# Club defaults (Microlight focus)
+DEFAULT_MAX_WIND_KT = 20.0
+DEFAULT_MAX_GUST_KT = 25.0
+NEAR_LIMIT_FRACTION = 0.8  # within 20% of the wind limit is CHECK
+MIN_CLOUD_BASE_FT = 1000
+MARGINAL_CLOUD_BASE_FT = 1500.0  # Standard circuit height + margin
+MIN_VIS_M = 3000
+MARGINAL_VIS_M = 5000.0  # VFR minimums often 5km
+
+
+@dataclass(frozen=True, slots=True)
+class FlyabilityEnvelope:
+    """Limits for one pilot/aircraft pair, compiled once and reused for every slot.
+
+    Hashable, so it can key result caches.
+    """
+    max_wind_kt: float
+    near_wind_kt: float
+    max_gust_kt: float
+    min_cloud_ft: float
+    marginal_cloud_ft: float
+    min_vis_m: float
+    marginal_vis_m: float
+
+
+def compile_envelope(pilot: PilotProfile, aircraft: Optional[AircraftProfile] = None) -> FlyabilityEnvelope:
+    """Envelope for a pilot/aircraft pair, memoized on the profile fields that set limits."""
+    return _compile_envelope(pilot.max_wind_kt)
+
+
+@lru_cache(maxsize=1024)
+def _compile_envelope(pilot_max_wind_kt: Optional[float]) -> FlyabilityEnvelope:
+    max_wind = DEFAULT_MAX_WIND_KT
+    # Use pilot personal minima if stricter (or if they exist)
+    if pilot_max_wind_kt:
+        max_wind = min(max_wind, pilot_max_wind_kt)
+    return FlyabilityEnvelope(
+        max_wind_kt=max_wind,
+        near_wind_kt=max_wind * NEAR_LIMIT_FRACTION,
+        max_gust_kt=DEFAULT_MAX_GUST_KT,
+        min_cloud_ft=MIN_CLOUD_BASE_FT,
+        marginal_cloud_ft=MARGINAL_CLOUD_BASE_FT,
+        min_vis_m=MIN_VIS_M,
+        marginal_vis_m=MARGINAL_VIS_M,
+    )
+
+
 # --- Core Logic ---
 
 def compute_flyability(
@@ -18,57 +74,54 @@ def compute_flyability(
     Pure function to determine flyability status based on deterministic rules.
     NO ML/Black-box logic allowed.
     """
+    return evaluate_flyability(compile_envelope(pilot, aircraft), forecast, runway_surface)
+
+
+def evaluate_flyability(
+    envelope: FlyabilityEnvelope,
+    forecast: WeatherForecast,
+    runway_surface: SurfaceCondition
+) -> FlyabilityResponse:
+    """compute_flyability against a precompiled envelope."""
     reasons = []
     score = 100
     status = "GO"
 
     # --- 1. Wind Checks ---
-    # Default limits (Microlight focus)
-    LIMIT_WIND_KT = 20.0
-    LIMIT_GUST_KT = 25.0
-    
-    # Use pilot personal minima if stricter (or if they exist)
-    if pilot.max_wind_kt:
-        LIMIT_WIND_KT = min(LIMIT_WIND_KT, pilot.max_wind_kt)
-
-    if forecast.wind_speed_kt > LIMIT_WIND_KT:
+    if forecast.wind_speed_kt > envelope.max_wind_kt:
         status = "NO_GO"
-        reasons.append(f"Wind speed {forecast.wind_speed_kt}kt exceeds limit ({LIMIT_WIND_KT}kt).")
+        reasons.append(f"Wind speed {forecast.wind_speed_kt}kt exceeds limit ({envelope.max_wind_kt}kt).")
         score -= 50
-    elif forecast.wind_speed_kt > (LIMIT_WIND_KT * 0.8): # Within 20% of limit
+    elif forecast.wind_speed_kt > envelope.near_wind_kt:
         if status != "NO_GO": status = "CHECK"
         reasons.append(f"Wind speed {forecast.wind_speed_kt}kt is near limit.")
         score -= 20
 
-    if forecast.gust_speed_kt > LIMIT_GUST_KT:
+    if forecast.gust_speed_kt > envelope.max_gust_kt:
         status = "NO_GO"
-        reasons.append(f"Gusts {forecast.gust_speed_kt}kt exceed limit ({LIMIT_GUST_KT}kt).")
+        reasons.append(f"Gusts {forecast.gust_speed_kt}kt exceed limit ({envelope.max_gust_kt}kt).")
         score -= 50
-    
+
     # --- 2. Cloud Base Checks ---
-    LIMIT_CLOUD_BASE_FT = 1500.0 # Standard circuit height + margin
-    
-    if forecast.cloud_base_ft < LIMIT_CLOUD_BASE_FT:
-        if forecast.cloud_base_ft < 1000:
+    if forecast.cloud_base_ft < envelope.marginal_cloud_ft:
+        if forecast.cloud_base_ft < envelope.min_cloud_ft:
             status = "NO_GO"
-            reasons.append(f"Cloud base {forecast.cloud_base_ft}ft is below absolute min (1000ft).")
+            reasons.append(f"Cloud base {forecast.cloud_base_ft}ft is below absolute min ({envelope.min_cloud_ft}ft).")
             score = 0
         else:
             if status != "NO_GO": status = "CHECK"
-            reasons.append(f"Cloud base {forecast.cloud_base_ft}ft is marginal (<{LIMIT_CLOUD_BASE_FT}ft).")
+            reasons.append(f"Cloud base {forecast.cloud_base_ft}ft is marginal (<{envelope.marginal_cloud_ft}ft).")
             score -= 30
 
     # --- 3. Visibility Checks ---
-    LIMIT_VIS_M = 5000.0 # VFR minimums often 5km
-    
-    if forecast.visibility_m < LIMIT_VIS_M:
-         if forecast.visibility_m < 3000:
+    if forecast.visibility_m < envelope.marginal_vis_m:
+         if forecast.visibility_m < envelope.min_vis_m:
             status = "NO_GO"
-            reasons.append(f"Visibility {forecast.visibility_m}m is below safe min (3000m).")
+            reasons.append(f"Visibility {forecast.visibility_m}m is below safe min ({envelope.min_vis_m}m).")
             score = 0
          else:
             if status != "NO_GO": status = "CHECK"
-            reasons.append(f"Visibility {forecast.visibility_m}m is marginal (<{LIMIT_VIS_M}m).")
+            reasons.append(f"Visibility {forecast.visibility_m}m is marginal (<{envelope.marginal_vis_m}m).")
             score -= 30
 
     # --- 4. Surface Checks ---
@@ -93,3 +146,203 @@ def compute_flyability(
         score=score,
         reasons=reasons
     )
+
+
+# --- Window search ---
+
+def find_flyable_windows(
+    periods: Iterable[Tuple[datetime, datetime, WeatherForecast]],
+    envelope: FlyabilityEnvelope,
+    runway_surface: SurfaceCondition,
+    min_duration: timedelta,
+    limit: int,
+) -> List[Tuple[datetime, datetime]]:
+    """Earliest `limit` GO windows lasting at least min_duration.
+
+    periods are consecutive (start, end, forecast) spans of constant weather,
+    e.g. SiteWeather.iter_periods(). Adjacent GO periods are merged into one
+    window. The search stops pulling periods as soon as enough windows are found.
+    """
+    windows = []
+    current = None  # [start, end] of the GO window being extended
+    for start, end, forecast in periods:
+        is_go = evaluate_flyability(envelope, forecast, runway_surface).status == "GO"
+        if is_go and current is not None and start == current[1]:
+            current[1] = end
+            continue
+        if current is not None and current[1] - current[0] >= min_duration:
+            windows.append((current[0], current[1]))
+            if len(windows) >= limit:
+                return windows
+        current = [start, end] if is_go else None
+
+    if current is not None and current[1] - current[0] >= min_duration:
+        windows.append((current[0], current[1]))
+    return windows
+
+
+# --- Batch (vectorized) evaluation ---
+#
+# compute_flyability_batch applies exactly the rules above to whole columns of
+# forecasts at once. Status is an int code, reasons a bitmask; text is only
+# produced when a result is turned back into a FlyabilityResponse.
+
+STATUS_GO, STATUS_CHECK, STATUS_NO_GO = 0, 1, 2
+STATUS_NAMES = ("GO", "CHECK", "NO_GO")
+
+REASON_WIND_OVER = 1 << 0
+REASON_WIND_NEAR = 1 << 1
+REASON_GUST_OVER = 1 << 2
+REASON_CLOUD_MIN = 1 << 3
+REASON_CLOUD_MARGINAL = 1 << 4
+REASON_VIS_MIN = 1 << 5
+REASON_VIS_MARGINAL = 1 << 6
+REASON_SURFACE_ICE = 1 << 7
+REASON_SURFACE_SOFT = 1 << 8
+
+SURFACE_CODES = {surface: code for code, surface in enumerate(SurfaceCondition)}
+_SURFACE_ICE = SURFACE_CODES[SurfaceCondition.ICE]
+_SURFACE_SOFT = SURFACE_CODES[SurfaceCondition.SOFT]
+
+
+def forecast_columns(forecasts: List[WeatherForecast]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(wind, gust, cloud, vis) float arrays for a list of forecasts."""
+    data = np.array(
+        [(f.wind_speed_kt, f.gust_speed_kt, f.cloud_base_ft, f.visibility_m) for f in forecasts],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def surface_codes(surfaces) -> np.ndarray:
+    """Int codes (SURFACE_CODES) for a SurfaceCondition or a sequence of them."""
+    if isinstance(surfaces, SurfaceCondition):
+        return np.array(SURFACE_CODES[surfaces], dtype=np.int8)
+    return np.array([SURFACE_CODES[SurfaceCondition(s)] for s in surfaces], dtype=np.int8)
+
+
+class FlyabilityBatch:
+    """Results of compute_flyability_batch, in the (broadcast) shape of the inputs."""
+
+    __slots__ = ("status", "score", "reasons", "_wind", "_gust", "_cloud", "_vis", "_envelope")
+
+    def __init__(self, status, score, reasons, wind, gust, cloud, vis, envelope):
+        self.status = status
+        self.score = score
+        self.reasons = reasons
+        self._wind = wind
+        self._gust = gust
+        self._cloud = cloud
+        self._vis = vis
+        self._envelope = envelope
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.status.shape
+
+    def reason_text(self, index) -> List[str]:
+        return describe_reasons(
+            int(self.reasons[index]),
+            float(self._wind[index]),
+            float(self._gust[index]),
+            float(self._cloud[index]),
+            float(self._vis[index]),
+            self._envelope,
+        )
+
+    def response(self, index) -> FlyabilityResponse:
+        return FlyabilityResponse(
+            status=STATUS_NAMES[int(self.status[index])],
+            score=int(self.score[index]),
+            reasons=self.reason_text(index),
+        )
+
+
+def compute_flyability_batch(
+    wind_kt,
+    gust_kt,
+    cloud_base_ft,
+    visibility_m,
+    surface,
+    envelope: FlyabilityEnvelope,
+) -> FlyabilityBatch:
+    """Vectorized evaluate_flyability over columns of forecasts.
+
+    Inputs are array-likes that broadcast together (e.g. a fleet x time grid);
+    surface holds SURFACE_CODES. Gives the same status, score and reasons as
+    calling evaluate_flyability on each element.
+    """
+    wind, gust, cloud, vis, surface = np.broadcast_arrays(
+        np.asarray(wind_kt, dtype=np.float64),
+        np.asarray(gust_kt, dtype=np.float64),
+        np.asarray(cloud_base_ft, dtype=np.float64),
+        np.asarray(visibility_m, dtype=np.float64),
+        np.asarray(surface, dtype=np.int8),
+    )
+
+    wind_over = wind > envelope.max_wind_kt
+    wind_near = ~wind_over & (wind > envelope.near_wind_kt)
+    gust_over = gust > envelope.max_gust_kt
+    cloud_min = cloud < envelope.min_cloud_ft
+    cloud_marginal = ~cloud_min & (cloud < envelope.marginal_cloud_ft)
+    vis_min = vis < envelope.min_vis_m
+    vis_marginal = ~vis_min & (vis < envelope.marginal_vis_m)
+    ice = surface == _SURFACE_ICE
+    soft = surface == _SURFACE_SOFT
+
+    no_go = wind_over | gust_over | cloud_min | vis_min | ice
+    check = wind_near | cloud_marginal | vis_marginal | soft
+    status = np.where(no_go, STATUS_NO_GO, np.where(check, STATUS_CHECK, STATUS_GO)).astype(np.int8)
+
+    # Same order as the scalar rules: hard minima reset the score to 0, and
+    # later penalties still apply before the final clamp.
+    score = np.full(wind.shape, 100, dtype=np.int16)
+    score -= 50 * wind_over + 20 * wind_near + 50 * gust_over
+    score = np.where(cloud_min, 0, score - 30 * cloud_marginal)
+    score = np.where(vis_min, 0, score - 30 * vis_marginal)
+    score = np.where(ice, 0, score - 10 * soft)
+    score = np.clip(score, 0, 100).astype(np.int16)
+
+    reasons = (
+        wind_over * REASON_WIND_OVER
+        | wind_near * REASON_WIND_NEAR
+        | gust_over * REASON_GUST_OVER
+        | cloud_min * REASON_CLOUD_MIN
+        | cloud_marginal * REASON_CLOUD_MARGINAL
+        | vis_min * REASON_VIS_MIN
+        | vis_marginal * REASON_VIS_MARGINAL
+        | ice * REASON_SURFACE_ICE
+        | soft * REASON_SURFACE_SOFT
+    ).astype(np.uint16)
+
+    return FlyabilityBatch(status, score, reasons, wind, gust, cloud, vis, envelope)
+
+
+def describe_reasons(mask: int, wind: float, gust: float, cloud: float, vis: float,
+                     envelope: FlyabilityEnvelope) -> List[str]:
+    """Render a reason bitmask as the same messages evaluate_flyability produces."""
+    reasons = []
+    if mask & REASON_WIND_OVER:
+        reasons.append(f"Wind speed {wind}kt exceeds limit ({envelope.max_wind_kt}kt).")
+    if mask & REASON_WIND_NEAR:
+        reasons.append(f"Wind speed {wind}kt is near limit.")
+    if mask & REASON_GUST_OVER:
+        reasons.append(f"Gusts {gust}kt exceed limit ({envelope.max_gust_kt}kt).")
+    if mask & REASON_CLOUD_MIN:
+        reasons.append(f"Cloud base {cloud}ft is below absolute min ({envelope.min_cloud_ft}ft).")
+    if mask & REASON_CLOUD_MARGINAL:
+        reasons.append(f"Cloud base {cloud}ft is marginal (<{envelope.marginal_cloud_ft}ft).")
+    if mask & REASON_VIS_MIN:
+        reasons.append(f"Visibility {vis}m is below safe min ({envelope.min_vis_m}m).")
+    if mask & REASON_VIS_MARGINAL:
+        reasons.append(f"Visibility {vis}m is marginal (<{envelope.marginal_vis_m}m).")
+    if mask & REASON_SURFACE_ICE:
+        reasons.append("Runway surface is ICE.")
+    if mask & REASON_SURFACE_SOFT:
+        reasons.append("Runway is SOFT. Check takeoff performance.")
+    if not reasons:
+        reasons.append("Conditions look good within defined limits.")
+    return reasons
@@ -109,6 +109,8 @@ async def delete_booking_from_calendar(booking_id: str, calendar_id: str):
 import asyncio
 from datetime import timedelta, timezone
 from backend.db import get_db
+from backend.booking_index import forget_booking
+from backend.pilot_stats import close_booking
 
 async def start_calendar_reconciliation(app):
     """
@@ -187,7 +189,8 @@ async def start_calendar_reconciliation(app):
                         booking_ref = db.collection("bookings").document(bid)
                         booking_data = fs_docs[bid]
                         
-                        booking_ref.update({"status": "sync_conflict"})
+                        close_booking(db, booking_ref, {"status": "sync_conflict"})
+                        forget_booking(booking_data.get("aircraft_reg"), bid)
                         log_event("calendar_sync_conflict", {"booking_id": bid, "club": club_slug})
                         
                         # Create Admin Notification
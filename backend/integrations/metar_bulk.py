@@ -0,0 +1,151 @@
+"""Bulk METAR ingestion from the AviationWeather.gov cache files.
+
+For national coverage one download of metars.cache.csv.gz per cycle is far
+cheaper than per-station API calls. The file is decompressed and parsed
+incrementally, chunk by chunk, so memory stays flat regardless of its size.
+Only stations some club references are kept.
+
+Enable in the background updater with WEATHER_BULK_INGEST=true.
+"""
+import csv
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import httpx
+
+from backend.schemas import WeatherForecast
+from backend.integrations.weather import (
+    _parse_metar_obs,
+    _get_default_forecast,
+)
+
+METARS_CACHE_URL = "https://aviationweather.gov/data/cache/metars.cache.csv.gz"
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class _GzipLineDecoder:
+    """Incrementally gunzip a byte stream and split it into text lines."""
+
+    def __init__(self):
+        self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._pending = ""
+
+    def feed(self, chunk: bytes) -> List[str]:
+        return self._split(self._inflate.decompress(chunk).decode("utf-8", errors="replace"))
+
+    def flush(self) -> List[str]:
+        lines = self._split(self._inflate.flush().decode("utf-8", errors="replace"))
+        if self._pending:
+            lines.append(self._pending)
+            self._pending = ""
+        return lines
+
+    def _split(self, text: str) -> List[str]:
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        return lines
+
+
+def iter_file_chunks(path: str, size: int = READ_CHUNK_BYTES) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class MetarCsvParser:
+    """Incremental parser for the METAR cache CSV, fed a batch of lines at a time.
+
+    The file starts with a few status lines ("No errors", "N results", ...)
+    before the header row beginning with raw_text. Only the first (latest)
+    report per wanted station is kept.
+    """
+
+    def __init__(self, wanted: Set[str]):
+        self.wanted = set(wanted)
+        self.forecasts: Dict[str, WeatherForecast] = {}
+        self._header: Optional[List[str]] = None
+
+    @property
+    def done(self) -> bool:
+        return len(self.forecasts) == len(self.wanted)
+
+    def feed(self, lines: Iterable[str]):
+        for row in csv.reader(lines):
+            if self._header is None:
+                if row and row[0] == "raw_text":
+                    self._set_header(row)
+                continue
+            if len(row) <= self._station_col:
+                continue
+            station = row[self._station_col]
+            if station in self.wanted and station not in self.forecasts:
+                self.forecasts[station] = _parse_metar_obs(self._row_to_obs(row))
+
+    def _set_header(self, header: List[str]):
+        self._header = header
+        self._station_col = header.index("station_id")
+        self._cols = {name: header.index(name) for name in ("wind_speed_kt", "wind_gust_kt", "visibility_statute_mi")}
+        # sky_cover / cloud_base_ft_agl repeat once per cloud layer
+        self._cover_cols = [i for i, name in enumerate(header) if name == "sky_cover"]
+        self._base_cols = [i for i, name in enumerate(header) if name == "cloud_base_ft_agl"]
+
+    def _row_to_obs(self, row: List[str]) -> dict:
+        """Reshape a CSV row like a JSON API observation so _parse_metar_obs can read it."""
+        def cell(i):
+            return row[i] if i < len(row) and row[i] != "" else None
+
+        clouds = []
+        for cover_i, base_i in zip(self._cover_cols, self._base_cols):
+            cover, base = cell(cover_i), cell(base_i)
+            if cover is None:
+                continue
+            clouds.append({"cover": cover, "base": base})
+
+        obs = {
+            "wspd": cell(self._cols["wind_speed_kt"]),
+            "wgst": cell(self._cols["wind_gust_kt"]),
+            "clouds": clouds,
+        }
+        visib = cell(self._cols["visibility_statute_mi"])
+        if visib is not None:
+            obs["visib"] = visib
+        return obs
+
+
+def ingest_metar_file(path: str, wanted: Set[str]) -> Dict[str, WeatherForecast]:
+    """Stream a local metars.cache.csv.gz (e.g. a downloaded copy or a test fixture)."""
+    parser = MetarCsvParser(wanted)
+    decoder = _GzipLineDecoder()
+    for chunk in iter_file_chunks(path):
+        parser.feed(decoder.feed(chunk))
+        if parser.done:
+            return parser.forecasts
+    parser.feed(decoder.flush())
+    return parser.forecasts
+
+
+async def fetch_bulk_metars(client: httpx.AsyncClient, wanted: Iterable[str]) -> Dict[str, WeatherForecast]:
+    """Download and stream-parse the national METAR cache file.
+
+    Stops reading as soon as every wanted station has been seen. Wanted
+    stations that aren't in the file get the default forecast, matching the
+    per-station fetch.
+    """
+    parser = MetarCsvParser(wanted)
+    if not parser.wanted:
+        return {}
+
+    decoder = _GzipLineDecoder()
+    async with client.stream("GET", METARS_CACHE_URL) as resp:
+        resp.raise_for_status()
+        # aiter_raw yields the .gz bytes as served; we inflate them ourselves
+        async for chunk in resp.aiter_raw():
+            parser.feed(decoder.feed(chunk))
+            if parser.done:
+                break
+        else:
+            parser.feed(decoder.flush())
+    return {icao: parser.forecasts.get(icao) or _get_default_forecast() for icao in parser.wanted}
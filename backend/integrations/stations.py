@@ -0,0 +1,166 @@
+"""Local station catalogue with an in-memory spatial index.
+
+The full AviationWeather.gov station list is pulled in bulk (one gzipped
+JSON file) once a day, persisted to local disk, and indexed in a grid of
+GRID_CELL_DEG x GRID_CELL_DEG buckets. That answers /api/v1/airport/info
+lookups without an upstream hop and lets us pick a club's nearest reporting
+station from its lat/lng instead of hand-assigning `nearest_icao`.
+"""
+import asyncio
+import gzip
+import json
+import math
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.geospatial import calculate_haversine_distance
+from backend.integrations.upstream import get_http_client
+
+STATIONS_CACHE_URL = "https://aviationweather.gov/data/cache/stations.cache.json.gz"
+STATION_CATALOGUE_PATH = os.environ.get("STATION_CATALOGUE_PATH", "/tmp/clearslot/stations.json.gz")
+CATALOGUE_REFRESH_SECONDS = 24 * 3600
+GRID_CELL_DEG = 1.0
+_EARTH_RADIUS_M = 6371000.0
+
+
+class StationCatalogue:
+    """Stations keyed by ICAO id plus a lat/lon grid for bbox and k-nearest queries."""
+
+    def __init__(self, stations: Iterable[dict]):
+        self.by_id: Dict[str, dict] = {}
+        self._grid: Dict[Tuple[int, int], List[dict]] = defaultdict(list)
+        for station in stations:
+            icao = station.get("icaoId")
+            lat, lon = station.get("lat"), station.get("lon")
+            if not icao or lat is None or lon is None:
+                continue
+            self.by_id[icao.upper()] = station
+            self._grid[self._cell(lat, lon)].append(station)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / GRID_CELL_DEG), math.floor(lon / GRID_CELL_DEG))
+
+    def lookup(self, ids: Iterable[str]) -> List[dict]:
+        return [self.by_id[i.upper()] for i in ids if i.upper() in self.by_id]
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[dict]:
+        """All stations inside the box (inclusive), scanning only overlapping cells."""
+        lat0, lon0 = self._cell(min_lat, min_lon)
+        lat1, lon1 = self._cell(max_lat, max_lon)
+        results = []
+        for cy in range(lat0, lat1 + 1):
+            for cx in range(lon0, lon1 + 1):
+                for s in self._grid.get((cy, cx), ()):
+                    if min_lat <= s["lat"] <= max_lat and min_lon <= s["lon"] <= max_lon:
+                        results.append(s)
+        return results
+
+    def nearest(self, lat: float, lon: float, k: int = 1, site_type: Optional[str] = "METAR") -> List[dict]:
+        """k nearest stations to (lat, lon), optionally only those reporting site_type.
+
+        Searches rings of grid cells outward from the query cell and stops once
+        the k-th best distance is closer than anything an unsearched ring could hold.
+        """
+        cy, cx = self._cell(lat, lon)
+        found: List[Tuple[float, dict]] = []
+        max_ring = int(180 / GRID_CELL_DEG)
+        for ring in range(max_ring + 1):
+            for dy in range(-ring, ring + 1):
+                for dx in range(-ring, ring + 1):
+                    if max(abs(dy), abs(dx)) != ring:
+                        continue
+                    for s in self._grid.get((cy + dy, cx + dx), ()):
+                        if site_type and site_type not in (s.get("siteType") or []):
+                            continue
+                        found.append((calculate_haversine_distance(lat, lon, s["lat"], s["lon"]), s))
+            if len(found) >= k:
+                found.sort(key=lambda pair: pair[0])
+                if found[k - 1][0] <= self._searched_radius_m(lat, ring):
+                    break
+        return [s for _, s in found[:k]]
+
+    @staticmethod
+    def _searched_radius_m(lat: float, ring: int) -> float:
+        """Lower bound on the distance to any cell outside `ring`.
+
+        Unsearched cells are at least `ring` cells away in latitude, or in
+        longitude; for the latter use the distance to the meridian that far away.
+        """
+        span = math.radians(ring * GRID_CELL_DEG)
+        by_lat = span * _EARTH_RADIUS_M
+        if span >= math.pi / 2:
+            return by_lat
+        by_lon = math.asin(min(1.0, math.sin(span) * math.cos(math.radians(lat)))) * _EARTH_RADIUS_M
+        return min(by_lat, by_lon)
+
+
+_catalogue: Optional[StationCatalogue] = None
+
+
+def get_station_catalogue() -> Optional[StationCatalogue]:
+    """Return the loaded catalogue, reading the local copy on first use if present."""
+    global _catalogue
+    if _catalogue is None and os.path.exists(STATION_CATALOGUE_PATH):
+        try:
+            _catalogue = load_catalogue(STATION_CATALOGUE_PATH)
+        except Exception as e:
+            print(f"⚠️ Could not read station catalogue at {STATION_CATALOGUE_PATH}: {e}")
+    return _catalogue
+
+
+def set_station_catalogue(catalogue: Optional[StationCatalogue]):
+    global _catalogue
+    _catalogue = catalogue
+
+
+def load_catalogue(path: str) -> StationCatalogue:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return StationCatalogue(json.load(f))
+
+
+def save_catalogue(stations: List[dict], path: str):
+    """Persist atomically so a crash mid-write never leaves a truncated file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(stations, f)
+    os.replace(tmp_path, path)
+
+
+def nearest_icao(lat: float, lng: float) -> Optional[str]:
+    """ICAO id of the nearest METAR-reporting station, if the catalogue is loaded."""
+    catalogue = get_station_catalogue()
+    if catalogue is None:
+        return None
+    nearest = catalogue.nearest(lat, lng, k=1)
+    return nearest[0]["icaoId"] if nearest else None
+
+
+async def refresh_station_catalogue() -> int:
+    """Download the bulk station file, persist it locally and swap in a new index."""
+    resp = await get_http_client().get(STATIONS_CACHE_URL)
+    resp.raise_for_status()
+    body = resp.content
+    # Some servers mark .gz files Content-Encoding: gzip, so httpx may have inflated it already
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    stations = json.loads(body)
+    await asyncio.to_thread(save_catalogue, stations, STATION_CATALOGUE_PATH)
+    set_station_catalogue(StationCatalogue(stations))
+    return len(stations)
+
+
+async def start_station_catalogue_refresher(app):
+    """Background task: refresh the station catalogue once a day."""
+    while True:
+        try:
+            count = await refresh_station_catalogue()
+            print(f"✅ Station catalogue refreshed ({count} stations).")
+        except Exception as e:
+            print(f"⚠️ Station catalogue refresh failed: {e}")
+        await asyncio.sleep(CATALOGUE_REFRESH_SECONDS)
@@ -0,0 +1,184 @@
+"""Time-resolved forecast timeline for a site.
+
+A TAF is a base forecast plus change groups (FM, BECMG, TEMPO/PROB) that can
+overlap. ForecastTimeline.build() flattens them into sorted, contiguous,
+non-overlapping segments where each segment already holds the worst case of
+every group active during it. Lookups are then a binary search over the
+segment boundaries plus a worst-case fold over the few segments that
+overlap the requested range.
+
+Stored compactly in weather_cache/{site}.timeline as parallel columns:
+  { bounds: [n+1 epoch secs], wind: [n], gust: [n], cloud: [n], vis: [n], precip: [n] }
+"""
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.schemas import WeatherForecast
+
+FIELDS = ("wind", "gust", "cloud", "vis", "precip")
+
+# Group values: any subset of FIELDS; a missing field means "unchanged".
+Period = Tuple[int, int, Dict[str, float]]
+
+
+def to_epoch(t: datetime) -> int:
+    """Epoch seconds for t. Naive datetimes are treated as UTC."""
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return int(t.timestamp())
+
+
+def worst_case(a: Dict[str, float], b: Dict[str, float]) -> Dict[str, float]:
+    """Combine two sets of conditions, keeping the least flyable value of each."""
+    return {
+        "wind": max(a["wind"], b["wind"]),
+        "gust": max(a["gust"], b["gust"]),
+        "cloud": min(a["cloud"], b["cloud"]),
+        "vis": min(a["vis"], b["vis"]),
+        "precip": max(a["precip"], b["precip"]),
+    }
+
+
+class ForecastTimeline:
+    """Sorted contiguous forecast segments with O(log n) range lookups."""
+
+    __slots__ = ("bounds", "wind", "gust", "cloud", "vis", "precip")
+
+    def __init__(self, bounds: List[int], wind: List[float], gust: List[float],
+                 cloud: List[float], vis: List[float], precip: List[float]):
+        self.bounds = bounds
+        self.wind = wind
+        self.gust = gust
+        self.cloud = cloud
+        self.vis = vis
+        self.precip = precip
+
+    @classmethod
+    def build(
+        cls,
+        valid_from: int,
+        valid_to: int,
+        initial: Dict[str, float],
+        changes: List[Tuple[int, int, str, Dict[str, float]]],
+        temporary: List[Period],
+    ) -> "ForecastTimeline":
+        """Flatten a TAF into segments.
+
+        initial:   complete conditions at valid_from.
+        changes:   (start, end, kind, values) for FM and BECMG groups. FM replaces
+                   conditions from start; BECMG moves to the new values between
+                   start and end, so that window takes the worst of old and new.
+        temporary: (start, end, values) for TEMPO/PROB groups, overlaid worst-case.
+        """
+        changes = sorted(changes, key=lambda c: c[0])
+        points = {valid_from, valid_to}
+        for start, end, _, _ in changes:
+            points.update((start, end))
+        for start, end, _ in temporary:
+            points.update((start, end))
+        bounds = sorted(p for p in points if valid_from <= p <= valid_to)
+
+        columns = {field: [] for field in FIELDS}
+        for seg_start, seg_end in zip(bounds, bounds[1:]):
+            state = dict(initial)
+            for start, end, kind, values in changes:
+                if start > seg_start:
+                    break
+                updated = {**state, **values}
+                if kind == "BECMG" and seg_start < end:
+                    # Still transitioning: either set of conditions may apply
+                    state = worst_case(state, updated)
+                else:
+                    state = updated
+
+            conditions = state
+            for start, end, values in temporary:
+                if start <= seg_start and seg_end <= end:
+                    conditions = worst_case(conditions, {**state, **values})
+
+            for field in FIELDS:
+                columns[field].append(float(conditions[field]))
+
+        return cls(bounds, **columns)
+
+    def __len__(self) -> int:
+        return max(len(self.bounds) - 1, 0)
+
+    @property
+    def start(self) -> int:
+        return self.bounds[0]
+
+    @property
+    def end(self) -> int:
+        return self.bounds[-1]
+
+    def segment(self, i: int) -> Dict[str, float]:
+        return {field: getattr(self, field)[i] for field in FIELDS}
+
+    def lookup(self, t0: datetime, t1: datetime) -> Tuple[Optional[Dict[str, float]], bool]:
+        """Worst-case conditions over [t0, t1).
+
+        Returns (conditions, fully_covered). conditions is None when no segment
+        overlaps the range; an instant (t1 <= t0) looks up the segment holding t0.
+        """
+        if not len(self):
+            return None, False
+        lo = to_epoch(t0)
+        hi = max(to_epoch(t1), lo + 1)
+
+        i = max(bisect_right(self.bounds, lo) - 1, 0)
+        result = None
+        n = len(self)
+        while i < n and self.bounds[i] < hi:
+            if self.bounds[i + 1] > lo:
+                segment = self.segment(i)
+                result = segment if result is None else worst_case(result, segment)
+            i += 1
+
+        covered = self.bounds[0] <= lo and hi <= self.bounds[-1]
+        return result, covered
+
+    def iter_segments(self, lo: int, hi: int) -> Iterator[Tuple[int, int, Dict[str, float]]]:
+        """Yield (start, end, conditions) for segments overlapping [lo, hi), clipped to it."""
+        n = len(self)
+        i = max(bisect_right(self.bounds, lo) - 1, 0)
+        while i < n and self.bounds[i] < hi:
+            if self.bounds[i + 1] > lo:
+                yield max(lo, self.bounds[i]), min(hi, self.bounds[i + 1]), self.segment(i)
+            i += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "bounds": list(self.bounds),
+            **{field: list(getattr(self, field)) for field in FIELDS},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["ForecastTimeline"]:
+        if not data or len(data.get("bounds", [])) < 2:
+            return None
+        return cls(
+            [int(b) for b in data["bounds"]],
+            *([float(v) for v in data[field]] for field in FIELDS),
+        )
+
+
+def conditions_from_forecast(forecast: WeatherForecast) -> Dict[str, float]:
+    return {
+        "wind": forecast.wind_speed_kt,
+        "gust": forecast.gust_speed_kt,
+        "cloud": forecast.cloud_base_ft,
+        "vis": forecast.visibility_m,
+        "precip": forecast.precipitation_rate_mm_hr,
+    }
+
+
+def forecast_from_conditions(conditions: Dict[str, float]) -> WeatherForecast:
+    return WeatherForecast(
+        wind_speed_kt=conditions["wind"],
+        gust_speed_kt=conditions["gust"],
+        cloud_base_ft=conditions["cloud"],
+        visibility_m=conditions["vis"],
+        precipitation_rate_mm_hr=conditions["precip"],
+    )
@@ -0,0 +1,98 @@
+"""Shared upstream HTTP client for AviationWeather.gov.
+
+One httpx.AsyncClient per process, so the METAR/TAF/stationinfo proxies and
+the background weather updater reuse pooled keep-alive (HTTP/2) connections
+instead of paying a TCP + TLS handshake per request.
+Opened in the app's startup hook and closed on shutdown.
+
+cached_get() adds a short-TTL response cache keyed on the normalized query,
+with single-flight coalescing so concurrent identical misses share one
+upstream request.
+"""
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from backend.cache import TTLCache
+
+AVIATION_WEATHER_API = "https://aviationweather.gov/api/data"
+
+UPSTREAM_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+UPSTREAM_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared upstream client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=UPSTREAM_TIMEOUT,
+            limits=UPSTREAM_LIMITS,
+            headers={"User-Agent": "ClearSlot Backend"},
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client (idempotent)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# --- Response cache + request coalescing ---
+
+PROXY_CACHE_TTL = 60  # seconds; METARs/TAFs change on the order of 30-60 mins
+PROXY_CACHE_MAX_ENTRIES = 1024
+
+_MISSING = object()
+_response_cache = TTLCache(maxsize=PROXY_CACHE_MAX_ENTRIES, ttl=PROXY_CACHE_TTL)
+_inflight: Dict[Tuple, "asyncio.Future"] = {}
+
+
+def normalize_ids(ids: str) -> str:
+    """Canonical station list: upper-cased, de-duplicated, sorted, comma-joined."""
+    parts = {part.strip().upper() for part in ids.replace(" ", ",").split(",")}
+    return ",".join(sorted(p for p in parts if p))
+
+
+def _cache_key(path: str, params: dict, as_json: bool) -> Tuple:
+    return (path, as_json, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+
+async def cached_get(client: httpx.AsyncClient, path: str, params: dict, as_json: bool = True) -> Any:
+    """GET {AVIATION_WEATHER_API}/{path}, answering repeats from a short-TTL cache.
+
+    Only successful responses are cached. Errors (httpx.HTTPStatusError etc.)
+    propagate to every caller that was waiting on the shared request.
+    """
+    key = _cache_key(path, params, as_json)
+    cached = _response_cache.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_cache(client, key, path, params, as_json))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # Shield so one caller disconnecting doesn't cancel the request for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_cache(client: httpx.AsyncClient, key: Tuple, path: str, params: dict, as_json: bool) -> Any:
+    response = await client.get(f"{AVIATION_WEATHER_API}/{path}", params=params)
+    response.raise_for_status()
+    payload = response.json() if as_json else response.text
+    _response_cache.set(key, payload)
+    return payload
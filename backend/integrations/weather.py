@@ -2,130 +2,619 @@
 
 Provides get_forecast() which reads from a Firestore cache.
 A background worker (start_weather_updater) fetches new data every 15 mins and stores it.
+Recent Firestore reads are kept in a per-instance TTL cache so repeated slot
+evaluations for the same site don't round-trip to Firestore.
+
+Each site holds the latest METAR snapshot plus, when a TAF is available, a
+ForecastTimeline so future slots get forecast conditions rather than "now".
 """
 import os
 import time
+import json
+import hashlib
 import asyncio
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import httpx
 
 from backend.schemas import WeatherForecast
 from backend.db import get_db
+from backend.cache import TTLCache
+from backend.integrations.upstream import AVIATION_WEATHER_API, get_http_client
+from backend.integrations.stations import nearest_icao
+from backend.integrations.timeline import (
+    ForecastTimeline,
+    conditions_from_forecast,
+    forecast_from_conditions,
+    to_epoch,
+    worst_case,
+)
 
 CACHE_TTL = 900  # 15 minutes
+STALE_AFTER = 6 * CACHE_TTL  # longer than WRITE_HEARTBEAT, so unchanged-but-current docs aren't stale
+STALE_RETRY_TTL = 60
+MEMORY_CACHE_MAX_SITES = 512
+# Read METARs from the national cache file rather than per-station batches (see metar_bulk)
+BULK_METAR_INGEST = os.environ.get("WEATHER_BULK_INGEST", "false").lower() == "true"
+
+
+class SiteWeather:
+    """Cached weather for one site: METAR snapshot + optional TAF timeline."""
+
+    __slots__ = ("snapshot", "timeline", "_content_hash")
+
+    def __init__(self, snapshot: WeatherForecast, timeline: Optional[ForecastTimeline] = None):
+        self.snapshot = snapshot
+        self.timeline = timeline
+        self._content_hash = None
+
+    def forecast_for(self, t0: datetime, t1: datetime) -> WeatherForecast:
+        """Worst-case conditions over [t0, t1).
+
+        Uses the TAF timeline where it covers the range; any part it doesn't
+        cover (past the TAF's validity, or no TAF at all) falls back to the
+        current observation.
+        """
+        if self.timeline is None:
+            return self.snapshot
+        conditions, covered = self.timeline.lookup(t0, t1)
+        if conditions is None:
+            return self.snapshot
+        if not covered:
+            conditions = worst_case(conditions, conditions_from_forecast(self.snapshot))
+        return forecast_from_conditions(conditions)
+
+    def iter_periods(self, t0: datetime, t1: datetime) -> Iterator[Tuple[datetime, datetime, WeatherForecast]]:
+        """Walk [t0, t1) as consecutive (start, end, forecast) periods of constant weather.
+
+        One period per TAF segment, with the current observation before and
+        after the TAF's validity. Lazy, so callers can stop as soon as they
+        have what they need.
+        """
+        lo, hi = to_epoch(t0), to_epoch(t1)
+        if hi <= lo:
+            return
+
+        def at(epoch: int) -> datetime:
+            # Same naive/aware style as the caller's datetimes
+            return t0 + timedelta(seconds=epoch - lo)
+
+        if self.timeline is None or not len(self.timeline):
+            yield t0, t1, self.snapshot
+            return
+        if lo < self.timeline.start:
+            yield t0, at(min(hi, self.timeline.start)), self.snapshot
+        for start, end, conditions in self.timeline.iter_segments(lo, hi):
+            yield at(start), at(end), forecast_from_conditions(conditions)
+        if hi > self.timeline.end:
+            yield at(max(lo, self.timeline.end)), t1, self.snapshot
+
+    def content_hash(self) -> str:
+        """Stable hash of the parsed weather.
+
+        Used to skip no-op cache writes and as the weather version in result
+        cache keys. Computed once; SiteWeather is never mutated after creation.
+        """
+        if self._content_hash is None:
+            payload = {
+                "forecast": self.snapshot.model_dump(),
+                "timeline": self.timeline.to_dict() if self.timeline is not None else None,
+            }
+            self._content_hash = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        return self._content_hash
+
+
+# site_id -> SiteWeather, refreshed by reads and by the background updater
+_forecast_cache = TTLCache(maxsize=MEMORY_CACHE_MAX_SITES, ttl=CACHE_TTL)
+
+# Called with the ids of sites whose weather changed, after each publish
+_publish_listeners: List[Callable[[Set[str]], None]] = []
+
 
-def get_forecast(site_id: str, t0: datetime, t1: datetime, mock: Optional[bool] = None) -> WeatherForecast:
+def on_weather_published(listener: Callable[[Set[str]], None]):
+    """Register a callback for new weather snapshots (e.g. to drop derived caches)."""
+    _publish_listeners.append(listener)
+
+
+def weather_cache_stats() -> dict:
+    return _forecast_cache.stats()
+
+
+def _notify_published(site_ids: Set[str]):
+    for listener in _publish_listeners:
+        try:
+            listener(site_ids)
+        except Exception as e:
+            print(f"⚠️ Weather publish listener failed: {e}")
+
+async def get_forecast(site_id: str, t0: datetime, t1: datetime, mock: Optional[bool] = None) -> WeatherForecast:
     """Fetch weather forecast for a site and time range from Firestore Cache."""
+    return (await get_forecasts(site_id, [(t0, t1)], mock=mock))[0]
+
+
+async def get_forecasts(
+    site_id: str,
+    intervals: List[Tuple[datetime, datetime]],
+    mock: Optional[bool] = None,
+) -> List[WeatherForecast]:
+    """Resolve forecasts for many [t0, t1) intervals at one site in a single pass.
+
+    The site's cached weather is fetched once and every interval is answered
+    from memory (a binary search over the TAF timeline), so the cost doesn't
+    grow with the number of slots.
+    """
+    if not intervals:
+        return []
+    resolve = await get_forecast_resolver(site_id, mock=mock)
+    return [resolve(t0, t1) for t0, t1 in intervals]
+
+
+async def get_forecast_resolver(
+    site_id: str,
+    mock: Optional[bool] = None,
+) -> Callable[[datetime, datetime], WeatherForecast]:
+    """Load a site's weather once and return a (t0, t1) -> forecast lookup.
+
+    For callers that walk slots lazily (e.g. streaming responses) rather than
+    holding every interval in a list.
+    """
     if mock is None:
         mock = os.environ.get("MOCK_EXTERNAL_APIS", "true").lower() == "true"
 
     if mock:
-        return _get_mock_forecast(site_id, t0)
+        return lambda t0, t1: _get_mock_forecast(site_id, t0)
 
-    # Read strictly from Firestore Cache for <200ms latency
-    db = get_db()
-    
-    # We store the latest weather by site_id
-    doc_ref = db.collection("weather_cache").document(site_id)
-    doc = doc_ref.get()
-    
-    if doc.exists:
-        data = doc.to_dict()
-        last_updated = data.get("updated_at")
-        
+    site = await _load_site_weather(site_id)
+    return site.forecast_for
+
+
+async def get_site_weather(site_id: str, mock: Optional[bool] = None) -> SiteWeather:
+    """The site's current SiteWeather (a fixed snapshot in mock mode)."""
+    if mock is None:
+        mock = os.environ.get("MOCK_EXTERNAL_APIS", "true").lower() == "true"
+    if mock:
+        return SiteWeather(_get_mock_forecast(site_id, datetime.utcnow()))
+    return await _load_site_weather(site_id)
+
+
+async def get_weather_version(site_id: str, mock: Optional[bool] = None) -> Optional[str]:
+    """Version (content hash) of the site's current weather, or None in mock mode.
+
+    Results derived from the weather can be cached under this version; a new
+    snapshot gets a new version.
+    """
+    if mock is None:
+        mock = os.environ.get("MOCK_EXTERNAL_APIS", "true").lower() == "true"
+    if mock:
+        return None
+    return (await _load_site_weather(site_id)).content_hash()
+
+
+async def _load_site_weather(site_id: str) -> SiteWeather:
+    """Return the latest weather for a site: memory, then Firestore, then upstream.
+
+    Stale Firestore data is served immediately while a background refresh
+    runs. Only a hard miss (nothing cached anywhere) waits for upstream, and
+    concurrent misses for the same site share one refresh.
+    """
+    cached = _forecast_cache.get(site_id)
+    if cached is not None:
+        return cached
+
+    # Firestore's client is synchronous; keep the read off the event loop
+    data = await asyncio.to_thread(_read_cache_document, site_id)
+
+    if data:
         # We can still return it even if slightly stale, but ideally the background worker keeps it fresh
         forecast_data = data.get("forecast", {})
         if forecast_data:
-            return WeatherForecast(**forecast_data)
-            
-    # Fallback if cache is completely empty 
+            site = SiteWeather(
+                WeatherForecast(**forecast_data),
+                ForecastTimeline.from_dict(data.get("timeline")),
+            )
+            if _is_stale(data.get("updated_at")):
+                _refresh_site(site_id)
+                # Hold the stale copy briefly so a failing refresh isn't retried per request
+                _forecast_cache.set(site_id, site, ttl=STALE_RETRY_TTL)
+            else:
+                _forecast_cache.set(site_id, site)
+            return site
+
+    # Fallback if cache is completely empty
     print(f"⚠️ Cache miss in Firestore for {site_id}, fetching on-demand.")
-    forecast = _fetch_aviation_weather(str(site_id))
+    return await asyncio.shield(_refresh_site(site_id))
+
+
+def _read_cache_document(site_id: str) -> Optional[dict]:
+    # Read strictly from Firestore Cache for <200ms latency
+    db = get_db()
     
+    # We store the latest weather by site_id
+    doc = db.collection("weather_cache").document(site_id).get()
+    return doc.to_dict() if doc.exists else None
+
+
+def _is_stale(updated_at) -> bool:
+    if not isinstance(updated_at, datetime):
+        return False
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - updated_at > timedelta(seconds=STALE_AFTER)
+
+
+# site_id -> in-flight refresh task, so concurrent misses share one upstream fetch
+_refreshes: Dict[str, "asyncio.Task"] = {}
+
+
+def _refresh_site(site_id: str) -> "asyncio.Task":
+    """Start (or join) the background refresh for one site."""
+    task = _refreshes.get(site_id)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store_site(site_id))
+        _refreshes[site_id] = task
+        task.add_done_callback(lambda _: _refreshes.pop(site_id, None))
+    return task
+
+
+async def _fetch_and_store_site(site_id: str) -> SiteWeather:
+    client = get_http_client()
+    forecasts, timelines = await asyncio.gather(
+        _fetch_aviation_weather_many(client, [site_id]),
+        _fetch_taf_timelines_many(client, [site_id]),
+    )
+    forecast = forecasts.get(site_id)
+    if forecast is None:
+        # Upstream unreachable: answer with cautious defaults but don't persist them
+        return SiteWeather(_get_default_forecast())
+
+    site = SiteWeather(forecast, timelines.get(site_id))
     # Fire and forget a write to cache so next time it's fast
-    _update_firestore_cache(site_id, forecast)
-    return forecast
+    await asyncio.to_thread(_write_forecasts, {site_id: site})
+    return site
 
 
 # --- Background Worker ---
 
+METAR_API = f"{AVIATION_WEATHER_API}/metar"
+TAF_API = f"{AVIATION_WEATHER_API}/taf"
+UPDATER_BATCH_SIZE = 50        # stations per upstream request (comma-joined ids)
+UPDATER_CONCURRENCY = 4        # upstream requests in flight at once
+FIRESTORE_BATCH_LIMIT = 500    # max writes per Firestore batch commit
+WRITE_HEARTBEAT = 4 * CACHE_TTL  # refresh updated_at on unchanged docs at most this often
+
+# site_id -> (content_hash, monotonic time of last Firestore write) for this instance
+_written_hashes: Dict[str, Tuple[str, float]] = {}
+
+
 async def start_weather_updater(app):
-    """Background task to fetch weather every 15 mins for active sites."""
+    """Background task to fetch weather every 15 mins for active sites.
+
+    Stations are requested in batches over the shared upstream client with
+    bounded concurrency, and all results are written back in batched commits, so a
+    refresh cycle costs a handful of round trips however many clubs there are.
+    """
     # This could run forever while the app is alive
     while True:
         try:
             print("☁️ Running background weather fetch for all sites...")
-            db = get_db()
-            
-            # Fetch all distinct site_ids from the active clubs
-            clubs_ref = db.collection("clubs").stream()
-            sites_to_update = set()
-            for club in clubs_ref:
-                club_data = club.to_dict()
-                icao = club_data.get("nearest_icao")
-                if icao:
-                    sites_to_update.add(icao)
-            
+            sites_to_update = await asyncio.to_thread(_collect_update_sites)
+
             if not sites_to_update:
                 print("⚠️ No icao codes found in clubs collection.")
-            
-            for site in sites_to_update:
-                try:
-                    forecast = _fetch_aviation_weather(site)
-                    _update_firestore_cache(site, forecast)
-                except Exception as site_err:
-                    print(f"⚠️ Failed to update weather for {site}: {site_err}")
-            
-            print(f"✅ Background weather fetch complete for {len(sites_to_update)} sites.")
+
+            client = get_http_client()
+            forecasts, timelines = await asyncio.gather(
+                _fetch_metars(client, sites_to_update),
+                _fetch_taf_timelines_many(client, sites_to_update),
+            )
+            sites = {
+                icao: SiteWeather(forecast, timelines.get(icao))
+                for icao, forecast in forecasts.items()
+            }
+            counts = await asyncio.to_thread(_write_forecasts, sites)
+
+            print(f"✅ Background weather fetch complete for {len(sites)}/{len(sites_to_update)} sites "
+                  f"({len(timelines)} with TAF): {counts['written']} written, "
+                  f"{counts['touched']} touched, {counts['skipped']} unchanged.")
         except Exception as e:
             print(f"⚠️ Background weather worker error: {e}")
-            
+
         await asyncio.sleep(CACHE_TTL)
-        
 
-def _update_firestore_cache(site_id: str, forecast: WeatherForecast):
-    """Save the forecast to Firestore so endpoints can read quickly."""
+
+async def _fetch_metars(client: httpx.AsyncClient, icaos) -> Dict[str, WeatherForecast]:
+    """METARs for the updater, from the bulk cache file when enabled.
+
+    Falls back to per-station batches if the bulk download fails.
+    """
+    if BULK_METAR_INGEST and icaos:
+        from backend.integrations.metar_bulk import fetch_bulk_metars
+        try:
+            return await fetch_bulk_metars(client, icaos)
+        except Exception as e:
+            print(f"⚠️ Bulk METAR ingest failed, falling back to per-station fetch: {e}")
+    return await _fetch_aviation_weather_many(client, icaos)
+
+
+def _collect_update_sites() -> Set[str]:
+    """Fetch all distinct site_ids from the active clubs.
+
+    Clubs without a hand-picked `nearest_icao` use the nearest METAR station
+    to their lat/lng from the local station catalogue.
+    """
+    db = get_db()
+    sites_to_update = set()
+    for club in db.collection("clubs").stream():
+        club_data = club.to_dict()
+        icao = club_data.get("nearest_icao")
+        if not icao and club_data.get("lat") is not None and club_data.get("lng") is not None:
+            icao = nearest_icao(club_data["lat"], club_data["lng"])
+        if icao:
+            sites_to_update.add(icao)
+    return sites_to_update
+
+
+async def _fetch_aviation_weather_many(client: httpx.AsyncClient, icaos) -> Dict[str, WeatherForecast]:
+    """Fetch METARs for many stations, UPDATER_BATCH_SIZE ids per request.
+
+    Stations missing from a successful response get the default forecast. A
+    failed batch is logged and skipped so the
+    existing cache entries for its stations are left untouched.
+    """
+    icaos = sorted(icaos)
+    batches = [icaos[i:i + UPDATER_BATCH_SIZE] for i in range(0, len(icaos), UPDATER_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(UPDATER_CONCURRENCY)
+
+    async def fetch_batch(batch: List[str]) -> Dict[str, WeatherForecast]:
+        async with semaphore:
+            try:
+                resp = await client.get(METAR_API, params={"ids": ",".join(batch), "format": "json"})
+                resp.raise_for_status()
+                data = resp.json() or []
+            except Exception as e:
+                print(f"⚠️ AviationWeather.gov batch fetch failed for {len(batch)} sites: {type(e).__name__} {e}")
+                return {}
+
+        by_station = {}
+        for obs in data:
+            station = obs.get("icaoId")
+            # Responses are newest-first; keep the latest observation per station
+            if station and station not in by_station:
+                by_station[station] = _parse_metar_obs(obs)
+        return {icao: by_station.get(icao) or _get_default_forecast() for icao in batch}
+
+    results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+    forecasts = {}
+    for batch_result in results:
+        forecasts.update(batch_result)
+    return forecasts
+
+
+async def _fetch_taf_timelines_many(client: httpx.AsyncClient, icaos) -> Dict[str, ForecastTimeline]:
+    """Fetch TAFs for many stations and flatten each into a ForecastTimeline.
+
+    Stations without a TAF (or in a failed batch) are simply absent from the
+    result; their slots fall back to the METAR snapshot.
+    """
+    icaos = sorted(icaos)
+    batches = [icaos[i:i + UPDATER_BATCH_SIZE] for i in range(0, len(icaos), UPDATER_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(UPDATER_CONCURRENCY)
+
+    async def fetch_batch(batch: List[str]) -> Dict[str, ForecastTimeline]:
+        async with semaphore:
+            try:
+                resp = await client.get(TAF_API, params={"ids": ",".join(batch), "format": "json"})
+                resp.raise_for_status()
+                data = resp.json() or []
+            except Exception as e:
+                print(f"⚠️ AviationWeather.gov TAF batch fetch failed for {len(batch)} sites: {type(e).__name__} {e}")
+                return {}
+
+        timelines = {}
+        for taf in data:
+            station = taf.get("icaoId")
+            if not station or station in timelines:
+                continue
+            try:
+                timeline = _parse_taf(taf)
+            except Exception as e:
+                print(f"⚠️ Could not parse TAF for {station}: {type(e).__name__} {e}")
+                continue
+            if timeline is not None:
+                timelines[station] = timeline
+        return timelines
+
+    results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+    timelines = {}
+    for batch_result in results:
+        timelines.update(batch_result)
+    return timelines
+
+
+def _cache_timestamps() -> dict:
+    now = datetime.now(timezone.utc)
+    return {"updated_at": now, "expires_at": now + timedelta(hours=24)}
+
+
+def _cache_document(site: SiteWeather, content_hash: Optional[str] = None) -> dict:
+    doc = {
+        **_cache_timestamps(),
+        "forecast": site.snapshot.model_dump(),
+        "content_hash": content_hash or site.content_hash(),
+    }
+    if site.timeline is not None:
+        doc["timeline"] = site.timeline.to_dict()
+    return doc
+
+
+def _seed_written_hashes(site_ids: List[str]):
+    """Adopt the hashes already stored in Firestore for sites this instance hasn't written.
+
+    Without this every cold start would rewrite every weather document. One
+    get_all round trip reads just content_hash and updated_at.
+    """
+    db = get_db()
+    refs = [db.collection("weather_cache").document(site_id) for site_id in site_ids]
     try:
-        db = get_db()
-        db.collection("weather_cache").document(site_id).set({
-            "updated_at": datetime.now(timezone.utc),
-            "expires_at": datetime.now(timezone.utc) + timedelta(hours=24),
-            "forecast": forecast.model_dump()
-        })
+        snapshots = list(db.get_all(refs, field_paths=["content_hash", "updated_at"]))
     except Exception as e:
-        print(f"⚠️ Failed to write weather cache to Firestore: {e}")
+        print(f"⚠️ Could not read stored weather hashes: {e}")
+        return
+    now = time.monotonic()
+    for snapshot in snapshots:
+        data = snapshot.to_dict() if snapshot.exists else None
+        if not data or not data.get("content_hash"):
+            continue
+        updated_at = data.get("updated_at")
+        if isinstance(updated_at, datetime):
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            age = max(0.0, (datetime.now(timezone.utc) - updated_at).total_seconds())
+        else:
+            age = WRITE_HEARTBEAT  # unknown age: touch on this cycle
+        _written_hashes[snapshot.id] = (data["content_hash"], now - age)
 
 
-def _fetch_aviation_weather(icao: str) -> WeatherForecast:
-    """Fetch and parse METAR data from AviationWeather.gov."""
-    try:
-        resp = httpx.get(
-            "https://aviationweather.gov/api/data/metar",
-            params={"ids": icao, "format": "json"},
-            timeout=5.0,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+def _write_forecasts(sites: Dict[str, SiteWeather]) -> Dict[str, int]:
+    """Save many sites' weather to Firestore in as few batch commits as possible.
 
-        if not data:
-            return _get_default_forecast()
+    Sites whose parsed weather hashes the same as the stored document are
+    skipped; once per WRITE_HEARTBEAT they get an updated_at-only touch so
+    readers can still tell the data is current. Returns per-outcome counts.
+    """
+    counts = {"written": 0, "touched": 0, "skipped": 0}
+    unseen = [site_id for site_id in sites if site_id not in _written_hashes]
+    if unseen:
+        _seed_written_hashes(unseen)
+    now = time.monotonic()
+    writes = []
+    for site_id, site in sites.items():
+        content_hash = site.content_hash()
+        previous = _written_hashes.get(site_id)
+        if previous is None or previous[0] != content_hash:
+            writes.append((site_id, site, content_hash, _cache_document(site, content_hash), "written"))
+        elif now - previous[1] >= WRITE_HEARTBEAT:
+            writes.append((site_id, site, content_hash, _cache_timestamps(), "touched"))
+        else:
+            counts["skipped"] += 1
+            # Still extend this instance's in-memory copy
+            _forecast_cache.set(site_id, site)
 
-        obs = data[0]
-        return WeatherForecast(
-            wind_speed_kt=float(obs.get("wspd", 0)),
-            gust_speed_kt=float(obs.get("wgst", 0) or 0),
-            cloud_base_ft=_extract_cloud_base(obs),
-            visibility_m=_vis_sm_to_m(obs.get("visib", 10)),
-            precipitation_rate_mm_hr=0.0,
-        )
-    except Exception as e:
-        print(f"⚠️ AviationWeather.gov fetch failed for {icao}: {type(e).__name__} {e}")
-        return _get_default_forecast()
+    if not writes:
+        return counts
+    db = get_db()
+    published = set()
+    for i in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        chunk = writes[i:i + FIRESTORE_BATCH_LIMIT]
+        try:
+            batch = db.batch()
+            for site_id, _, _, doc, outcome in chunk:
+                ref = db.collection("weather_cache").document(site_id)
+                if outcome == "touched":
+                    batch.update(ref, doc)
+                else:
+                    batch.set(ref, doc)
+            batch.commit()
+        except Exception as e:
+            print(f"⚠️ Failed to write weather cache batch to Firestore: {e}")
+            continue
+        for site_id, site, content_hash, _, outcome in chunk:
+            counts[outcome] += 1
+            _written_hashes[site_id] = (content_hash, now)
+            _forecast_cache.set(site_id, site)
+            if outcome == "written":
+                published.add(site_id)
+
+    if published:
+        _notify_published(published)
+    return counts
+
+
+def _parse_metar_obs(obs: dict) -> WeatherForecast:
+    return WeatherForecast(
+        wind_speed_kt=float(obs.get("wspd", 0) or 0),
+        gust_speed_kt=float(obs.get("wgst", 0) or 0),
+        cloud_base_ft=_extract_cloud_base(obs),
+        visibility_m=_vis_sm_to_m(obs.get("visib", 10)),
+        precipitation_rate_mm_hr=0.0,
+    )
+
+
+# --- TAF parsing ---
+
+# Rough intensity -> rate mapping for TAF weather groups (mm/hr)
+_PRECIP_RATES = {"-": 0.5, "": 2.5, "+": 8.0}
+_PRECIP_CODES = ("RA", "SN", "DZ", "GR", "GS", "PL", "SG", "UP")
+
+
+def _parse_taf(taf: dict) -> Optional[ForecastTimeline]:
+    """Turn an AviationWeather.gov TAF (JSON) into a ForecastTimeline.
+
+    The first group is the base forecast; FM and BECMG groups change it and
+    TEMPO/PROB groups are overlaid as temporary worst cases.
+    """
+    fcsts = taf.get("fcsts") or []
+    valid_from = taf.get("validTimeFrom")
+    valid_to = taf.get("validTimeTo")
+    if not fcsts or valid_from is None or valid_to is None or valid_to <= valid_from:
+        return None
+
+    defaults = conditions_from_forecast(_get_default_forecast())
+    initial = {**defaults, **_taf_group_values(fcsts[0])}
+    changes = []
+    temporary = []
+    for group in fcsts[1:]:
+        kind = (group.get("fcstChange") or "").upper()
+        start = group.get("timeFrom")
+        end = group.get("timeTo") or valid_to
+        if start is None:
+            continue
+        values = _taf_group_values(group)
+        if kind in ("TEMPO", "PROB") or group.get("probability"):
+            temporary.append((int(start), int(end), values))
+        elif kind == "BECMG":
+            changes.append((int(start), int(group.get("timeBec") or end), kind, values))
+        else:
+            # FM (or an unlabelled group): a complete new set of conditions
+            changes.append((int(start), int(end), "FM", {**defaults, **values}))
+
+    return ForecastTimeline.build(int(valid_from), int(valid_to), initial, changes, temporary)
+
+
+def _taf_group_values(group: dict) -> Dict[str, float]:
+    """Conditions stated in one TAF group; absent fields are left out."""
+    values = {}
+    if group.get("wspd") is not None:
+        values["wind"] = float(group["wspd"])
+        values["gust"] = float(group.get("wgst") or 0)
+    elif group.get("wgst") is not None:
+        values["gust"] = float(group["wgst"])
+    if group.get("visib") is not None:
+        values["vis"] = _vis_sm_to_m(group["visib"])
+    if group.get("clouds"):
+        # TAF cloud bases are reported in feet
+        ceiling = [
+            float(c["base"]) for c in group["clouds"]
+            if c.get("cover") in ("BKN", "OVC", "SCT") and c.get("base") is not None
+        ]
+        values["cloud"] = min(ceiling) if ceiling else 5000.0
+    if group.get("wxString") is not None:
+        values["precip"] = _precip_rate(group["wxString"])
+    return values
+
+
+def _precip_rate(wx: str) -> float:
+    rate = 0.0
+    for token in (wx or "").split():
+        intensity = token[0] if token[:1] in ("-", "+") else ""
+        if any(code in token for code in _PRECIP_CODES):
+            rate = max(rate, _PRECIP_RATES[intensity])
+    return rate
 
 
 def _extract_cloud_base(obs: dict) -> float:
+    # METAR and TAF cloud bases both come back from the API in feet AGL
     clouds = obs.get("clouds", [])
     for c in clouds:
         cover = c.get("cover", "")
@@ -133,7 +622,7 @@ def _extract_cloud_base(obs: dict) -> float:
             base = c.get("base")
             if base is not None:
                 try:
-                    return float(base) * 100
+                    return float(base)
                 except (TypeError, ValueError):
                     continue
     return 5000.0
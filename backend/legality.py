@@ -1,4 +1,11 @@
-from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+RECENCY_WINDOW_DAYS = 730  # 24 months back
+# No endpoint writes these yet; without them legality can't be judged
+LICENCE_FIELDS = ('licence_type', 'total_hours', 'ratings')
 
 def has_valid_licence(pilot):
     """CAA mins: NPPL(A) 32h/10 solo; PPL(A) 40h/10 solo/XC."""
@@ -30,6 +37,75 @@ def filter_logbook(pilot, start_date, end_date):
             relevant_entries.append(e)
     return relevant_entries
 
+def _entry_day(entry) -> int:
+    d = entry['date']
+    if isinstance(d, str):
+        d = datetime.fromisoformat(d)
+    return d.toordinal()
+
+
+class LogbookIndex:
+    """Sorted logbook days with running totals of PIC hours, instruction and landings.
+
+    Totals over any inclusive day range are two binary searches, so one index
+    built per pilot answers recency for as many slot dates as needed.
+    Hours are kept in integer hundredths so window sums are exact and
+    threshold checks like >= 12h can't flip on float rounding.
+    """
+
+    __slots__ = ("days", "_pic", "_instr", "_landings")
+
+    def __init__(self, logbook: Iterable[dict]):
+        rows = sorted(
+            (_entry_day(e), round(e.get('hours_pic', 0) * 100), round(e.get('instruction', 0) * 100),
+             e.get('to_landings', 0))
+            for e in logbook
+        )
+        self.days = array('l', (r[0] for r in rows))
+        self._pic = array('q', [0])
+        self._instr = array('q', [0])
+        self._landings = array('q', [0])
+        for _, pic, instr, landings in rows:
+            self._pic.append(self._pic[-1] + pic)
+            self._instr.append(self._instr[-1] + instr)
+            self._landings.append(self._landings[-1] + landings)
+
+    @classmethod
+    def for_pilot(cls, pilot) -> "LogbookIndex":
+        return cls(pilot.get('logbook', []))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def totals(self, first_day: int, last_day: int) -> Tuple[float, float, int]:
+        """(pic_hours, instruction_hours, landings) for entries on days first_day..last_day."""
+        lo = bisect_left(self.days, first_day)
+        hi = bisect_right(self.days, last_day)
+        return self._between(lo, max(lo, hi))
+
+    def recency_totals(self, slot_day: int) -> Tuple[float, float, int]:
+        """Totals over the recency window ending on slot_day (both ends inclusive)."""
+        return self.totals(slot_day - RECENCY_WINDOW_DAYS, slot_day)
+
+    def sliding_recency_totals(self, slot_days: Iterable[int]) -> Iterator[Tuple[float, float, int]]:
+        """recency_totals for ascending slot_days, moving two pointers forward instead of searching."""
+        n = len(self.days)
+        lo = hi = 0
+        for slot_day in slot_days:
+            while hi < n and self.days[hi] <= slot_day:
+                hi += 1
+            while lo < n and self.days[lo] < slot_day - RECENCY_WINDOW_DAYS:
+                lo += 1
+            yield self._between(lo, max(lo, hi))
+
+    def _between(self, lo: int, hi: int) -> Tuple[float, float, int]:
+        return (
+            (self._pic[hi] - self._pic[lo]) / 100,
+            (self._instr[hi] - self._instr[lo]) / 100,
+            self._landings[hi] - self._landings[lo],
+        )
+
+
 def is_ppl_microlight_transition(pilot):
     """BMAA: Pre-Oct 2025 PPL microlight transition to 12-in-24."""
     return pilot.get('ppl_microlight_pre_oct2025', False)
@@ -37,14 +113,28 @@ def is_ppl_microlight_transition(pilot):
 def single_seat_only(pilot):
     return pilot.get('single_seat_constraint', False)
 
-def is_slot_legal(pilot, aircraft='C42', slot_date_str=None, aircraft_details=None):
+def _parse_expiry(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def is_slot_legal(pilot, aircraft='C42', slot_date_str=None, aircraft_details=None, logbook_index=None):
+    """Legality of one slot. Pass a LogbookIndex to reuse it across many checks for the same pilot."""
     # Default to now if no date provided
     slot_date = datetime.now() if not slot_date_str else datetime.fromisoformat(slot_date_str)
-    
+
+    def recency_totals():
+        index = logbook_index if logbook_index is not None else LogbookIndex.for_pilot(pilot)
+        return index.recency_totals(slot_date.toordinal())
+
+    return _slot_verdict(pilot, aircraft, slot_date, aircraft_details, recency_totals)
+
+
+def _slot_verdict(pilot, aircraft, slot_date, aircraft_details, recency_totals: Callable[[], Tuple[float, float, int]]):
+    """The is_slot_legal rules for one date; recency_totals is only called if needed."""
     # 0. Medical Expiry Check (T12)
     medical_exp = pilot.get('medical_expiry')
     if medical_exp:
-        med_date = datetime.fromisoformat(medical_exp) if isinstance(medical_exp, str) else medical_exp
+        med_date = _parse_expiry(medical_exp)
         if slot_date > med_date:
             return {
                 'legal': False,
@@ -55,7 +145,7 @@ def is_slot_legal(pilot, aircraft='C42', slot_date_str=None, aircraft_details=No
     if aircraft_details:
         permit_exp = aircraft_details.get('permit_expiry')
         if permit_exp:
-            perm_date = datetime.fromisoformat(permit_exp) if isinstance(permit_exp, str) else permit_exp
+            perm_date = _parse_expiry(permit_exp)
             if slot_date > perm_date:
                 return {
                     'legal': False,
@@ -72,12 +162,7 @@ def is_slot_legal(pilot, aircraft='C42', slot_date_str=None, aircraft_details=No
         return {'legal': False, 'reason': 'No C42 rating/privs'}
     
     # 3. Recency Logic (12-in-24 / 5-in-13)
-    recency_start = slot_date - timedelta(days=730)  # 24 months back
-    entries = filter_logbook(pilot, recency_start, slot_date)
-    
-    total_h = sum(e.get('hours_pic', 0) for e in entries)
-    instr_h = sum(e.get('instruction', 0) for e in entries)
-    to_l = sum(e.get('to_landings', 0) for e in entries)
+    total_h, instr_h, to_l = recency_totals()
     
     # Standard 12-in-24 check (simplified for MVP as requested)
     legal_recency = (total_h >= 12 and 
@@ -91,9 +176,134 @@ def is_slot_legal(pilot, aircraft='C42', slot_date_str=None, aircraft_details=No
 
     return {
         'legal': legal_recency,
-        'expires': (slot_date - timedelta(days=730)).isoformat() if legal_recency else None,
+        'expires': (slot_date - timedelta(days=RECENCY_WINDOW_DAYS)).isoformat() if legal_recency else None,
         'total_h': total_h, 'to_l': to_l, 'instr_h': instr_h,
         'reason': 'Recency requirements not met' if not legal_recency else 'Legal',
         'needs': ['More PIC hours'] if total_h < 6 else []
     }
 
+
+def legality_timeline(pilot, aircraft='C42', dates: Iterable[str] = (), aircraft_details=None):
+    """Legality for many slot dates in one pass, plus the date legality lapses.
+
+    Dates are visited in order with a sliding 24-month window over the sorted
+    logbook, so the logbook is parsed once whatever the number of dates. Each
+    verdict is what is_slot_legal would return for that date.
+
+    lapses_on is the first day from the earliest requested date on which the
+    pilot is no longer legal, assuming no further flying. Legality can only
+    change on a breakpoint day: a logbook entry leaving the window, or the day
+    after the medical or permit expires.
+    """
+    dates = list(dates)
+    slot_dates = [datetime.fromisoformat(d) for d in dates]
+    index = LogbookIndex.for_pilot(pilot)
+
+    order = sorted(range(len(slot_dates)), key=lambda i: slot_dates[i])
+    totals = [None] * len(slot_dates)
+    window = index.sliding_recency_totals(slot_dates[i].toordinal() for i in order)
+    for i, window_totals in zip(order, window):
+        totals[i] = window_totals
+
+    verdicts = [
+        {'date': d, **_slot_verdict(pilot, aircraft, slot_date, aircraft_details, lambda t=t: t)}
+        for d, slot_date, t in zip(dates, slot_dates, totals)
+    ]
+
+    lapse = None
+    if slot_dates:
+        lapse = _first_illegal_day(pilot, aircraft, aircraft_details, index, min(slot_dates).toordinal())
+    return {
+        'verdicts': verdicts,
+        'lapses_on': date.fromordinal(lapse[0]).isoformat() if lapse else None,
+        'lapse_reason': lapse[1] if lapse else None,
+    }
+
+
+def _first_illegal_day(pilot, aircraft, aircraft_details, index: LogbookIndex, from_day: int):
+    """(day, reason) of the first illegal day >= from_day, or None if it never lapses."""
+    breakpoints = {from_day}
+    for day in index.days:
+        breakpoints.add(day + RECENCY_WINDOW_DAYS + 1)  # entry drops out of the window
+        breakpoints.add(day)  # entries logged ahead of from_day come into it
+    for expiry in (pilot.get('medical_expiry'), (aircraft_details or {}).get('permit_expiry')):
+        if expiry:
+            breakpoints.add(_parse_expiry(expiry).toordinal() + 1)
+
+    for day in sorted(b for b in breakpoints if b >= from_day):
+        verdict = _slot_verdict(pilot, aircraft, datetime.fromordinal(day), aircraft_details,
+                                lambda: index.recency_totals(day))
+        if not verdict['legal']:
+            return day, verdict['reason']
+    return None
+
+
+def has_licence_data(pilot) -> bool:
+    """Whether the profile carries the licence and rating fields is_slot_legal judges on."""
+    return all(pilot.get(field) for field in LICENCE_FIELDS)
+
+
+def derived_legality(pilot, aircraft='C42', as_of=None) -> dict:
+    """Denormalized legality fields to store on the user document.
+
+    legal_until is the last day the pilot is legal assuming no further flying
+    (None if not legal on as_of), capped at the licence expiry.
+    recency_totals are the 24-month totals as of as_of. Both only change when
+    the logbook, medical or licence dates change, so they are recomputed on
+    those writes and readers can gate on a single field.
+
+    Without licence and rating data there is nothing to judge legal_until
+    on: it is left uncomputed (legal_until_computed False) rather than None.
+    """
+    today = as_of or datetime.utcnow().date()
+    if not has_licence_data(pilot):
+        return {
+            'legal_until': None,
+            'legal_until_computed': False,
+            'recency_totals': recency_totals_on(pilot, today),
+        }
+    timeline = legality_timeline(pilot, aircraft, [today.isoformat()])
+    legal_until = None
+    if timeline['verdicts'][0]['legal']:
+        lapses_on = timeline['lapses_on']
+        legal_until = (date.fromisoformat(lapses_on) - timedelta(days=1)) if lapses_on else None
+        licence_exp = pilot.get('license_expiry')
+        if licence_exp:
+            licence_day = _parse_expiry(licence_exp).date()
+            legal_until = min(legal_until, licence_day) if legal_until else licence_day
+
+    return {
+        'legal_until': legal_until.isoformat() if legal_until else None,
+        'legal_until_computed': True,
+        'recency_totals': recency_totals_on(pilot, today),
+    }
+
+
+def recency_totals_on(pilot, day) -> dict:
+    """24-month PIC hours, instruction and landings as of day."""
+    total_h, instr_h, to_l = LogbookIndex.for_pilot(pilot).recency_totals(day.toordinal())
+    return {
+        'as_of': day.isoformat(),
+        'hours_pic': total_h,
+        'instruction': instr_h,
+        'to_landings': to_l,
+    }
+
+
+def legal_on_from_profile(profile, day) -> Optional[bool]:
+    """Gate on the stored legal_until; None if it was never computed for this profile."""
+    if not profile.get('legal_until_computed') or not has_licence_data(profile):
+        return None
+    legal_until = profile.get('legal_until')
+    return legal_until is not None and day.isoformat() <= legal_until
+
+
+def legal_on(profile, day, aircraft='C42') -> Optional[bool]:
+    """legal_on_from_profile, with the full calculation for profiles stored before legal_until.
+
+    None when there is nothing to judge from: no licence and rating data.
+    """
+    stored = legal_on_from_profile(profile, day)
+    if stored is not None or not has_licence_data(profile):
+        return stored
+    return is_slot_legal(profile, aircraft, day.isoformat())['legal']
@@ -3,21 +3,33 @@
 
 from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import httpx
+import json
 import os
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from backend.legality import is_slot_legal
-from backend.flyability import compute_flyability
+from backend.legality import is_slot_legal, legality_timeline
+from backend.flyability import (
+    compute_flyability,
+    compile_envelope,
+    evaluate_flyability,
+    find_flyable_windows,
+    compute_flyability_batch,
+    forecast_columns,
+    surface_codes,
+    STATUS_NAMES,
+)
 from backend.schemas import (
     WeatherForecast,
     PilotProfile,
     AircraftProfile,
     SurfaceCondition,
-    FlyabilityResponse
+    FlyabilityResponse,
+    LogbookEntry,
 )
 from backend.bookings import router as bookings_router
 from backend.admin import router as admin_router
@@ -37,12 +49,30 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 import asyncio
 from backend.integrations.weather import start_weather_updater
 from backend.integrations.calendar_sync import start_calendar_reconciliation
+from backend.analytics.legality_sweep import start_legality_sweep
+from backend.integrations.stations import get_station_catalogue, start_station_catalogue_refresher, nearest_icao
+from backend.integrations.upstream import (
+    AVIATION_WEATHER_API,
+    get_http_client,
+    close_http_client,
+    cached_get,
+    normalize_ids,
+)
 
 @app.on_event("startup")
 async def startup_event():
+    # Open the pooled upstream client before anything uses it
+    get_http_client()
     # Start the background tasks
     asyncio.create_task(start_weather_updater(app))
     asyncio.create_task(start_calendar_reconciliation(app))
+    asyncio.create_task(start_station_catalogue_refresher(app))
+    asyncio.create_task(start_legality_sweep(app))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_client()
 
 
 # --- Observability ---
@@ -68,12 +98,6 @@ async def log_requests(request: Request, call_next):
 app.include_router(bookings_router)
 app.include_router(admin_router)
 
-class LogbookEntry(BaseModel):
-    date: str
-    hours_pic: float
-    to_landings: int
-    instruction: float
-
 class LegalityPilotProfile(BaseModel):
     licence_type: str
     ratings: List[str]
@@ -82,6 +106,7 @@ class LegalityPilotProfile(BaseModel):
     microlight_differences_trained: Optional[bool] = False
     xc_done: Optional[bool] = False
     single_seat_constraint: Optional[bool] = False
+    medical_expiry: Optional[str] = None  # ISO date; checked when present
     logbook: List[LogbookEntry]
 
 class LegalityRequest(BaseModel):
@@ -89,6 +114,17 @@ class LegalityRequest(BaseModel):
     aircraft: str = "C42"
     date: Optional[str] = None
 
+MAX_TIMELINE_DATES = 366
+
+class LegalityTimelineRequest(BaseModel):
+    pilot: LegalityPilotProfile
+    aircraft: str = "C42"
+    # Either explicit dates, or `days` consecutive days from `start` (default today)
+    dates: Optional[List[str]] = None
+    start: Optional[str] = None
+    days: int = Field(90, ge=0, le=MAX_TIMELINE_DATES)
+    permit_expiry: Optional[str] = None  # aircraft permit, ISO date
+
 # Allow CORS for local dev and production
 origins = [
     "http://localhost:5173",    # Vite local dev
@@ -104,10 +140,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # booking list pagination
 )
 
-AVIATION_WEATHER_API = "https://aviationweather.gov/api/data"
-
 @app.get("/")
 async def root():
     return {"status": "ok", "service": "ClearSlot Backend"}
@@ -119,23 +154,18 @@ async def get_metar(request: Request, ids: str, format: str = "json", hours: int
     Proxy for METARs (Current Observations).
     Example: /api/v1/weather/metar?ids=EGLL&format=json&hours=12&taf=true
     """
-    async with httpx.AsyncClient() as client:
-        params = {"ids": ids, "format": format, "taf": str(taf).lower()}
-        if hours > 0:
-            params["hours"] = hours
-            
-        try:
-            response = await client.get(f"{AVIATION_WEATHER_API}/metar", params=params)
-            response.raise_for_status()
-            
-            if format == "json":
-                return response.json()
-            return response.text
-            
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=str(e))
+    params = {"ids": normalize_ids(ids), "format": format.lower(), "taf": str(taf).lower()}
+    if hours > 0:
+        params["hours"] = hours
+        
+    try:
+        # Identical queries within PROXY_CACHE_TTL share one upstream request
+        return await cached_get(get_http_client(), "metar", params, as_json=params["format"] == "json")
+        
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
+    except Exception as e:
+         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/weather/taf")
 @limiter.limit("30/minute")
@@ -144,53 +174,70 @@ async def get_taf(request: Request, ids: str, format: str = "json", metar: bool
     Proxy for TAFs (Forecasts).
     Example: /api/v1/weather/taf?ids=EGLL&format=json&metar=true&time=valid
     """
-    async with httpx.AsyncClient() as client:
-        params = {"ids": ids, "format": format}
-        if metar:
-            params["metar"] = str(metar).lower()
-        if time:
-            params["time"] = time
-        if date:
-            params["date"] = date
+    params = {"ids": normalize_ids(ids), "format": format.lower()}
+    if metar:
+        params["metar"] = str(metar).lower()
+    if time:
+        params["time"] = time
+    if date:
+        params["date"] = date
+    
+    try:
+        return await cached_get(get_http_client(), "taf", params, as_json=params["format"] == "json")
         
-        try:
-            response = await client.get(f"{AVIATION_WEATHER_API}/taf", params=params)
-            response.raise_for_status()
-            
-            if format == "json":
-                return response.json()
-            return response.text
-            
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=str(e))
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
+    except Exception as e:
+         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/airport/info")
 async def get_station_info(ids: str = None, bbox: str = None, format: str = "json"):
     """
     Proxy for Station Info (Lat/Lon/Elev).
     Example: /api/v1/airport/info?ids=EGLL&format=json
+
+    JSON lookups are answered from the local station catalogue when it is
+    loaded; ids the catalogue doesn't know, other formats (or a cold
+    instance) go upstream.
     """
-    async with httpx.AsyncClient() as client:
-        params = {"format": format}
+    catalogue = get_station_catalogue()
+    if catalogue is not None and format == "json" and (ids or bbox):
         if ids:
-            params["ids"] = ids
-        if bbox:
-            params["bbox"] = bbox
-        
+            wanted = normalize_ids(ids).split(",")
+            found = catalogue.lookup(wanted)
+            known = {s["icaoId"].upper() for s in found}
+            missing = [i for i in wanted if i.upper() not in known]
+            if missing:
+                found = found + await _upstream_station_info({"format": "json", "ids": ",".join(missing)})
+            return found
         try:
-            response = await client.get(f"{AVIATION_WEATHER_API}/stationinfo", params=params)
-            response.raise_for_status()
-            
-            if format == "json":
-                return response.json()
-            return response.text
-            
-        except httpx.HTTPStatusError as e:
-             raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=str(e))
+            min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be minLat,minLon,maxLat,maxLon")
+        return catalogue.bbox(min_lat, min_lon, max_lat, max_lon)
+
+    params = {"format": format}
+    if ids:
+        params["ids"] = ids
+    if bbox:
+        params["bbox"] = bbox
+    return await _upstream_station_info(params)
+
+
+async def _upstream_station_info(params: dict):
+    client = get_http_client()
+    try:
+        response = await client.get(f"{AVIATION_WEATHER_API}/stationinfo", params=params)
+        response.raise_for_status()
+        
+        if params["format"] == "json":
+            return response.json()
+        return response.text
+        
+    except httpx.HTTPStatusError as e:
+         raise HTTPException(status_code=e.response.status_code, detail=f"Upstream API error: {e.response.text}")
+    except Exception as e:
+         raise HTTPException(status_code=500, detail=str(e))
 
 # --- Phase 6: Smart Calendar & Booking ---
 
@@ -231,8 +278,43 @@ async def check_legality(request: LegalityRequest):
     result = is_slot_legal(pilot_dict, request.aircraft, request.date)
     return result
 
+@app.post("/api/v1/legality/timeline")
+async def legality_timeline_endpoint(request: LegalityTimelineRequest):
+    """
+    Legality verdicts for many dates at once (e.g. the next 90 days), plus the
+    date the pilot stops being legal.
+    """
+    from datetime import date as date_cls, timedelta
+
+    if request.dates is not None:
+        dates = request.dates
+    else:
+        try:
+            first = date_cls.fromisoformat(request.start) if request.start else date_cls.today()
+            dates = [(first + timedelta(days=i)).isoformat() for i in range(request.days)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid start date. Use ISO format: YYYY-MM-DD")
+        except OverflowError:
+            raise HTTPException(status_code=400, detail="start + days runs past the last representable date")
+    if len(dates) > MAX_TIMELINE_DATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TIMELINE_DATES} dates per request")
+
+    aircraft_details = {"permit_expiry": request.permit_expiry} if request.permit_expiry else None
+    try:
+        return legality_timeline(request.pilot.model_dump(), request.aircraft, dates, aircraft_details)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date. Use ISO format: YYYY-MM-DD")
+
 from datetime import datetime
-from backend.integrations.weather import get_forecast
+from backend.integrations.weather import (
+    get_forecast,
+    get_forecasts,
+    get_forecast_resolver,
+    get_site_weather,
+    get_weather_version,
+    weather_cache_stats,
+)
+from backend.slot_cache import slot_cache_key, get_cached_slots, cache_slots, slot_cache_stats
 
 class FlyabilityContextRequest(BaseModel):
     site_id: str
@@ -250,7 +332,7 @@ async def check_flyability_endpoint(request: FlyabilityContextRequest):
     """
     t0 = request.time or datetime.now()
     
-    forecast = get_forecast(request.site_id, t0, t0)
+    forecast = await get_forecast(request.site_id, t0, t0)
     
     result = compute_flyability(
         forecast=forecast,
@@ -269,48 +351,241 @@ class SlotsRequest(BaseModel):
     site_id: str
     start: datetime
     end: datetime
-    slot_duration_minutes: int = 60
+    slot_duration_minutes: int = Field(60, gt=0)
     pilot: PilotProfile
     aircraft: AircraftProfile
     runway_surface: SurfaceCondition = SurfaceCondition.DRY
 
 
+def _iter_slot_intervals(start: datetime, end: datetime, slot_duration_minutes: int):
+    """Yield consecutive [slot_start, slot_end) slots over [start, end); the last may be shorter."""
+    from datetime import timedelta
+
+    duration = timedelta(minutes=slot_duration_minutes)
+    current = start
+    while current < end:
+        slot_end = min(current + duration, end)
+        yield current, slot_end
+        current = slot_end
+
+
+def _slot_intervals(start: datetime, end: datetime, slot_duration_minutes: int):
+    return list(_iter_slot_intervals(start, end, slot_duration_minutes))
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_LINES_PER_CHUNK = 96  # one day of 15-minute slots per write
+
+
 @app.post("/api/v1/flyability/slots")
-async def flyability_slots(request: SlotsRequest):
+async def flyability_slots(request: SlotsRequest, http_request: Request):
     """T11: Per-slot flyability across a time range.
 
     Divides [start, end) into slots of slot_duration_minutes and evaluates
     each with the existing flyability engine + real weather.
+
+    With `Accept: application/x-ndjson` the slots are streamed one JSON
+    object per line as they are evaluated, so long ranges render
+    progressively and the response is never held in memory as a whole.
     """
-    from datetime import timedelta
+    if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        return await _stream_flyability_slots(request)
 
     if request.start >= request.end:
         return []
 
-    duration = timedelta(minutes=request.slot_duration_minutes)
+    envelope = compile_envelope(request.pilot, request.aircraft)
+    cache_key = None
+    weather_version = await get_weather_version(request.site_id)
+    if weather_version is not None:
+        cache_key = slot_cache_key(request.site_id, weather_version, envelope, request.runway_surface,
+                                   request.start, request.end, request.slot_duration_minutes)
+        cached = get_cached_slots(cache_key)
+        if cached is not None:
+            return cached
+
+    intervals = _slot_intervals(request.start, request.end, request.slot_duration_minutes)
+
+    # One weather fetch for the whole range, then in-memory lookups per slot
+    forecasts = await get_forecasts(request.site_id, intervals)
+
     slots = []
-    current = request.start
-
-    while current < request.end:
-        slot_end = min(current + duration, request.end)
-        forecast = get_forecast(request.site_id, current, slot_end)
-        result = compute_flyability(
-            forecast=forecast,
-            pilot=request.pilot,
-            aircraft=request.aircraft,
-            runway_surface=request.runway_surface,
-        )
-        slots.append({
-            "start": current.isoformat(),
-            "end": slot_end.isoformat(),
-            "status": result.status,
-            "score": result.score,
-            "reasons": result.reasons,
-        })
-        current = slot_end
+    for (slot_start, slot_end), forecast in zip(intervals, forecasts):
+        result = evaluate_flyability(envelope, forecast, request.runway_surface)
+        slots.append(_slot_payload(slot_start, slot_end, result))
 
+    if cache_key is not None:
+        cache_slots(cache_key, slots)
     return slots
 
+
+@app.get("/api/v1/flyability/cache/stats")
+@limiter.limit("10/minute")
+async def flyability_cache_stats(request: Request):
+    """Hit/miss counters for the slot-result and site-weather caches on this instance."""
+    return {
+        "slot_results": slot_cache_stats(),
+        "site_weather": weather_cache_stats(),
+    }
+
+
+def _slot_payload(slot_start: datetime, slot_end: datetime, result: FlyabilityResponse) -> dict:
+    return {
+        "start": slot_start.isoformat(),
+        "end": slot_end.isoformat(),
+        "status": result.status,
+        "score": result.score,
+        "reasons": result.reasons,
+    }
+
+
+async def _stream_flyability_slots(request: SlotsRequest) -> StreamingResponse:
+    # Resolve the weather up front so upstream errors still surface as a normal status code
+    resolve = await get_forecast_resolver(request.site_id)
+    envelope = compile_envelope(request.pilot, request.aircraft)
+
+    async def lines():
+        chunk = []
+        for slot_start, slot_end in _iter_slot_intervals(request.start, request.end, request.slot_duration_minutes):
+            result = evaluate_flyability(envelope, resolve(slot_start, slot_end), request.runway_surface)
+            chunk.append(json.dumps(_slot_payload(slot_start, slot_end, result)) + "\n")
+            if len(chunk) >= NDJSON_LINES_PER_CHUNK:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+class NextWindowRequest(BaseModel):
+    site_id: str
+    pilot: PilotProfile
+    aircraft: AircraftProfile
+    runway_surface: SurfaceCondition = SurfaceCondition.DRY
+    start: Optional[datetime] = None  # defaults to now (UTC)
+    horizon_hours: int = 72
+    min_duration_minutes: int = 60
+    count: int = 1
+
+
+MAX_WINDOW_HORIZON_HOURS = 14 * 24
+MAX_WINDOW_COUNT = 20
+
+
+@app.post("/api/v1/flyability/next-window")
+async def next_flyable_window(request: NextWindowRequest):
+    """Earliest GO windows at a site ("when can I next fly?").
+
+    Walks the site's forecast as periods of constant weather, not as fixed
+    slots. Adjacent GO periods merge into windows, and the walk stops once
+    `count` windows of at least min_duration_minutes are found.
+    """
+    from datetime import timedelta
+
+    if not 0 < request.horizon_hours <= MAX_WINDOW_HORIZON_HOURS:
+        raise HTTPException(status_code=400, detail=f"horizon_hours must be between 1 and {MAX_WINDOW_HORIZON_HOURS}")
+    if not 0 < request.count <= MAX_WINDOW_COUNT:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {MAX_WINDOW_COUNT}")
+    if request.min_duration_minutes <= 0:
+        raise HTTPException(status_code=400, detail="min_duration_minutes must be positive")
+
+    start = request.start or datetime.utcnow()
+    end = start + timedelta(hours=request.horizon_hours)
+    site = await get_site_weather(request.site_id)
+    windows = find_flyable_windows(
+        site.iter_periods(start, end),
+        compile_envelope(request.pilot, request.aircraft),
+        request.runway_surface,
+        timedelta(minutes=request.min_duration_minutes),
+        request.count,
+    )
+    return {
+        "site_id": request.site_id,
+        "searched_until": end.isoformat(),
+        "windows": [
+            {
+                "start": window_start.isoformat(),
+                "end": window_end.isoformat(),
+                "duration_minutes": int((window_end - window_start).total_seconds() // 60),
+            }
+            for window_start, window_end in windows
+        ],
+    }
+
+
+class MatrixRequest(BaseModel):
+    start: datetime
+    end: datetime
+    slot_duration_minutes: int = Field(60, gt=0)
+    pilot: PilotProfile
+    runway_surface: SurfaceCondition = SurfaceCondition.DRY
+    site_id: Optional[str] = None  # defaults to the club's nearest reporting station
+
+
+MAX_MATRIX_HORIZON_HOURS = 14 * 24
+MAX_MATRIX_SLOTS = 672  # e.g. a week of 15-minute slots
+
+
+@app.post("/api/v1/clubs/{slug}/flyability/matrix")
+@limiter.limit("30/minute")
+async def flyability_matrix(request: Request, slug: str, body: MatrixRequest, user: dict = Depends(verify_token)):
+    """Flyability for a club's fleet over a time range in one response.
+
+    Weather is resolved once for the club's site and the time axis is scored
+    in one vectorized pass. status[j] / score[j] are for slot j, with status
+    codes indexing status_codes.
+
+    The envelope comes from the pilot's limits only: compile_envelope doesn't
+    model aircraft limits yet (crosswind needs runway and wind direction), so
+    one row applies to every aircraft listed in `aircraft` rather than
+    repeating it per aircraft.
+    """
+    from datetime import timedelta
+
+    if body.end - body.start > timedelta(hours=MAX_MATRIX_HORIZON_HOURS):
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_MATRIX_HORIZON_HOURS} hours")
+    if (body.end - body.start) / timedelta(minutes=body.slot_duration_minutes) > MAX_MATRIX_SLOTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MATRIX_SLOTS} slots per request")
+    _enforce_club_membership(user, slug)
+    db = get_db()
+
+    club_doc = db.collection("clubs").document(slug).get()
+    if not club_doc.exists:
+        raise HTTPException(status_code=404, detail="Club not found")
+    club = club_doc.to_dict()
+
+    site_id = body.site_id or club.get("nearest_icao")
+    if not site_id and club.get("lat") is not None and club.get("lng") is not None:
+        site_id = nearest_icao(club["lat"], club["lng"])
+    if not site_id:
+        raise HTTPException(status_code=400, detail="Club has no weather station; pass site_id")
+
+    fleet = [{"id": doc.id, **doc.to_dict()} for doc in
+             db.collection("clubs").document(slug).collection("fleet").stream()]
+    intervals = _slot_intervals(body.start, body.end, body.slot_duration_minutes) if body.start < body.end else []
+
+    forecasts = await get_forecasts(site_id, intervals) if intervals else []
+    wind, gust, cloud, vis = forecast_columns(forecasts)
+    surface = surface_codes(body.runway_surface)
+
+    # One envelope for the pilot, so one row of results for the whole fleet
+    batch = compute_flyability_batch(wind, gust, cloud, vis, surface, compile_envelope(body.pilot))
+
+    return {
+        "club_slug": slug,
+        "site_id": site_id,
+        "slot_duration_minutes": body.slot_duration_minutes,
+        "slots": [slot_start.isoformat() for slot_start, _ in intervals],
+        "aircraft": [
+            {"id": a["id"], "registration": a.get("registration"), "type": a.get("type"), "status": a.get("status")}
+            for a in fleet
+        ],
+        "status_codes": list(STATUS_NAMES),
+        "status": batch.status.tolist(),
+        "score": batch.score.tolist(),
+    }
+
 @app.post("/api/v1/club/score")
 async def calculate_club_score(metrics: ClubMetrics):
     """
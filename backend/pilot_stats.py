@@ -0,0 +1,131 @@
+"""Per-pilot booking aggregates used by the admission rules in create_booking.
+
+pilot_stats/{uid} holds:
+    upcoming            {booking_id: start_time} for confirmed bookings not yet started
+    active_future_count len(upcoming) at the last write
+    last_flown_at       latest start_time of a confirmed booking that has started
+
+"Future" decays with the clock, so readers never trust active_future_count
+alone. They first roll any upcoming entry whose start has passed into
+last_flown_at. Every write that moves a booking into or out of "confirmed"
+updates the document in the same transaction, except series bookings, which
+are lessons or blocks rather than the creator's own flying and are never
+added. A pilot without a stats document falls back to one range scan of
+their bookings; the next write stores that result.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from google.cloud.firestore import transactional
+
+from backend.booking_index import _naive_utc
+
+PILOT_STATS_COLLECTION = "pilot_stats"
+SEED_LOOKBACK_DAYS = 90  # must cover the club recency window in create_booking
+
+
+def stats_ref(db, uid: str):
+    return db.collection(PILOT_STATS_COLLECTION).document(uid)
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    return _naive_utc(value) if isinstance(value, datetime) else None
+
+
+def normalize_stats(stats: dict, now: datetime) -> dict:
+    """Roll bookings whose start has passed from upcoming into last_flown_at."""
+    last_flown_at = _as_datetime(stats.get("last_flown_at"))
+    upcoming = {}
+    for booking_id, start in dict(stats.get("upcoming") or {}).items():
+        start = _as_datetime(start)
+        if start is None:
+            continue
+        if start > now:
+            upcoming[booking_id] = start
+        elif last_flown_at is None or start > last_flown_at:
+            last_flown_at = start
+    return {
+        "upcoming": upcoming,
+        "active_future_count": len(upcoming),
+        "last_flown_at": last_flown_at,
+    }
+
+
+def scan_pilot_stats(db, uid: str, now: datetime, transaction=None, exclude: Optional[str] = None) -> dict:
+    """Rebuild a pilot's stats from their confirmed bookings (legacy path), leaving out series bookings."""
+    query = (
+        db.collection("bookings")
+        .where("pilot_uid", "==", uid)
+        .where("status", "==", "confirmed")
+        .where("start_time", ">", now - timedelta(days=SEED_LOOKBACK_DAYS))
+    )
+    docs = query.get(transaction=transaction) if transaction is not None else query.stream()
+    upcoming = {}
+    for doc in docs:
+        data = doc.to_dict()
+        if doc.id != exclude and not data.get("series_id"):
+            upcoming[doc.id] = data.get("start_time")
+    return normalize_stats({"upcoming": upcoming}, now)
+
+
+def read_pilot_stats(db, uid: str, now: datetime, transaction=None, exclude: Optional[str] = None) -> dict:
+    """One point read; a range scan only for pilots without a stats document yet.
+
+    exclude drops a booking before started bookings are rolled into
+    last_flown_at, so a booking cancelled after its start is not counted as flown.
+    """
+    ref = stats_ref(db, uid)
+    snapshot = ref.get(transaction=transaction) if transaction is not None else ref.get()
+    if snapshot.exists:
+        stats = snapshot.to_dict() or {}
+        upcoming = {k: v for k, v in dict(stats.get("upcoming") or {}).items() if k != exclude}
+        return normalize_stats({**stats, "upcoming": upcoming}, now)
+    return scan_pilot_stats(db, uid, now, transaction, exclude)
+
+
+def admission_stats(db, uid: str, now: datetime) -> Tuple[int, Optional[datetime]]:
+    """(active future bookings, last flown) for the admission rules."""
+    stats = read_pilot_stats(db, uid, now)
+    return stats["active_future_count"], stats["last_flown_at"]
+
+
+def with_booking(stats: dict, booking_id: str, start: datetime, now: datetime) -> dict:
+    """Stats after a new confirmed booking."""
+    upcoming = {**stats["upcoming"], booking_id: _naive_utc(start)}
+    return {**normalize_stats({**stats, "upcoming": upcoming}, now), "updated_at": now}
+
+
+def without_booking(stats: dict, booking_id: str, now: datetime, flown_at: Optional[datetime] = None) -> dict:
+    """Stats after a booking leaves "confirmed"; flown_at counts it towards recency."""
+    upcoming = {k: v for k, v in stats["upcoming"].items() if k != booking_id}
+    last_flown_at = stats["last_flown_at"]
+    flown_at = _as_datetime(flown_at)
+    if flown_at is not None and flown_at <= now and (last_flown_at is None or flown_at > last_flown_at):
+        last_flown_at = flown_at
+    return {**normalize_stats({"upcoming": upcoming, "last_flown_at": last_flown_at}, now), "updated_at": now}
+
+
+def close_booking(db, booking_ref, changes: dict, flown: bool = False) -> dict:
+    """Apply changes (a new status) to a booking and update its pilot's stats atomically.
+
+    flown=True keeps the booking's start as the pilot's last flight, as for a
+    GNSS auto-close. Returns the booking data as read in the transaction.
+    """
+
+    @transactional
+    def _txn(transaction):
+        snapshot = booking_ref.get(transaction=transaction)
+        data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+        uid = data.get("pilot_uid")
+        now = datetime.utcnow()
+        stats = None
+        if uid and data.get("status") == "confirmed":
+            # A closed booking only counts towards recency when it was flown
+            stats = read_pilot_stats(db, uid, now, transaction, exclude=None if flown else booking_ref.id)
+        transaction.update(booking_ref, changes)
+        if stats is not None:
+            flown_at = data.get("start_time") if flown else None
+            transaction.set(stats_ref(db, uid), without_booking(stats, booking_ref.id, now, flown_at))
+        return data
+
+    return _txn(db.transaction())
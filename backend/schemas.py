@@ -33,6 +33,12 @@ class FlyabilityResponse(BaseModel):
     status: Literal["GO", "CHECK", "NO_GO"]
     score: int # 0-100
     reasons: List[str]
+class LogbookEntry(BaseModel):
+    date: str
+    hours_pic: float
+    to_landings: int
+    instruction: float
+
 class UserProfileUpdate(BaseModel):
     weight_kg: Optional[int] = None
     medical_expiry: Optional[str] = None  # ISO Format YYYY-MM-DD
@@ -0,0 +1,53 @@
+"""Per-instance cache of /api/v1/flyability/slots results.
+
+Entries are keyed on everything that determines the answer: site, weather
+version (the site's content hash), flyability envelope, runway surface and
+the slot grid. Members of a club asking the same question share one
+computation. Because the weather version is part of the key, a new snapshot
+never serves old results. Entries for superseded versions are also dropped
+as soon as the weather updater publishes, so they don't linger until evicted.
+"""
+from datetime import datetime
+from typing import Hashable, List, Optional, Set, Tuple
+
+from backend.cache import TTLCache
+from backend.flyability import FlyabilityEnvelope
+from backend.integrations.weather import on_weather_published
+from backend.schemas import SurfaceCondition
+
+SLOT_CACHE_MAX_ENTRIES = 2048
+SLOT_CACHE_TTL = 3600  # backstop only; versioned keys already keep results current
+
+_slot_results = TTLCache(maxsize=SLOT_CACHE_MAX_ENTRIES, ttl=SLOT_CACHE_TTL)
+
+
+def slot_cache_key(
+    site_id: str,
+    weather_version: str,
+    envelope: FlyabilityEnvelope,
+    runway_surface: SurfaceCondition,
+    start: datetime,
+    end: datetime,
+    slot_duration_minutes: int,
+) -> Tuple[Hashable, ...]:
+    return (site_id, weather_version, envelope, runway_surface, start, end, slot_duration_minutes)
+
+
+def get_cached_slots(key: Tuple) -> Optional[List[dict]]:
+    return _slot_results.get(key)
+
+
+def cache_slots(key: Tuple, slots: List[dict]):
+    _slot_results.set(key, slots)
+
+
+def invalidate_sites(site_ids: Set[str]) -> int:
+    """Drop cached results for sites whose weather just changed."""
+    return _slot_results.invalidate_where(lambda key: key[0] in site_ids)
+
+
+def slot_cache_stats() -> dict:
+    return _slot_results.stats()
+
+
+on_weather_published(invalidate_sites)
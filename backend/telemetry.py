@@ -5,6 +5,8 @@ from backend.db import get_db
 from backend.schemas import TelemetryPayload, Geofence
 from backend.geospatial import is_inside_geofence
 from backend.logger import log_event
+from backend.booking_index import forget_booking
+from backend.pilot_stats import close_booking
 
 router = APIRouter()
 
@@ -94,11 +96,13 @@ async def receive_telemetry(payload: TelemetryPayload):
             
             if duration_outside > (15 * 60):
                 # Auto-Close the booking
-                booking_doc.reference.update({
+                # The flight counts towards the pilot's club recency
+                close_booking(db, booking_doc.reference, {
                     "status": "completed",
                     "completed_at": now.isoformat(),
                     "completion_reason": "gnss_auto_close"
-                })
+                }, flown=True)
+                forget_booking(payload.aircraft_reg, booking_doc.id)
                 log_event("booking_auto_closed", {
                     "booking_id": booking_doc.id,
                     "aircraft_reg": payload.aircraft_reg,
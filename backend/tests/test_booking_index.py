@@ -0,0 +1,151 @@
+"""Tests for backend.booking_index — the per-aircraft overlap pre-check."""
+import pytest
+from unittest.mock import call, patch, MagicMock
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+
+from backend import booking_index
+from backend.booking_index import AircraftIntervals
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    booking_index._index.clear()
+    yield
+    booking_index._index.clear()
+
+
+def _doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.exists = data is not None
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _db(stream_docs, point_reads=None):
+    """A Firestore mock whose range query streams stream_docs and whose point reads come from point_reads."""
+    db = MagicMock()
+    query = MagicMock()
+    query.where.return_value = query
+    query.stream.return_value = stream_docs
+    collection = MagicMock()
+    collection.where.return_value = query
+    collection.document.side_effect = lambda doc_id=None: MagicMock(
+        id=doc_id or "bk_new",
+        get=MagicMock(return_value=_doc(doc_id, (point_reads or {}).get(doc_id))),
+    )
+    db.collection.return_value = collection
+    return db
+
+
+T0 = datetime(2027, 3, 1, 9, 0)
+FLOOR = datetime(2027, 2, 28)
+
+
+class TestAircraftIntervals:
+    def test_overlap_uses_longest_duration(self):
+        intervals = AircraftIntervals(loaded_at=0)
+        intervals.add("short", T0, T0 + timedelta(hours=1))
+        intervals.add("long", T0 - timedelta(hours=6), T0 + timedelta(hours=3))
+        intervals.add("later", T0 + timedelta(hours=5), T0 + timedelta(hours=6))
+
+        hits = intervals.overlapping(T0 + timedelta(hours=2), T0 + timedelta(hours=4))
+        assert [h[2] for h in hits] == ["long"]
+        assert intervals.overlapping(T0 + timedelta(hours=3), T0 + timedelta(hours=5)) == []
+
+    def test_remove_and_aware_datetimes(self):
+        intervals = AircraftIntervals(loaded_at=0)
+        aware = T0.replace(tzinfo=timezone.utc)
+        intervals.add("bk_1", aware, aware + timedelta(hours=2))
+        assert len(intervals.overlapping(T0 + timedelta(hours=1), T0 + timedelta(hours=3))) == 1
+
+        intervals.remove("bk_1")
+        assert intervals.overlapping(T0, T0 + timedelta(hours=3)) == []
+        assert len(intervals) == 0
+
+
+class TestFindConfirmedConflict:
+    def test_verified_conflict_is_returned(self):
+        existing = {"status": "confirmed", "start_time": T0, "end_time": T0 + timedelta(hours=2)}
+        db = _db([_doc("bk_1", existing)], {"bk_1": existing})
+
+        assert booking_index.find_confirmed_conflict(db, "G-CDEF", T0 + timedelta(hours=1), T0 + timedelta(hours=3), FLOOR) == "bk_1"
+        stats = booking_index.booking_index_stats()
+        # Reads spent (one load, one point read) against the transaction saved
+        assert (stats["docs_loaded"], stats["point_reads"], stats["early_rejects"]) == (1, 1, 1)
+
+    def test_stale_entry_is_dropped(self):
+        loaded = {"status": "confirmed", "start_time": T0, "end_time": T0 + timedelta(hours=2)}
+        db = _db([_doc("bk_1", loaded)], {"bk_1": {**loaded, "status": "cancelled"}})
+
+        assert booking_index.find_confirmed_conflict(db, "G-CDEF", T0, T0 + timedelta(hours=1), FLOOR) is None
+        assert booking_index.booking_index_stats()["bookings"] == 0
+
+    def test_aircraft_loaded_once_until_refresh(self):
+        db = _db([])
+        for _ in range(3):
+            booking_index.find_confirmed_conflict(db, "G-CDEF", T0, T0 + timedelta(hours=1), FLOOR)
+        assert booking_index.booking_index_stats()["loads"] == 1
+
+        with patch.object(booking_index._index, "refresh_seconds", 0):
+            booking_index.find_confirmed_conflict(db, "G-CDEF", T0, T0 + timedelta(hours=1), FLOOR)
+        assert booking_index.booking_index_stats()["loads"] == 2
+
+
+class TestCreateBookingPreCheck:
+    @pytest.fixture(autouse=True)
+    def mock_auth(self):
+        with patch("backend.auth.firebase_admin") as mock_admin, \
+             patch("backend.auth.firebase_auth.verify_id_token", return_value={"uid": "pilot_123"}), \
+             patch("backend.auth.get_user_profile", return_value={"role": "instructor"}):
+            mock_admin.exceptions = MagicMock()
+            mock_admin.exceptions.FirebaseError = Exception
+            import backend.auth
+            backend.auth._app = None
+            yield
+
+    def _post(self, start, end):
+        from backend.main import app
+        return TestClient(app).post(
+            "/api/v1/bookings/",
+            json={"club_slug": "strathaven", "aircraft_reg": "G-CDEF",
+                  "start_time": start.isoformat(), "end_time": end.isoformat()},
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+    def test_known_conflict_rejected_without_transaction(self, mock_get_db):
+        existing = {"status": "confirmed", "start_time": T0, "end_time": T0 + timedelta(hours=2)}
+        db = _db([_doc("bk_1", existing)], {"bk_1": existing})
+        mock_get_db.collection.side_effect = db.collection
+
+        response = self._post(T0 + timedelta(hours=1), T0 + timedelta(hours=3))
+
+        assert response.status_code == 409
+        mock_get_db.transaction.assert_not_called()
+
+    def test_new_booking_is_indexed(self, mock_get_db):
+        db = _db([])
+        db.collection.return_value.where.return_value.get.return_value = []
+        mock_get_db.collection.side_effect = db.collection
+
+        assert self._post(T0, T0 + timedelta(hours=2)).status_code == 200
+        assert booking_index.booking_index_stats() == {
+            "aircraft": 1, "bookings": 1, "loads": 1, "docs_loaded": 0, "point_reads": 0, "early_rejects": 0,
+        }
+
+    def test_transaction_bound_ignores_index(self, mock_get_db):
+        db = _db([])
+        db.collection.return_value.where.return_value.get.return_value = []
+        mock_get_db.collection.side_effect = db.collection
+
+        assert self._post(T0, T0 + timedelta(hours=2)).status_code == 200
+        # Fixed by the booking length cap, not by the longest booking this instance has seen
+        query = db.collection.return_value.where.return_value
+        assert call("start_time", ">=", T0 - timedelta(days=14)) in query.where.call_args_list
+
+    def test_overlong_booking_rejected(self, mock_get_db):
+        response = self._post(T0, T0 + timedelta(days=15))
+
+        assert response.status_code == 400
+        assert "limited to 14 days" in response.json()["detail"]
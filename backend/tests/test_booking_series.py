@@ -0,0 +1,150 @@
+"""Tests for POST /api/v1/bookings/series — recurring and bulk bookings."""
+import pytest
+from unittest.mock import call, patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+from itertools import count
+
+from backend import booking_index
+from backend.bookings import RecurrenceRule, expand_recurrence
+
+# A Monday, far enough ahead that no occurrence is in the past
+MONDAY = datetime(2027, 3, 1, 9, 0)
+
+
+class TestExpandRecurrence:
+    def test_daily_count_and_interval(self):
+        occurrences = expand_recurrence(MONDAY, MONDAY + timedelta(hours=1),
+                                        RecurrenceRule(freq="daily", interval=2, count=3))
+        assert [s for s, _ in occurrences] == [MONDAY, MONDAY + timedelta(days=2), MONDAY + timedelta(days=4)]
+        assert all(e - s == timedelta(hours=1) for s, e in occurrences)
+
+    def test_weekly_by_weekday_until(self):
+        rule = RecurrenceRule(freq="weekly", by_weekday=[0, 3], until=MONDAY + timedelta(days=14))
+        starts = [s for s, _ in expand_recurrence(MONDAY + timedelta(days=3), MONDAY + timedelta(days=3, hours=2), rule)]
+        # Starts on the Thursday; Mondays and Thursdays until (inclusive) the Monday two weeks on
+        assert starts == [MONDAY + timedelta(days=d) for d in (3, 7, 10, 14)]
+
+    def test_rule_needs_an_end(self):
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException) as exc:
+            expand_recurrence(MONDAY, MONDAY + timedelta(hours=1), RecurrenceRule(freq="weekly"))
+        assert exc.value.status_code == 400
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    booking_index._index.clear()
+    yield
+    booking_index._index.clear()
+
+
+@pytest.fixture
+def auth():
+    with patch("backend.auth.firebase_admin") as mock_admin, \
+         patch("backend.auth.firebase_auth.verify_id_token", return_value={"uid": "inst_1"}), \
+         patch("backend.bookings.sync_booking_to_calendar", new_callable=AsyncMock):
+        mock_admin.exceptions = MagicMock()
+        mock_admin.exceptions.FirebaseError = Exception
+        import backend.auth
+        backend.auth._app = None
+        yield
+
+
+def _db(mock_get_db, existing=()):
+    """Wire mock_get_db so range queries return existing and document() hands out fresh ids."""
+    docs = []
+    for doc_id, start, end in existing:
+        doc = MagicMock()
+        doc.id = doc_id
+        doc.to_dict.return_value = {"start_time": start, "end_time": end}
+        docs.append(doc)
+    query = MagicMock()
+    query.where.return_value = query
+    query.stream.return_value = docs
+    query.get.return_value = docs
+    ids = count(1)
+
+    def document(doc_id=None):
+        ref = MagicMock()
+        ref.id = doc_id or f"bk_{next(ids)}"
+        ref.get.return_value.exists = False
+        return ref
+
+    collection = MagicMock()
+    collection.where.return_value = query
+    collection.document.side_effect = document
+    mock_get_db.collection.return_value = collection
+    return mock_get_db.transaction.return_value
+
+
+def _post(body):
+    from backend.main import app
+    return TestClient(app).post("/api/v1/bookings/series", json=body, headers={"Authorization": "Bearer t"})
+
+
+SERIES = {
+    "club_slug": "strathaven",
+    "aircraft_reg": "G-CDEF",
+    "instructor_id": "inst_1",
+    "start_time": MONDAY.isoformat(),
+    "end_time": (MONDAY + timedelta(hours=2)).isoformat(),
+    "recurrence": {"freq": "weekly", "count": 4},
+}
+
+
+class TestCreateBookingSeries:
+    def test_pilots_cannot_create_series(self, auth, mock_get_db):
+        _db(mock_get_db)
+        with patch("backend.auth.get_user_profile", return_value={"role": "pilot"}):
+            assert _post(SERIES).status_code == 403
+
+    def test_conflicts_reported_per_occurrence(self, auth, mock_get_db):
+        clash_start = MONDAY + timedelta(weeks=2, hours=1)
+        transaction = _db(mock_get_db, [("bk_existing", clash_start, clash_start + timedelta(hours=1))])
+
+        with patch("backend.auth.get_user_profile", return_value={"role": "instructor"}):
+            response = _post(SERIES)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["created"]) == 3
+        assert {b["series_id"] for b in data["created"]} == {data["series_id"]}
+        assert data["conflicts"] == [{
+            "start_time": (MONDAY + timedelta(weeks=2)).isoformat(),
+            "end_time": (MONDAY + timedelta(weeks=2, hours=2)).isoformat(),
+            "conflicts_with": "bk_existing",
+            "reason": "Aircraft already booked",
+        }]
+        # 3 bookings + 3 audit logs in a single transaction; the creator's pilot_stats are untouched
+        assert transaction.set.call_count == 6
+        assert "pilot_stats" not in [c.args[0] for c in mock_get_db.collection.call_args_list]
+        # Sweep and re-check are bounded by the booking length cap, not the index
+        query = mock_get_db.collection.return_value.where.return_value
+        assert query.where.call_args_list.count(call("start_time", ">=", MONDAY - timedelta(days=14))) == 2
+        assert booking_index.booking_index_stats()["bookings"] == 0  # aircraft never loaded into the index
+
+    def test_overlapping_bulk_slots(self, auth, mock_get_db):
+        transaction = _db(mock_get_db)
+        slots = [{"start_time": (MONDAY + timedelta(hours=h)).isoformat(),
+                  "end_time": (MONDAY + timedelta(hours=h + 1)).isoformat()} for h in range(5)]
+        slots.append({"start_time": (MONDAY + timedelta(minutes=30)).isoformat(),
+                      "end_time": (MONDAY + timedelta(minutes=90)).isoformat()})
+        body = {"club_slug": "strathaven", "aircraft_reg": "G-CDEF", "slots": slots}
+
+        with patch("backend.auth.get_user_profile", return_value={"role": "admin"}):
+            response = _post(body)
+
+        data = response.json()
+        assert len(data["created"]) == 5
+        assert [c["reason"] for c in data["conflicts"]] == ["Overlaps an earlier slot in this series"]
+        # 5 bookings and their audit logs, in one transaction
+        assert transaction.set.call_count == 5 * 2
+        mock_get_db.transaction.assert_called_once()
+
+    def test_series_size_is_capped(self, auth, mock_get_db):
+        _db(mock_get_db)
+        body = {**SERIES, "recurrence": {"freq": "daily", "count": 500}}
+        with patch("backend.auth.get_user_profile", return_value={"role": "instructor"}):
+            response = _post(body)
+        assert response.status_code == 400
@@ -23,6 +23,15 @@ def mock_google_auth():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_booking_index():
+    """The overlap index is per-process; start each test with it empty."""
+    from backend import booking_index
+    booking_index._index.clear()
+    yield
+    booking_index._index.clear()
+
+
 @pytest.fixture
 def mock_auth_token():
     """Mock a valid Firebase token for authenticated requests."""
@@ -66,16 +75,80 @@ class TestListBookings:
         mock_query = MagicMock()
         mock_query.where.return_value = mock_query
         mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.stream.return_value = [mock_doc]
         
         # When chaining wheres, we need to ensure the final call returns the stream
         mock_firestore.collection.return_value = mock_query
 
-        response = client.get("/api/v1/bookings/strathaven")
+        response = client.get("/api/v1/bookings/strathaven?start=2027-03-01T00:00:00&end=2027-03-02T00:00:00")
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["club_slug"] == "strathaven"
+        assert "X-Next-Cursor" not in response.headers
+
+    def _paged_query(self, mock_firestore, count, times=None):
+        docs = []
+        times = times or [(datetime(2027, 3, 1, 9, 0), datetime(2027, 3, 1, 10, 0))] * count
+        for i, (start, end) in enumerate(times):
+            doc = MagicMock()
+            doc.id = f"bk_{i}"
+            doc.to_dict.return_value = {
+                "club_slug": "strathaven",
+                "aircraft_reg": "G-CDEF",
+                "pilot_uid": "pilot_123",
+                "start_time": start,
+                "end_time": end,
+                "status": "confirmed",
+            }
+            docs.append(doc)
+        mock_query = MagicMock()
+        mock_query.where.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.start_after.return_value = mock_query
+        mock_query.limit.side_effect = lambda n: MagicMock(stream=MagicMock(return_value=docs[:n]))
+        mock_firestore.collection.return_value = mock_query
+        return mock_query
+
+    def test_list_bookings_paginates_with_cursor(self, client, mock_firestore):
+        """A full page returns X-Next-Cursor; passing it back resumes after the last (start_time, id)."""
+        mock_query = self._paged_query(mock_firestore, 3)
+
+        response = client.get("/api/v1/bookings/strathaven?page_size=2")
+        assert [b["id"] for b in response.json()] == ["bk_0", "bk_1"]
+        cursor = response.headers["X-Next-Cursor"]
+        mock_query.limit.assert_called_with(3)
+
+        client.get(f"/api/v1/bookings/strathaven?page_size=2&cursor={cursor}")
+        mock_query.start_after.assert_called_once_with(
+            {"start_time": datetime(2027, 3, 1, 9, 0), "__name__": "bk_1"}
+        )
+
+    def test_list_bookings_includes_in_progress(self, client, mock_firestore):
+        """Bookings that started before the window but are still running are listed; finished ones are not."""
+        mock_query = self._paged_query(mock_firestore, 2, times=[
+            (datetime(2027, 2, 27, 9, 0), datetime(2027, 3, 2, 17, 0)),  # multi-day, still in progress
+            (datetime(2027, 2, 28, 9, 0), datetime(2027, 2, 28, 11, 0)),  # finished before the window
+        ])
+
+        response = client.get(
+            "/api/v1/bookings/strathaven?start=2027-03-01T00:00:00&end=2027-03-02T00:00:00",
+            headers={"Origin": "http://localhost:5173"},
+        )
+
+        assert [b["id"] for b in response.json()] == ["bk_0"]
+        mock_query.where.assert_any_call("start_time", ">=", datetime(2027, 2, 15))
+        assert "X-Next-Cursor" in response.headers["access-control-expose-headers"]
+
+    def test_list_bookings_bounds(self, client, mock_firestore):
+        """Range and page size are capped; bad cursors are rejected."""
+        self._paged_query(mock_firestore, 0)
+        assert client.get("/api/v1/bookings/strathaven?page_size=10000").status_code == 422
+        assert client.get(
+            "/api/v1/bookings/strathaven?start=2027-01-01T00:00:00&end=2028-01-01T00:00:00"
+        ).status_code == 400
+        assert client.get("/api/v1/bookings/strathaven?cursor=not-a-cursor").status_code == 400
 
 
 class TestCreateBooking:
@@ -201,3 +274,41 @@ class TestCancelBooking:
             headers={"Authorization": "Bearer valid_token"},
         )
         assert response.status_code == 403
+
+
+class TestCreateBookingAdmissionReads:
+    def test_independent_reads_run_concurrently(self, client, mock_firestore, mock_auth_token):
+        """Admission waits for the slowest read, not the sum, and logs per-phase timings."""
+        import time
+
+        def slow(result):
+            def read(*args):
+                time.sleep(0.3)
+                return result
+            return read
+
+        mock_firestore.collection.return_value.document.return_value.id = "bk_new_2"
+        mock_firestore.collection.return_value.where.return_value.where.return_value \
+            .where.return_value.where.return_value.get.return_value = []
+
+        with patch("backend.auth.get_user_profile", side_effect=slow({"role": "instructor"})), \
+             patch("backend.bookings.admission_stats", side_effect=slow((0, None))), \
+             patch("backend.bookings.find_confirmed_conflict", side_effect=slow(None)), \
+             patch("backend.bookings._club_calendar_id", side_effect=slow("primary")), \
+             patch("backend.logger.log_event") as mock_log:
+            response = client.post(
+                "/api/v1/bookings/",
+                json={
+                    "club_slug": "strathaven",
+                    "aircraft_reg": "G-CDEF",
+                    "start_time": "2027-03-01T09:00:00",
+                    "end_time": "2027-03-01T11:00:00",
+                },
+                headers={"Authorization": "Bearer valid_token"},
+            )
+
+        assert response.status_code == 200
+        timing = next(c[0][1] for c in mock_log.call_args_list if c[0][0] == "booking_create_timing")
+        ms = timing["ms"]
+        assert {"profile", "pilot_stats", "overlap_precheck", "club", "transaction"} <= set(ms)
+        assert ms["admission_reads"] < 4 * 300 * 0.75
@@ -0,0 +1,55 @@
+"""Tests for backend.cache — in-process TTL/LRU cache."""
+from unittest.mock import patch
+from backend.cache import TTLCache
+
+
+def test_get_returns_stored_value():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("EGPF", 1)
+    assert cache.get("EGPF") == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_missing_key_counts_as_miss():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get("EGPH") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=4, ttl=60)
+    with patch("backend.cache.time.monotonic", return_value=1000.0):
+        cache.set("EGPF", 1)
+    with patch("backend.cache.time.monotonic", return_value=1061.0):
+        assert cache.get("EGPF") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_invalidate_drops_entry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("never-set")
+    assert cache.get("a") is None
+
+
+def test_invalidate_where_drops_matching_keys():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(("EGPF", 1), "a")
+    cache.set(("EGPF", 2), "b")
+    cache.set(("EGPH", 1), "c")
+
+    assert cache.invalidate_where(lambda key: key[0] == "EGPF") == 2
+    assert len(cache) == 1
+    assert cache.get(("EGPH", 1)) == "c"
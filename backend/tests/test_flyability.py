@@ -68,3 +68,67 @@ def test_flyability_ice_no_go(standard_pilot, aircraft, good_forecast):
     assert result.status == "NO_GO"
     assert result.score == 0
     assert any("Runway surface is ICE" in r for r in result.reasons)
+
+
+# --- Batch engine parity ---
+
+def test_batch_matches_scalar_path(aircraft):
+    """Every combination of threshold-edge values must score identically."""
+    import itertools
+    import numpy as np
+    from backend.flyability import compute_flyability_batch, compile_envelope, surface_codes
+
+    winds = [0, 12, 16, 16.5, 20, 20.5, 30]
+    gusts = [0, 25, 25.5, 40]
+    clouds = [500, 999, 1000, 1499, 1500, 5000]
+    vises = [1000, 2999, 3000, 4999, 5000, 9999]
+    surfaces = list(SurfaceCondition)
+    combos = list(itertools.product(winds, gusts, clouds, vises, surfaces))
+    w, g, c, v, s = zip(*combos)
+
+    for pilot in (PilotProfile(total_hours=100, hours_on_type=20),
+                  PilotProfile(total_hours=5, hours_on_type=1, max_wind_kt=12)):
+        batch = compute_flyability_batch(np.array(w), np.array(g), np.array(c), np.array(v),
+                                         surface_codes(s), compile_envelope(pilot, aircraft))
+        for i, (wind, gust, cloud, vis, surface) in enumerate(combos):
+            forecast = WeatherForecast(wind_speed_kt=wind, gust_speed_kt=gust, cloud_base_ft=cloud,
+                                       visibility_m=vis, precipitation_rate_mm_hr=0)
+            assert batch.response(i) == compute_flyability(forecast, pilot, aircraft, surface), combos[i]
+
+
+def test_batch_broadcasts_fleet_by_time_grid(standard_pilot, aircraft):
+    import numpy as np
+    from backend.flyability import (
+        compute_flyability_batch, compile_envelope, STATUS_GO, STATUS_CHECK, STATUS_NO_GO,
+        REASON_WIND_OVER, SURFACE_CODES,
+    )
+
+    envelope = compile_envelope(standard_pilot, aircraft)
+    # One weather column shared by three rows (e.g. aircraft), four time steps
+    wind = np.array([5.0, 17.0, 22.0, 5.0])
+    batch = compute_flyability_batch(wind, 0.0, 3000.0, 10000.0,
+                                     SURFACE_CODES[SurfaceCondition.DRY], envelope)
+    assert batch.shape == (4,)
+    assert batch.status.tolist() == [STATUS_GO, STATUS_CHECK, STATUS_NO_GO, STATUS_GO]
+    assert batch.reasons[2] == REASON_WIND_OVER
+
+    grid = compute_flyability_batch(np.broadcast_to(wind, (3, 4)), 0.0, 3000.0, 10000.0,
+                                    SURFACE_CODES[SurfaceCondition.DRY], envelope)
+    assert grid.shape == (3, 4)
+    assert grid.response((1, 2)).status == "NO_GO"
+    assert grid.response((0, 0)).reasons == ["Conditions look good within defined limits."]
+
+
+def test_envelope_compiled_once_per_profile(aircraft):
+    from backend.flyability import compile_envelope
+
+    pilot = PilotProfile(total_hours=50, hours_on_type=10, max_wind_kt=15)
+    same_minima = PilotProfile(total_hours=300, hours_on_type=80, max_wind_kt=15)
+    envelope = compile_envelope(pilot, aircraft)
+
+    assert envelope is compile_envelope(same_minima, aircraft)
+    assert envelope.max_wind_kt == 15
+    assert envelope.near_wind_kt == 12
+    assert compile_envelope(PilotProfile(total_hours=50, hours_on_type=10, max_wind_kt=30), aircraft).max_wind_kt == 20.0
+    with pytest.raises(AttributeError):
+        envelope.max_wind_kt = 40
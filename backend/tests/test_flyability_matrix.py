@@ -0,0 +1,126 @@
+"""Tests for the fleet x time flyability matrix endpoint."""
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from backend.schemas import WeatherForecast
+
+
+@pytest.fixture(autouse=True)
+def mock_firebase_admin():
+    with patch("backend.auth.firebase_admin") as mock_admin:
+        mock_admin.exceptions = MagicMock()
+        mock_admin.exceptions.FirebaseError = Exception
+        import backend.auth
+        backend.auth._app = None
+        yield mock_admin
+
+
+@pytest.fixture
+def mock_verify_id_token():
+    with patch("backend.auth.firebase_auth.verify_id_token") as mock_verify:
+        mock_verify.return_value = {"uid": "pilot_1", "email": "pilot@test.com"}
+        yield mock_verify
+
+
+def _forecast(wind):
+    return WeatherForecast(wind_speed_kt=wind, gust_speed_kt=0.0, cloud_base_ft=3000.0,
+                           visibility_m=10000.0, precipitation_rate_mm_hr=0.0)
+
+
+def _make_db(clubs=("strathaven",), club=None, fleet=None):
+    club = {"name": "Strathaven", "nearest_icao": "EGPF"} if club is None else club
+    fleet = fleet if fleet is not None else [
+        ("ac1", {"type": "Ikarus C42", "registration": "G-CDEF", "status": "online"}),
+        ("ac2", {"type": "EuroFox", "registration": "G-EFOX", "status": "maintenance"}),
+    ]
+
+    def collection_router(name):
+        coll = MagicMock()
+        if name == "users":
+            user_doc = MagicMock(exists=True)
+            user_doc.to_dict.return_value = {"role": "pilot", "club_slugs": list(clubs)}
+            coll.document.return_value.get.return_value = user_doc
+        elif name == "clubs":
+            club_doc = MagicMock(exists=True)
+            club_doc.to_dict.return_value = club
+            fleet_docs = []
+            for doc_id, data in fleet:
+                doc = MagicMock(id=doc_id)
+                doc.to_dict.return_value = data
+                fleet_docs.append(doc)
+            club_ref = coll.document.return_value
+            club_ref.get.return_value = club_doc
+            club_ref.collection.return_value.stream.return_value = fleet_docs
+        return coll
+
+    db = MagicMock()
+    db.collection.side_effect = collection_router
+    return db
+
+
+def _post(db, **overrides):
+    from backend.main import app
+    body = {
+        "start": "2026-06-15T09:00:00",
+        "end": "2026-06-15T12:00:00",
+        "pilot": {"total_hours": 100, "hours_on_type": 20},
+        **overrides,
+    }
+    with patch("backend.main.get_db", return_value=db), patch("backend.auth.get_db", return_value=db):
+        return TestClient(app).post("/api/v1/clubs/strathaven/flyability/matrix",
+                                    json=body, headers={"Authorization": "Bearer tok"})
+
+
+@patch("backend.main.get_forecasts")
+def test_matrix_scores_the_fleet_with_one_weather_lookup(mock_get_forecasts, mock_verify_id_token):
+    mock_get_forecasts.side_effect = lambda site_id, intervals: [_forecast(w) for w in (5.0, 17.0, 22.0)]
+
+    resp = _post(_make_db())
+
+    assert resp.status_code == 200
+    data = resp.json()
+    mock_get_forecasts.assert_called_once()
+    assert mock_get_forecasts.call_args[0][0] == "EGPF"
+    assert data["slots"] == ["2026-06-15T09:00:00", "2026-06-15T10:00:00", "2026-06-15T11:00:00"]
+    assert [a["registration"] for a in data["aircraft"]] == ["G-CDEF", "G-EFOX"]
+    assert data["status_codes"] == ["GO", "CHECK", "NO_GO"]
+    # One row shared by the fleet, not one copy per aircraft
+    assert data["status"] == [0, 1, 2]
+    assert data["score"] == [100, 80, 50]
+
+
+@patch("backend.main.get_forecasts")
+def test_matrix_matches_slots_endpoint(mock_get_forecasts, mock_verify_id_token):
+    """The matrix row must agree with /flyability/slots for the same inputs."""
+    from backend.main import app
+    pilot = {"total_hours": 10, "hours_on_type": 2, "max_wind_kt": 12}
+    mock_get_forecasts.side_effect = lambda site_id, intervals: [_forecast(w) for w in (5.0, 10.0, 14.0)]
+
+    matrix = _post(_make_db(), pilot=pilot).json()
+    slots = TestClient(app).post("/api/v1/flyability/slots", json={
+        "site_id": "EGPF",
+        "start": "2026-06-15T09:00:00",
+        "end": "2026-06-15T12:00:00",
+        "pilot": pilot,
+        "aircraft": {"max_demonstrated_crosswind_kt": 15, "min_runway_length_m": 300},
+    }).json()
+
+    assert [matrix["status_codes"][c] for c in matrix["status"]] == [s["status"] for s in slots]
+    assert matrix["score"] == [s["score"] for s in slots]
+
+
+def test_matrix_rejects_non_members(mock_verify_id_token):
+    resp = _post(_make_db(clubs=("other-club",)))
+    assert resp.status_code == 403
+
+
+def test_matrix_needs_a_weather_site(mock_verify_id_token):
+    resp = _post(_make_db(club={"name": "No Station"}))
+    assert resp.status_code == 400
+
+
+def test_matrix_input_bounds(mock_verify_id_token):
+    """Zero-length slots, long ranges and huge slot counts are rejected before any work."""
+    assert _post(_make_db(), slot_duration_minutes=0).status_code == 422
+    assert _post(_make_db(), end="2026-07-15T09:00:00").status_code == 400
+    assert _post(_make_db(), end="2026-06-22T09:00:00", slot_duration_minutes=1).status_code == 400
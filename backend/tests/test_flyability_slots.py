@@ -25,10 +25,15 @@ MOCK_FORECAST = WeatherForecast(
 )
 
 
+def _forecasts_for(forecast):
+    """Stand-in for get_forecasts that returns the same forecast for every interval."""
+    return lambda site_id, intervals: [forecast for _ in intervals]
+
+
 class TestFlyabilitySlots:
     """Tests for /api/v1/flyability/slots endpoint."""
 
-    @patch("backend.main.get_forecast", return_value=MOCK_FORECAST)
+    @patch("backend.main.get_forecasts", side_effect=_forecasts_for(MOCK_FORECAST))
     def test_returns_array_of_slots(self, mock_forecast):
         """3-hour range with 1-hour slots should return 3 slots."""
         from backend.main import app
@@ -51,7 +56,7 @@ class TestFlyabilitySlots:
             assert "start" in slot
             assert "end" in slot
 
-    @patch("backend.main.get_forecast", return_value=MOCK_FORECAST)
+    @patch("backend.main.get_forecasts", side_effect=_forecasts_for(MOCK_FORECAST))
     def test_start_equals_end_returns_empty(self, mock_forecast):
         """start == end should return empty list, not error."""
         from backend.main import app
@@ -67,7 +72,7 @@ class TestFlyabilitySlots:
         assert resp.status_code == 200
         assert resp.json() == []
 
-    @patch("backend.main.get_forecast", return_value=MOCK_FORECAST)
+    @patch("backend.main.get_forecasts", side_effect=_forecasts_for(MOCK_FORECAST))
     def test_short_range_single_slot(self, mock_forecast):
         """30-min range with 60-min slot duration → 1 partial slot."""
         from backend.main import app
@@ -86,7 +91,7 @@ class TestFlyabilitySlots:
         # End should be clamped to request.end, not request.start + 60min
         assert slots[0]["end"] == "2026-06-15T09:30:00"
 
-    @patch("backend.main.get_forecast")
+    @patch("backend.main.get_forecasts")
     def test_windy_slot_returns_no_go(self, mock_forecast):
         """Windy weather should produce NO_GO slots."""
         windy = WeatherForecast(
@@ -94,7 +99,7 @@ class TestFlyabilitySlots:
             cloud_base_ft=3000.0, visibility_m=10000.0,
             precipitation_rate_mm_hr=0.0,
         )
-        mock_forecast.return_value = windy
+        mock_forecast.side_effect = _forecasts_for(windy)
 
         from backend.main import app
         client = TestClient(app)
@@ -110,3 +115,80 @@ class TestFlyabilitySlots:
         slots = resp.json()
         assert len(slots) == 1
         assert slots[0]["status"] == "NO_GO"
+
+    @patch("backend.main.get_forecasts", side_effect=_forecasts_for(MOCK_FORECAST))
+    def test_weather_resolved_once_for_whole_range(self, mock_forecasts):
+        """A full day of hourly slots should cost a single batched weather lookup."""
+        from backend.main import app
+        client = TestClient(app)
+        resp = client.post("/api/v1/flyability/slots", json={
+            "site_id": "SAFE_SITE",
+            "start": "2026-06-15T00:00:00",
+            "end": "2026-06-16T00:00:00",
+            "slot_duration_minutes": 60,
+            "pilot": {"total_hours": 100, "hours_on_type": 20},
+            "aircraft": {"max_demonstrated_crosswind_kt": 15, "min_runway_length_m": 300},
+        })
+        assert resp.status_code == 200
+        assert len(resp.json()) == 24
+        assert mock_forecasts.call_count == 1
+        _, intervals = mock_forecasts.call_args.args
+        assert len(intervals) == 24
+
+
+class TestFlyabilitySlotsStreaming:
+    """NDJSON streaming mode of /api/v1/flyability/slots."""
+
+    BODY = {
+        "site_id": "SAFE_SITE",
+        "start": "2026-06-01T00:00:00",
+        "end": "2026-07-01T00:00:00",
+        "slot_duration_minutes": 15,
+        "pilot": {"total_hours": 100, "hours_on_type": 20},
+        "aircraft": {"max_demonstrated_crosswind_kt": 15, "min_runway_length_m": 300},
+    }
+
+    @patch("backend.main.get_forecast_resolver")
+    def test_streams_one_json_object_per_slot(self, mock_resolver):
+        import json
+        mock_resolver.return_value = lambda t0, t1: MOCK_FORECAST
+        from backend.main import app
+        client = TestClient(app)
+
+        with client.stream("POST", "/api/v1/flyability/slots", json=self.BODY,
+                           headers={"Accept": "application/x-ndjson"}) as resp:
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+        # 30 days of 15-minute slots, weather loaded once
+        assert len(lines) == 30 * 96
+        mock_resolver.assert_called_once()
+        assert lines[0]["start"] == "2026-06-01T00:00:00"
+        assert lines[-1]["end"] == "2026-07-01T00:00:00"
+        assert all(line["status"] == "GO" for line in lines)
+
+    @patch("backend.main.get_forecast_resolver")
+    @patch("backend.main.get_forecasts", side_effect=_forecasts_for(MOCK_FORECAST))
+    def test_stream_matches_json_list(self, mock_forecasts, mock_resolver):
+        import json
+        mock_resolver.return_value = lambda t0, t1: MOCK_FORECAST
+        from backend.main import app
+        client = TestClient(app)
+        body = {**self.BODY, "end": "2026-06-01T03:10:00"}
+
+        listed = client.post("/api/v1/flyability/slots", json=body).json()
+        streamed = client.post("/api/v1/flyability/slots", json=body,
+                               headers={"Accept": "application/x-ndjson"})
+
+        assert [json.loads(line) for line in streamed.text.splitlines()] == listed
+
+    @patch("backend.main.get_forecast_resolver")
+    def test_empty_range_streams_nothing(self, mock_resolver):
+        mock_resolver.return_value = lambda t0, t1: MOCK_FORECAST
+        from backend.main import app
+        body = {**self.BODY, "end": self.BODY["start"]}
+        resp = TestClient(app).post("/api/v1/flyability/slots", json=body,
+                                    headers={"Accept": "application/x-ndjson"})
+        assert resp.status_code == 200
+        assert resp.text == ""
@@ -0,0 +1,129 @@
+"""Tests for TAF ingestion into a per-site ForecastTimeline."""
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from backend.integrations import weather
+from backend.integrations.timeline import ForecastTimeline, to_epoch
+from backend.schemas import WeatherForecast
+
+
+def _t(hour: int) -> datetime:
+    return datetime(2026, 6, 15, hour, 0)
+
+
+def _ts(hour: int) -> int:
+    return to_epoch(_t(hour))
+
+
+# EGPF 150500Z 1506/1612 24010KT 9999 BKN035
+#   TEMPO 1509/1512 24018G28KT 4000 RA BKN012
+#   BECMG 1514/1516 30015KT
+#   FM151800 31008KT 9999 SCT040
+TAF = {
+    "icaoId": "EGPF",
+    "validTimeFrom": _ts(6),
+    "validTimeTo": _ts(12) + 24 * 3600,
+    "fcsts": [
+        {"timeFrom": _ts(6), "timeTo": _ts(18), "fcstChange": None, "wspd": 10, "wgst": None,
+         "visib": "6+", "clouds": [{"cover": "BKN", "base": 3500}], "wxString": None},
+        {"timeFrom": _ts(9), "timeTo": _ts(12), "fcstChange": "TEMPO", "wspd": 18, "wgst": 28,
+         "visib": 2.5, "clouds": [{"cover": "BKN", "base": 1200}], "wxString": "RA"},
+        {"timeFrom": _ts(14), "timeTo": _ts(18), "timeBec": _ts(16), "fcstChange": "BECMG",
+         "wspd": 15, "wgst": None, "visib": None, "clouds": [], "wxString": None},
+        {"timeFrom": _ts(18), "timeTo": _ts(12) + 24 * 3600, "fcstChange": "FM", "wspd": 8,
+         "wgst": None, "visib": "6+", "clouds": [{"cover": "SCT", "base": 4000}], "wxString": None},
+    ],
+}
+
+SNAPSHOT = WeatherForecast(wind_speed_kt=6.0, gust_speed_kt=0.0, cloud_base_ft=4500.0,
+                           visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+
+
+def _site():
+    return weather.SiteWeather(SNAPSHOT, weather._parse_taf(TAF))
+
+
+def test_base_period_used_outside_change_groups():
+    forecast = _site().forecast_for(_t(7), _t(8))
+    assert forecast.wind_speed_kt == 10.0
+    assert forecast.cloud_base_ft == 3500.0
+
+
+def test_tempo_overlay_is_worst_case():
+    forecast = _site().forecast_for(_t(10), _t(11))
+    assert forecast.wind_speed_kt == 18.0
+    assert forecast.gust_speed_kt == 28.0
+    assert forecast.cloud_base_ft == 1200.0
+    assert forecast.visibility_m < 5000
+    assert forecast.precipitation_rate_mm_hr > 0
+
+
+def test_slot_spanning_periods_aggregates_worst_case():
+    """08:00-10:00 straddles the TEMPO start, so it gets the TEMPO conditions."""
+    forecast = _site().forecast_for(_t(8), _t(10))
+    assert forecast.gust_speed_kt == 28.0
+
+
+def test_becmg_transition_and_after():
+    site = _site()
+    assert site.forecast_for(_t(15), _t(15)).wind_speed_kt == 15.0   # transitioning: worst of 10/15
+    assert site.forecast_for(_t(16), _t(17)).wind_speed_kt == 15.0   # settled
+    assert site.forecast_for(_t(16), _t(17)).cloud_base_ft == 3500.0  # unchanged by BECMG
+
+
+def test_fm_replaces_conditions():
+    forecast = _site().forecast_for(_t(19), _t(20))
+    assert forecast.wind_speed_kt == 8.0
+    assert forecast.cloud_base_ft == 4000.0
+
+
+def test_range_outside_taf_falls_back_to_snapshot():
+    assert _site().forecast_for(_t(2), _t(3)) == SNAPSHOT
+
+
+def test_partially_covered_range_includes_snapshot():
+    forecast = _site().forecast_for(_t(5), _t(7))
+    assert forecast.wind_speed_kt == 10.0          # TAF is windier than the METAR
+    assert forecast.cloud_base_ft == 3500.0
+
+
+def test_timeline_round_trips_through_firestore_dict():
+    timeline = weather._parse_taf(TAF)
+    restored = ForecastTimeline.from_dict(timeline.to_dict())
+    assert restored.to_dict() == timeline.to_dict()
+    assert list(restored.bounds) == sorted(restored.bounds)
+
+
+def test_lookup_is_binary_search_over_segments():
+    timeline = weather._parse_taf(TAF)
+    conditions, covered = timeline.lookup(_t(13), _t(14))
+    assert covered
+    assert conditions["wind"] == 10.0
+
+
+def test_get_forecasts_uses_stored_timeline():
+    weather._forecast_cache.clear()
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = {
+        "forecast": SNAPSHOT.model_dump(),
+        "timeline": weather._parse_taf(TAF).to_dict(),
+    }
+    mock_db = MagicMock()
+    mock_db.collection.return_value.document.return_value.get.return_value = mock_doc
+
+    with patch("backend.integrations.weather.get_db", return_value=mock_db):
+        calm, tempo = asyncio.run(
+            weather.get_forecasts("EGPF", [(_t(7), _t(8)), (_t(10), _t(11))], mock=False)
+        )
+
+    assert calm.gust_speed_kt == 0.0
+    assert tempo.gust_speed_kt == 28.0
+    weather._forecast_cache.clear()
+
+
+def test_metar_and_taf_cloud_bases_share_units():
+    """The METAR snapshot and TAF periods of one SiteWeather both report bases in feet."""
+    obs = {"icaoId": "EGPF", "wspd": 10, "visib": "6+", "clouds": [{"cover": "BKN", "base": 3500}]}
+    assert weather._parse_metar_obs(obs).cloud_base_ft == _site().forecast_for(_t(7), _t(8)).cloud_base_ft == 3500.0
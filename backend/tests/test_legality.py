@@ -148,3 +148,137 @@ class TestIsSlotLegal:
         result = is_slot_legal(pilot, "C42")
         assert result["legal"] is False
         assert "rating" in result["reason"].lower()
+
+
+# --- Logbook Index ---
+
+class TestLogbookIndex:
+    LOGBOOK = [
+        {"date": "2025-06-01T10:00:00", "hours_pic": 2.5, "instruction": 1, "to_landings": 4},
+        {"date": "2024-01-10", "hours_pic": 1.0, "instruction": 0, "to_landings": 2},
+        {"date": "2026-03-15T16:30:00", "hours_pic": 3.0, "instruction": 0.5, "to_landings": 5},
+    ]
+
+    def test_window_totals_include_boundary_days(self):
+        from backend.legality import LogbookIndex
+        index = LogbookIndex(self.LOGBOOK)
+        first = datetime(2024, 1, 10).toordinal()
+        last = datetime(2025, 6, 1).toordinal()
+        assert index.totals(first, last) == (3.5, 1.0, 6)
+        assert index.totals(first + 1, last - 1) == (0.0, 0.0, 0)
+
+    def test_recency_window_is_730_days(self):
+        from backend.legality import LogbookIndex
+        index = LogbookIndex(self.LOGBOOK)
+        slot_day = datetime(2026, 1, 9).toordinal()  # 730 days after 2024-01-10
+        assert index.recency_totals(slot_day) == (3.5, 1.0, 6)
+        assert index.recency_totals(slot_day + 1) == (2.5, 1.0, 4)
+
+    def test_many_small_entries_sum_exactly(self):
+        """120 x 0.1h must reach the 12h threshold, not 11.999..."""
+        from backend.legality import LogbookIndex
+        start = datetime(2025, 1, 1)
+        index = LogbookIndex([
+            {"date": (start + timedelta(days=i)).isoformat(), "hours_pic": 0.1, "instruction": 0, "to_landings": 1}
+            for i in range(120)
+        ])
+        pic, _, landings = index.recency_totals((start + timedelta(days=200)).toordinal())
+        assert pic >= 12
+        assert landings == 120
+
+    def test_reused_index_matches_default(self):
+        from backend.legality import LogbookIndex
+        pilot = {
+            "licence_type": "NPPL(A)",
+            "total_hours": 50,
+            "supervised_solo_hours": 15,
+            "ratings": ["Microlight"],
+            "logbook": make_logbook(hours_pic=15, instruction=2, to_landings=15, days_ago=400),
+        }
+        index = LogbookIndex.for_pilot(pilot)
+        for days_ahead in (0, 200, 400):
+            slot = (datetime.now() + timedelta(days=days_ahead)).isoformat()
+            assert is_slot_legal(pilot, "C42", slot, logbook_index=index) == is_slot_legal(pilot, "C42", slot)
+        assert is_slot_legal(pilot, "C42", (datetime.now() + timedelta(days=400)).isoformat(),
+                             logbook_index=index)["legal"] is False
+
+
+# --- Legality Timeline ---
+
+class TestLegalityTimeline:
+    @staticmethod
+    def _pilot(**extra):
+        return {
+            "licence_type": "NPPL(A)",
+            "total_hours": 50,
+            "supervised_solo_hours": 15,
+            "ratings": ["Microlight"],
+            "logbook": [
+                {"date": "2025-01-10", "hours_pic": 8, "instruction": 1, "to_landings": 6},
+                {"date": "2025-09-01T14:00:00", "hours_pic": 5, "instruction": 0.5, "to_landings": 8},
+            ],
+            **extra,
+        }
+
+    def test_verdicts_match_is_slot_legal(self):
+        from backend.legality import legality_timeline
+        pilot = self._pilot(medical_expiry="2027-03-01")
+        start = datetime(2026, 12, 1)
+        dates = [(start + timedelta(days=i)).date().isoformat() for i in range(120)]
+        details = {"permit_expiry": "2027-02-15"}
+
+        result = legality_timeline(pilot, "C42", list(reversed(dates)), details)
+
+        for verdict in result["verdicts"]:
+            expected = is_slot_legal(pilot, "C42", verdict["date"], details)
+            assert {k: v for k, v in verdict.items() if k != "date"} == expected, verdict["date"]
+
+    def test_reports_exact_recency_lapse(self):
+        from backend.legality import legality_timeline
+        pilot = self._pilot()
+        result = legality_timeline(pilot, "C42", ["2026-06-01"])
+
+        # The 2025-01-10 entry leaves the 730-day window after 2027-01-10
+        assert result["lapses_on"] == "2027-01-11"
+        assert result["lapse_reason"] == "Recency requirements not met"
+        assert is_slot_legal(pilot, "C42", "2027-01-10")["legal"] is True
+        assert is_slot_legal(pilot, "C42", "2027-01-11")["legal"] is False
+
+    def test_medical_expiry_is_a_breakpoint(self):
+        from backend.legality import legality_timeline
+        result = legality_timeline(self._pilot(medical_expiry="2026-08-01"), "C42", ["2026-06-01"])
+        assert result["lapses_on"] == "2026-08-02"
+        assert "Medical" in result["lapse_reason"]
+
+    def test_already_illegal_lapses_on_first_date(self):
+        from backend.legality import legality_timeline
+        result = legality_timeline(self._pilot(ratings=[]), "C42", ["2026-06-01", "2026-06-02"])
+        assert result["lapses_on"] == "2026-06-01"
+        assert all(v["legal"] is False for v in result["verdicts"])
+
+    def test_endpoint_expands_day_range(self):
+        from fastapi.testclient import TestClient
+        from backend.main import app
+        resp = TestClient(app).post("/api/v1/legality/timeline", json={
+            "pilot": self._pilot(), "start": "2026-06-01", "days": 90,
+        })
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["verdicts"]) == 90
+        assert body["verdicts"][-1]["date"] == "2026-08-29"
+        assert body["lapses_on"] == "2027-01-11"
+
+    def test_endpoint_rejects_bad_dates(self):
+        from fastapi.testclient import TestClient
+        from backend.main import app
+        client = TestClient(app)
+        assert client.post("/api/v1/legality/timeline", json={
+            "pilot": self._pilot(), "dates": ["not-a-date"],
+        }).status_code == 400
+        # days is bounded before any dates are built
+        assert client.post("/api/v1/legality/timeline", json={
+            "pilot": self._pilot(), "days": 3000000,
+        }).status_code == 422
+        assert client.post("/api/v1/legality/timeline", json={
+            "pilot": self._pilot(), "start": "9999-12-30", "days": 5,
+        }).status_code == 400
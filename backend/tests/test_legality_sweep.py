@@ -0,0 +1,131 @@
+"""Tests for the nightly club-wide legality sweep."""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+from backend.analytics import legality_sweep
+
+AS_OF = date(2026, 6, 1)
+
+
+def _profile(i, current=True, medical="2027-01-01"):
+    return {
+        "email": f"pilot{i}@test.com",
+        "licence_type": "NPPL(A)",
+        "total_hours": 50,
+        "supervised_solo_hours": 15,
+        "ratings": ["Microlight"],
+        "medical_expiry": medical,
+        "logbook": [{"date": "2026-01-01", "hours_pic": 15 if current else 3, "instruction": 2, "to_landings": 15}],
+    }
+
+
+def _make_db(profiles, fleet=()):
+    db = MagicMock()
+    user_docs = []
+    for uid, profile in profiles:
+        doc = MagicMock(id=uid)
+        doc.to_dict.return_value = profile
+        user_docs.append(doc)
+    fleet_docs = []
+    for fleet_id, data in fleet:
+        doc = MagicMock(id=fleet_id)
+        doc.to_dict.return_value = data
+        fleet_docs.append(doc)
+
+    def collection_router(name):
+        coll = MagicMock()
+        if name == "users":
+            coll.where.return_value.stream.side_effect = lambda: iter(user_docs)
+        elif name == "clubs":
+            club_ref = coll.document.return_value
+            club_ref.collection.side_effect = lambda sub: fleet_coll if sub == "fleet" else reports_coll
+        return coll
+
+    fleet_coll = MagicMock()
+    fleet_coll.stream.return_value = fleet_docs
+    reports_coll = MagicMock()
+    db.collection.side_effect = collection_router
+    db.reports = reports_coll
+    return db
+
+
+def test_evaluate_members_reports_status_and_lapse():
+    results = legality_sweep.evaluate_members(
+        [("u1", _profile(1)), ("u2", _profile(2, current=False)), ("u3", {"logbook": None})],
+        AS_OF.isoformat(),
+    )
+    assert [r["legal"] for r in results] == [True, False, False]
+    assert results[0]["lapses_on"] == "2027-01-02"  # day after medical expiry, before recency lapses
+    assert results[1]["reason"] == "Recency requirements not met"
+    assert results[2]["reason"] == "Invalid licence mins"
+
+
+def test_sweep_club_uses_process_pool_and_pages_members():
+    profiles = [(f"u{i}", _profile(i, current=i % 3 != 0, medical="2026-06-20" if i == 1 else "2027-01-01"))
+                for i in range(600)]
+    fleet = [("g-cdef", {"registration": "G-CDEF", "permit_expiry": "2026-05-01"}),
+             ("g-efox", {"registration": "G-EFOX", "permit_expiry": "2027-05-01"})]
+    db = _make_db(profiles, fleet)
+
+    async def run():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await legality_sweep.sweep_club("strathaven", executor, as_of=AS_OF)
+
+    report_ref = db.reports.document.return_value
+    pages_coll = report_ref.collection.return_value
+    leftover = MagicMock(id="0005")  # from an earlier, larger run
+    pages_coll.stream.return_value = [leftover]
+
+    with patch("backend.analytics.legality_sweep.get_db", return_value=db), \
+         patch.object(legality_sweep, "SWEEP_CHUNK_SIZE", 100), \
+         patch.object(legality_sweep, "MEMBER_PAGE_SIZE", 250):
+        report = asyncio.run(run())
+
+    assert report["member_count"] == 600
+    assert report["current_count"] == 400
+    assert report["medical_expiring_count"] == 1
+    assert report["permit_expiring_count"] == 1
+    assert [a["status"] for a in report["fleet"]] == ["expired", "ok"]
+    # Not-current members sort first
+    assert report["members"][0]["legal"] is False
+    db.reports.document.assert_called_once_with("legality")
+    summary = report_ref.set.call_args.args[0]
+    assert "members" not in summary
+    assert summary["member_page_count"] == 3
+    page_writes = [c.args[1] for c in db.batch.return_value.set.call_args_list]
+    assert [len(p["members"]) for p in page_writes] == [250, 250, 100]
+    assert page_writes[0]["members"] == report["members"][:250]
+    db.batch.return_value.delete.assert_called_once_with(leftover.reference)
+
+
+def test_only_one_instance_claims_the_nightly_sweep():
+    db = MagicMock()
+    lease = {}
+    lease_ref = db.collection.return_value.document.return_value
+
+    def get(transaction=None):
+        snap = MagicMock(exists=bool(lease))
+        snap.to_dict.return_value = dict(lease)
+        return snap
+
+    lease_ref.get.side_effect = get
+    db.transaction.return_value.set.side_effect = lambda ref, data: lease.update(data)
+
+    with patch("backend.analytics.legality_sweep.get_db", return_value=db):
+        assert legality_sweep._claim_sweep("2026-06-01", "a") is True
+        assert legality_sweep._claim_sweep("2026-06-01", "b") is False
+        # A run that started long ago and never finished can be taken over
+        lease["leased_at"] = datetime.utcnow().replace(year=2020)
+        assert legality_sweep._claim_sweep("2026-06-01", "b") is True
+        lease["status"] = "done"
+        assert legality_sweep._claim_sweep("2026-06-01", "c") is False
+        assert legality_sweep._claim_sweep("2026-06-02", "c") is True
+
+
+def test_next_run_is_tonight_or_tomorrow():
+    before = datetime(2026, 6, 1, 1, 30)
+    after = datetime(2026, 6, 1, 3, 0)
+    assert legality_sweep._seconds_until_next_run(before) == 30 * 60
+    assert legality_sweep._seconds_until_next_run(after) == 23 * 3600
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+from unittest.mock import patch
+
+import httpx
+
+from backend.integrations import metar_bulk, weather
+
+HEADER = (
+    "raw_text,station_id,observation_time,latitude,longitude,temp_c,dewpoint_c,"
+    "wind_dir_degrees,wind_speed_kt,wind_gust_kt,visibility_statute_mi,altim_in_hg,"
+    "sky_cover,cloud_base_ft_agl,sky_cover,cloud_base_ft_agl,flight_category"
+)
+
+ROWS = [
+    "EGPF 171150Z 24012G22KT 9999 BKN012 12/08 Q1010,EGPF,2026-10-17T11:50:00Z,55.87,-4.43,12,8,240,12,22,10+,29.83,FEW,800,BKN,1200,MVFR",
+    "EGPH 171150Z 25008KT 3000 OVC030 11/09 Q1011,EGPH,2026-10-17T11:50:00Z,55.95,-3.37,11,9,250,8,,1.86,29.85,OVC,3000,,,VFR",
+    # An older report for EGPF further down the file must be ignored
+    "EGPF 171120Z 24030KT CAVOK 12/08 Q1010,EGPF,2026-10-17T11:20:00Z,55.87,-4.43,12,8,240,30,,10+,29.83,CLR,,,,VFR",
+    "KJFK 171151Z 31010KT 10SM FEW250 15/03 A3012,KJFK,2026-10-17T11:51:00Z,40.64,-73.76,15,3,310,10,,10+,30.12,FEW,25000,,,VFR",
+]
+
+
+def _cache_file_bytes(rows=ROWS):
+    text = "\n".join(["No errors", "No warnings", "4 ms", "data source=metars", f"{len(rows)} results", HEADER, *rows]) + "\n"
+    return gzip.compress(text.encode())
+
+
+def test_ingest_keeps_first_report_for_wanted_stations(tmp_path):
+    path = tmp_path / "metars.cache.csv.gz"
+    path.write_bytes(_cache_file_bytes())
+
+    forecasts = metar_bulk.ingest_metar_file(str(path), {"EGPF", "EGPH"})
+
+    assert set(forecasts) == {"EGPF", "EGPH"}
+    egpf = forecasts["EGPF"]
+    assert egpf.wind_speed_kt == 12.0
+    assert egpf.gust_speed_kt == 22.0
+    assert egpf.cloud_base_ft == 1200.0  # lowest BKN/OVC layer, FEW ignored
+    assert egpf.visibility_m == 9999
+    assert forecasts["EGPH"].gust_speed_kt == 0.0
+    assert forecasts["EGPH"].cloud_base_ft == 3000.0
+    assert round(forecasts["EGPH"].visibility_m) == 2993
+
+
+def test_rows_split_across_chunks(tmp_path):
+    """Lines straddling a read boundary must be reassembled."""
+    path = tmp_path / "metars.cache.csv.gz"
+    path.write_bytes(_cache_file_bytes())
+
+    with patch.object(metar_bulk, "READ_CHUNK_BYTES", 7):
+        chunks = list(metar_bulk.iter_file_chunks(str(path), metar_bulk.READ_CHUNK_BYTES))
+    parser = metar_bulk.MetarCsvParser({"KJFK"})
+    decoder = metar_bulk._GzipLineDecoder()
+    for chunk in chunks:
+        parser.feed(decoder.feed(chunk))
+    parser.feed(decoder.flush())
+
+    assert len(chunks) > 10
+    assert parser.forecasts["KJFK"].wind_speed_kt == 10.0
+
+
+async def _chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_fetch_bulk_metars_streams_and_defaults_missing():
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, content=_chunked(_cache_file_bytes(), 64))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await metar_bulk.fetch_bulk_metars(client, {"EGPH", "EGZZ"})
+
+    forecasts = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert str(requests[0]) == metar_bulk.METARS_CACHE_URL
+    assert forecasts["EGPH"].wind_speed_kt == 8.0
+    assert forecasts["EGZZ"] == weather._get_default_forecast()
+
+
+def test_updater_falls_back_when_bulk_download_fails():
+    def handler(request):
+        if "cache" in request.url.path:
+            return httpx.Response(503)
+        return httpx.Response(200, json=[{"icaoId": "EGPF", "wspd": 5, "clouds": []}])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await weather._fetch_metars(client, {"EGPF"})
+
+    with patch.object(weather, "BULK_METAR_INGEST", True):
+        forecasts = asyncio.run(run())
+
+    assert forecasts["EGPF"].wind_speed_kt == 5.0
@@ -0,0 +1,98 @@
+"""Tests for the next-flyable-window search."""
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from backend.flyability import compile_envelope, find_flyable_windows
+from backend.integrations.timeline import ForecastTimeline, to_epoch
+from backend.integrations.weather import SiteWeather
+from backend.schemas import WeatherForecast, PilotProfile, AircraftProfile, SurfaceCondition
+
+BASE = datetime(2026, 6, 15)
+CALM = {"wind": 5.0, "gust": 8.0, "cloud": 4000.0, "vis": 9999.0, "precip": 0.0}
+WINDY = {**CALM, "wind": 25.0}
+
+PILOT = PilotProfile(total_hours=100, hours_on_type=20)
+AIRCRAFT = AircraftProfile(max_demonstrated_crosswind_kt=15, min_runway_length_m=300)
+ENVELOPE = compile_envelope(PILOT, AIRCRAFT)
+
+
+def _t(hour):
+    return BASE + timedelta(hours=hour)
+
+
+def _site():
+    """Windy until 06, calm with a windy TEMPO 10-12, windy again from 18; TAF ends at 24."""
+    timeline = ForecastTimeline.build(
+        to_epoch(_t(0)), to_epoch(_t(24)), WINDY,
+        [(to_epoch(_t(6)), to_epoch(_t(6)), "FM", CALM),
+         (to_epoch(_t(18)), to_epoch(_t(18)), "FM", WINDY)],
+        [(to_epoch(_t(10)), to_epoch(_t(12)), {"wind": 25.0})],
+    )
+    snapshot = WeatherForecast(wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+                               visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+    return SiteWeather(snapshot, timeline)
+
+
+def _search(periods, minutes=60, limit=5):
+    return find_flyable_windows(periods, ENVELOPE, SurfaceCondition.DRY, timedelta(minutes=minutes), limit)
+
+
+def test_periods_follow_timeline_then_snapshot():
+    periods = list(_site().iter_periods(_t(-2), _t(30)))
+    assert [(p[0], p[1]) for p in periods] == [
+        (_t(-2), _t(0)), (_t(0), _t(6)), (_t(6), _t(10)), (_t(10), _t(12)),
+        (_t(12), _t(18)), (_t(18), _t(24)), (_t(24), _t(30)),
+    ]
+    assert periods[1][2].wind_speed_kt == 25.0
+    assert periods[-1][2].wind_speed_kt == 5.0
+
+
+def test_finds_go_windows_and_merges_adjacent_periods():
+    windows = _search(_site().iter_periods(_t(0), _t(48)))
+    # 24-48 is past the TAF, answered from the (calm) observation
+    assert windows == [(_t(6), _t(10)), (_t(12), _t(18)), (_t(24), _t(48))]
+
+
+def test_min_duration_skips_short_windows():
+    windows = _search(_site().iter_periods(_t(7), _t(20)), minutes=4 * 60)
+    assert windows == [(_t(12), _t(18))]
+
+
+def test_stops_walking_once_enough_windows_found():
+    consumed = []
+
+    def periods():
+        for period in _site().iter_periods(_t(0), _t(48)):
+            consumed.append(period)
+            yield period
+
+    assert _search(periods(), limit=1) == [(_t(6), _t(10))]
+    # Needed the TEMPO period to close the first window, but nothing after it
+    assert len(consumed) == 3
+
+
+def _post(**overrides):
+    from backend.main import app
+    body = {
+        "site_id": "SAFE_SITE",
+        "start": "2026-06-15T09:00:00",
+        "horizon_hours": 24,
+        "pilot": {"total_hours": 100, "hours_on_type": 20},
+        "aircraft": {"max_demonstrated_crosswind_kt": 15, "min_runway_length_m": 300},
+        **overrides,
+    }
+    return TestClient(app).post("/api/v1/flyability/next-window", json=body)
+
+
+def test_endpoint_returns_windows():
+    resp = _post()
+    assert resp.status_code == 200
+    assert resp.json()["windows"] == [
+        {"start": "2026-06-15T09:00:00", "end": "2026-06-16T09:00:00", "duration_minutes": 1440},
+    ]
+    assert _post(site_id="WINDY_SITE").json()["windows"] == []
+
+
+def test_endpoint_validates_limits():
+    assert _post(horizon_hours=0).status_code == 400
+    assert _post(count=1000).status_code == 400
+    assert _post(min_duration_minutes=0).status_code == 400
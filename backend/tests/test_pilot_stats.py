@@ -0,0 +1,221 @@
+"""Tests for backend.pilot_stats — denormalized booking counters for admission."""
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+
+from backend import pilot_stats
+
+NOW = datetime(2027, 3, 1, 12, 0)
+
+
+def _snapshot(data):
+    snap = MagicMock()
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+class TestNormalize:
+    def test_started_bookings_roll_into_last_flown(self):
+        stats = pilot_stats.normalize_stats({
+            "upcoming": {
+                "past": NOW - timedelta(days=2),
+                "future": (NOW + timedelta(days=1)).replace(tzinfo=timezone.utc),
+            },
+            "last_flown_at": NOW - timedelta(days=30),
+        }, NOW)
+
+        assert stats["upcoming"] == {"future": NOW + timedelta(days=1)}
+        assert stats["active_future_count"] == 1
+        assert stats["last_flown_at"] == NOW - timedelta(days=2)
+
+    def test_with_and_without_booking(self):
+        stats = pilot_stats.normalize_stats({}, NOW)
+        stats = pilot_stats.with_booking(stats, "bk_1", NOW + timedelta(hours=2), NOW)
+        assert stats["active_future_count"] == 1
+
+        cancelled = pilot_stats.without_booking(stats, "bk_1", NOW)
+        assert cancelled["active_future_count"] == 0
+        assert cancelled["last_flown_at"] is None
+
+        flown = pilot_stats.without_booking(stats, "bk_1", NOW + timedelta(hours=4), flown_at=NOW + timedelta(hours=2))
+        assert flown["last_flown_at"] == NOW + timedelta(hours=2)
+
+
+class TestAdmissionStats:
+    def test_point_read_when_stats_exist(self):
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = _snapshot({
+            "upcoming": {"a": NOW + timedelta(days=1), "b": NOW + timedelta(days=2)},
+            "last_flown_at": NOW - timedelta(days=5),
+        })
+
+        assert pilot_stats.admission_stats(db, "pilot_123", NOW) == (2, NOW - timedelta(days=5))
+        db.collection.return_value.where.assert_not_called()
+
+    def test_falls_back_to_scan_without_stats(self):
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = _snapshot(None)
+        query = db.collection.return_value.where.return_value
+        query.where.return_value = query
+        docs = []
+        for doc_id, start in (("past", NOW - timedelta(days=10)), ("next", NOW + timedelta(days=3))):
+            doc = MagicMock()
+            doc.id = doc_id
+            doc.to_dict.return_value = {"start_time": start}
+            docs.append(doc)
+        query.stream.return_value = docs
+
+        assert pilot_stats.admission_stats(db, "pilot_123", NOW) == (1, NOW - timedelta(days=10))
+
+    def test_scan_leaves_out_series_bookings(self):
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = _snapshot(None)
+        query = db.collection.return_value.where.return_value
+        query.where.return_value = query
+        docs = []
+        for doc_id, series_id in (("own", None), ("lesson_1", "s1"), ("lesson_2", "s1")):
+            doc = MagicMock()
+            doc.id = doc_id
+            doc.to_dict.return_value = {"start_time": NOW + timedelta(days=3), "series_id": series_id}
+            docs.append(doc)
+        query.stream.return_value = docs
+
+        assert pilot_stats.admission_stats(db, "pilot_123", NOW) == (1, None)
+
+
+class TestCloseBooking:
+    def test_cancel_updates_stats_in_transaction(self):
+        db = MagicMock()
+        booking_ref = MagicMock()
+        booking_ref.id = "bk_1"
+        booking_ref.get.return_value = _snapshot({"pilot_uid": "pilot_123", "status": "confirmed"})
+        db.collection.return_value.document.return_value.get.return_value = _snapshot({
+            "upcoming": {"bk_1": datetime.utcnow() + timedelta(days=1)},
+        })
+        transaction = db.transaction.return_value
+
+        pilot_stats.close_booking(db, booking_ref, {"status": "cancelled"})
+
+        transaction.update.assert_called_once_with(booking_ref, {"status": "cancelled"})
+        written = transaction.set.call_args[0][1]
+        assert written["upcoming"] == {}
+        assert written["active_future_count"] == 0
+
+    def test_cancel_after_start_does_not_count_as_flown(self):
+        db = MagicMock()
+        booking_ref = MagicMock()
+        booking_ref.id = "bk_1"
+        booking_ref.get.return_value = _snapshot({"pilot_uid": "pilot_123", "status": "confirmed"})
+        last_flown = datetime.utcnow() - timedelta(days=30)
+        db.collection.return_value.document.return_value.get.return_value = _snapshot({
+            "upcoming": {"bk_1": datetime.utcnow() - timedelta(hours=1)},
+            "last_flown_at": last_flown,
+        })
+
+        pilot_stats.close_booking(db, booking_ref, {"status": "cancelled"})
+
+        written = db.transaction.return_value.set.call_args[0][1]
+        assert written["upcoming"] == {}
+        assert written["last_flown_at"] == last_flown
+
+    def test_already_closed_booking_leaves_stats_alone(self):
+        db = MagicMock()
+        booking_ref = MagicMock()
+        booking_ref.get.return_value = _snapshot({"pilot_uid": "pilot_123", "status": "cancelled"})
+
+        pilot_stats.close_booking(db, booking_ref, {"status": "cancelled"})
+
+        db.transaction.return_value.set.assert_not_called()
+
+
+class TestCreateBookingAdmission:
+    @pytest.fixture(autouse=True)
+    def mock_auth(self):
+        from backend import booking_index
+        booking_index._index.clear()
+        with patch("backend.auth.firebase_admin") as mock_admin, \
+             patch("backend.auth.firebase_auth.verify_id_token", return_value={"uid": "pilot_123"}), \
+             patch("backend.auth.get_user_profile", return_value={"role": "pilot"}):
+            mock_admin.exceptions = MagicMock()
+            mock_admin.exceptions.FirebaseError = Exception
+            import backend.auth
+            backend.auth._app = None
+            yield
+        booking_index._index.clear()
+
+    def _post(self):
+        from backend.main import app
+        start = (datetime.utcnow() + timedelta(days=2)).replace(microsecond=0)
+        return TestClient(app).post(
+            "/api/v1/bookings/",
+            json={"club_slug": "strathaven", "aircraft_reg": "G-CDEF",
+                  "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat()},
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+    def _stats(self, mock_get_db, data):
+        mock_get_db.collection.return_value.where.return_value.where.return_value.where.return_value.stream.return_value = []
+        mock_get_db.collection.return_value.where.return_value.where.return_value.where.return_value.where.return_value.get.return_value = []
+        mock_get_db.collection.return_value.document.return_value.id = "bk_new"
+        mock_get_db.collection.return_value.document.return_value.get.return_value = _snapshot(data)
+
+    def test_limit_enforced_from_stats_doc(self, mock_get_db):
+        future = datetime.utcnow() + timedelta(days=5)
+        self._stats(mock_get_db, {"upcoming": {"a": future, "b": future, "c": future}})
+
+        response = self._post()
+
+        assert response.status_code == 403
+        assert "Booking limit" in response.json()["detail"]
+
+    def test_recent_flight_admits_and_counts_new_booking(self, mock_get_db):
+        self._stats(mock_get_db, {"upcoming": {}, "last_flown_at": datetime.utcnow() - timedelta(days=10)})
+
+        response = self._post()
+
+        assert response.status_code == 200
+        stats_writes = [c[0][1] for c in mock_get_db.transaction.return_value.set.call_args_list
+                        if "active_future_count" in c[0][1]]
+        assert stats_writes[0]["active_future_count"] == 1
+
+    def test_stale_recency_rejected(self, mock_get_db):
+        self._stats(mock_get_db, {"upcoming": {}, "last_flown_at": datetime.utcnow() - timedelta(days=90)})
+
+        response = self._post()
+
+        assert response.status_code == 403
+        assert "Recency check failed" in response.json()["detail"]
+
+    def test_lapsed_legal_until_rejected(self, mock_get_db):
+        self._stats(mock_get_db, {"upcoming": {}, "last_flown_at": datetime.utcnow() - timedelta(days=10)})
+        lapsed = (datetime.utcnow() - timedelta(days=1)).date().isoformat()
+
+        profile = {"role": "pilot", "licence_type": "NPPL(A)", "total_hours": 50, "ratings": ["Microlight"],
+                   "legal_until": lapsed, "legal_until_computed": True}
+
+        with patch("backend.auth.get_user_profile", return_value=profile):
+            response = self._post()
+
+        assert response.status_code == 403
+        assert "Legality check failed" in response.json()["detail"]
+
+    def test_medical_update_without_licence_data_still_books(self, mock_get_db):
+        from backend.main import app
+        profile = {"role": "pilot"}
+        users_db = MagicMock()
+        users_db.collection.return_value.document.return_value.get.return_value = _snapshot(profile)
+        with patch("backend.users.get_db", return_value=users_db), patch("backend.logger.log_event"):
+            updated = TestClient(app).put(
+                "/api/v1/users/me/profile", json={"medical_expiry": "2027-06-01"},
+                headers={"Authorization": "Bearer valid_token"},
+            )
+        assert updated.status_code == 200
+        profile.update(users_db.transaction.return_value.set.call_args[0][1])
+        self._stats(mock_get_db, {"upcoming": {}, "last_flown_at": datetime.utcnow() - timedelta(days=10)})
+
+        with patch("backend.auth.get_user_profile", return_value=profile):
+            response = self._post()
+
+        assert response.status_code == 200
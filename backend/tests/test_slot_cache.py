@@ -0,0 +1,94 @@
+"""Tests for the slot-result cache behind /api/v1/flyability/slots."""
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from backend import slot_cache
+from backend.schemas import WeatherForecast
+
+FORECAST = WeatherForecast(
+    wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=3000.0,
+    visibility_m=10000.0, precipitation_rate_mm_hr=0.0,
+)
+
+BODY = {
+    "site_id": "EGPF",
+    "start": "2026-06-15T09:00:00",
+    "end": "2026-06-15T12:00:00",
+    "pilot": {"total_hours": 100, "hours_on_type": 20},
+    "aircraft": {"max_demonstrated_crosswind_kt": 15, "min_runway_length_m": 300},
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_slot_cache():
+    slot_cache._slot_results.clear()
+    slot_cache._slot_results.hits = slot_cache._slot_results.misses = 0
+    yield
+    slot_cache._slot_results.clear()
+
+
+@pytest.fixture
+def forecasts():
+    with patch("backend.main.get_forecasts",
+               side_effect=lambda site_id, intervals: [FORECAST for _ in intervals]) as mock_get:
+        yield mock_get
+
+
+def _post(body=BODY, version="v1"):
+    from backend.main import app
+    with patch("backend.main.get_weather_version", return_value=version):
+        return TestClient(app).post("/api/v1/flyability/slots", json=body)
+
+
+def test_identical_queries_share_one_computation(forecasts):
+    first = _post().json()
+    second = _post().json()
+
+    assert first == second
+    forecasts.assert_called_once()
+    assert slot_cache.slot_cache_stats()["hits"] == 1
+
+
+def test_new_weather_version_misses(forecasts):
+    _post(version="v1")
+    _post(version="v2")
+    assert forecasts.call_count == 2
+
+
+def test_different_envelope_misses(forecasts):
+    _post()
+    _post({**BODY, "pilot": {"total_hours": 10, "hours_on_type": 1, "max_wind_kt": 10}})
+    assert forecasts.call_count == 2
+
+
+def test_mock_weather_is_not_cached(forecasts):
+    _post(version=None)
+    _post(version=None)
+    assert forecasts.call_count == 2
+    assert len(slot_cache._slot_results) == 0
+
+
+@patch("backend.integrations.weather.get_db")
+def test_publishing_new_weather_drops_site_results(mock_get_db_func, forecasts):
+    from backend.integrations import weather
+    mock_get_db_func.return_value = MagicMock()
+    weather._written_hashes.pop("EGPF", None)
+    _post()
+    _post({**BODY, "site_id": "EGPH"})
+    assert len(slot_cache._slot_results) == 2
+
+    weather._write_forecasts({"EGPF": weather.SiteWeather(FORECAST)})
+
+    assert len(slot_cache._slot_results) == 1
+    weather._written_hashes.pop("EGPF", None)
+    weather._forecast_cache.clear()
+
+
+def test_stats_endpoint_reports_counters(forecasts):
+    from backend.main import app
+    _post()
+    _post()
+    stats = TestClient(app).get("/api/v1/flyability/cache/stats").json()
+    assert stats["slot_results"]["hits"] == 1
+    assert stats["slot_results"]["misses"] == 1
+    assert "site_weather" in stats
@@ -0,0 +1,102 @@
+"""Tests for the local station catalogue and its spatial index."""
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+
+from backend.integrations import stations
+from backend.integrations.stations import StationCatalogue, load_catalogue, save_catalogue
+
+STATIONS = [
+    {"icaoId": "EGPF", "site": "Glasgow", "lat": 55.8719, "lon": -4.4331, "siteType": ["METAR", "TAF"]},
+    {"icaoId": "EGPH", "site": "Edinburgh", "lat": 55.9500, "lon": -3.3725, "siteType": ["METAR", "TAF"]},
+    {"icaoId": "EGPK", "site": "Prestwick", "lat": 55.5094, "lon": -4.5867, "siteType": ["METAR", "TAF"]},
+    {"icaoId": "EGNS", "site": "Isle of Man", "lat": 54.0833, "lon": -4.6239, "siteType": ["METAR", "TAF"]},
+    {"icaoId": "EGLL", "site": "Heathrow", "lat": 51.4775, "lon": -0.4614, "siteType": ["METAR", "TAF"]},
+    # Closer to Strathaven than Glasgow, but doesn't report METARs
+    {"icaoId": "EGXX", "site": "Private strip", "lat": 55.68, "lon": -3.90, "siteType": []},
+]
+
+STRATHAVEN = (55.6786, -3.8611)
+
+
+@pytest.fixture
+def catalogue():
+    return StationCatalogue(STATIONS)
+
+
+def test_nearest_reporting_station(catalogue):
+    assert [s["icaoId"] for s in catalogue.nearest(*STRATHAVEN, k=1)] == ["EGPF"]
+
+
+def test_nearest_without_site_type_filter(catalogue):
+    assert catalogue.nearest(*STRATHAVEN, k=1, site_type=None)[0]["icaoId"] == "EGXX"
+
+
+def test_k_nearest_is_sorted_by_distance(catalogue):
+    ids = [s["icaoId"] for s in catalogue.nearest(*STRATHAVEN, k=4)]
+    assert ids == ["EGPF", "EGPH", "EGPK", "EGNS"]
+
+
+def test_nearest_searches_beyond_empty_cells(catalogue):
+    """A query far from any station still finds one by widening the search."""
+    assert catalogue.nearest(60.0, -10.0, k=1)[0]["icaoId"] == "EGPF"
+
+
+def test_bbox_query(catalogue):
+    ids = {s["icaoId"] for s in catalogue.bbox(55.0, -5.0, 56.5, -3.0)}
+    assert ids == {"EGPF", "EGPH", "EGPK", "EGXX"}
+
+
+def test_lookup_by_ids(catalogue):
+    assert [s["site"] for s in catalogue.lookup(["egll", "ZZZZ"])] == ["Heathrow"]
+
+
+def test_catalogue_persists_to_disk(tmp_path):
+    path = str(tmp_path / "nested" / "stations.json.gz")
+    save_catalogue(STATIONS, path)
+    assert len(load_catalogue(path)) == len(STATIONS)
+
+
+def test_station_info_served_from_catalogue(catalogue):
+    """With the catalogue loaded, /airport/info never goes upstream."""
+    with patch("backend.main.get_station_catalogue", return_value=catalogue), \
+         patch("backend.main.get_http_client") as mock_client:
+        from backend.main import app
+        client = TestClient(app)
+        by_id = client.get("/api/v1/airport/info", params={"ids": "EGPF,EGPH"})
+        by_box = client.get("/api/v1/airport/info", params={"bbox": "51,-1,52,0"})
+
+    assert [s["icaoId"] for s in by_id.json()] == ["EGPF", "EGPH"]
+    assert [s["icaoId"] for s in by_box.json()] == ["EGLL"]
+    mock_client.assert_not_called()
+
+
+def test_updater_assigns_nearest_icao_from_club_location(catalogue):
+    from backend.integrations import weather
+
+    club = MagicMock()
+    club.to_dict.return_value = {"lat": STRATHAVEN[0], "lng": STRATHAVEN[1]}
+    hand_picked = MagicMock()
+    hand_picked.to_dict.return_value = {"nearest_icao": "EGPH", "lat": 55.95, "lng": -3.37}
+    mock_db = MagicMock()
+    mock_db.collection.return_value.stream.return_value = [club, hand_picked]
+
+    with patch("backend.integrations.weather.get_db", return_value=mock_db), \
+         patch.object(stations, "_catalogue", catalogue):
+        assert weather._collect_update_sites() == {"EGPF", "EGPH"}
+
+
+def test_station_info_falls_back_upstream_for_unknown_ids(catalogue):
+    """Ids missing from the catalogue are still proxied upstream."""
+    from unittest.mock import AsyncMock
+    upstream = MagicMock()
+    upstream.json.return_value = [{"icaoId": "KJFK", "site": "New York"}]
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=upstream)
+    with patch("backend.main.get_station_catalogue", return_value=catalogue), \
+         patch("backend.main.get_http_client", return_value=mock_client):
+        from backend.main import app
+        response = TestClient(app).get("/api/v1/airport/info", params={"ids": "EGPF,KJFK"})
+
+    assert [s["icaoId"] for s in response.json()] == ["EGPF", "KJFK"]
+    assert mock_client.get.call_args.kwargs["params"] == {"format": "json", "ids": "KJFK"}
@@ -0,0 +1,120 @@
+"""Tests for the shared upstream HTTP client and the weather proxies that use it."""
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from backend.integrations import upstream
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    upstream._response_cache.clear()
+    yield
+    upstream._response_cache.clear()
+
+
+def test_client_is_shared_until_closed():
+    async def run():
+        first = upstream.get_http_client()
+        second = upstream.get_http_client()
+        await upstream.close_http_client()
+        third = upstream.get_http_client()
+        await upstream.close_http_client()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first is second
+    assert first.is_closed
+    assert third is not first
+
+
+def test_metar_proxy_uses_shared_client():
+    """Proxied calls go through the pooled client rather than a new one each time."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json=[{"icaoId": "EGPF"}])
+
+    pooled = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("backend.main.get_http_client", return_value=pooled) as mock_get_client:
+        from backend.main import app
+        client = TestClient(app)
+        for ids in ("EGPF", "EGPH"):
+            resp = client.get("/api/v1/weather/metar", params={"ids": ids})
+            assert resp.status_code == 200
+            assert resp.json() == [{"icaoId": "EGPF"}]
+
+    assert calls == ["/api/data/metar", "/api/data/metar"]
+    assert mock_get_client.call_count == 2
+    assert not pooled.is_closed
+
+
+def test_upstream_error_status_is_forwarded():
+    pooled = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404, text="nope")))
+    with patch("backend.main.get_http_client", return_value=pooled):
+        from backend.main import app
+        resp = TestClient(app).get("/api/v1/weather/taf", params={"ids": "XXXX"})
+
+    assert resp.status_code == 404
+    assert "Upstream API error" in resp.json()["detail"]
+
+
+def test_equivalent_metar_queries_share_cached_response():
+    """Differently-ordered/cased station lists are the same query upstream."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.params["ids"])
+        return httpx.Response(200, json=[{"icaoId": "EGPF"}, {"icaoId": "EGPH"}])
+
+    pooled = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch("backend.main.get_http_client", return_value=pooled):
+        from backend.main import app
+        client = TestClient(app)
+        first = client.get("/api/v1/weather/metar", params={"ids": "EGPH,egpf"})
+        second = client.get("/api/v1/weather/metar", params={"ids": "EGPF, EGPH"})
+
+    assert first.json() == second.json()
+    assert calls == ["EGPF,EGPH"]
+
+
+def test_concurrent_misses_are_coalesced():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params["ids"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"icaoId": "EGPF"}])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            params = {"ids": "EGPF", "format": "json"}
+            return await asyncio.gather(*(upstream.cached_get(client, "metar", params) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == [{"icaoId": "EGPF"}] for r in results)
+    assert upstream._inflight == {}
+
+
+def test_errors_are_not_cached():
+    statuses = iter([503, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses), json=[])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            params = {"ids": "EGPF", "format": "json"}
+            with pytest.raises(httpx.HTTPStatusError):
+                await upstream.cached_get(client, "metar", params)
+            return await upstream.cached_get(client, "metar", params)
+
+    assert asyncio.run(run()) == []
+
+
+def test_normalize_ids():
+    assert upstream.normalize_ids(" egph,EGPF EGPF ") == "EGPF,EGPH"
@@ -0,0 +1,165 @@
+"""Tests for the denormalized legal_until / recency_totals on user documents."""
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from backend.legality import derived_legality, legal_on, legal_on_from_profile
+
+
+@pytest.fixture(autouse=True)
+def mock_firebase_admin():
+    with patch("backend.auth.firebase_admin") as mock_admin:
+        mock_admin.exceptions = MagicMock()
+        mock_admin.exceptions.FirebaseError = Exception
+        import backend.auth
+        backend.auth._app = None
+        yield mock_admin
+
+
+@pytest.fixture
+def mock_verify_id_token():
+    with patch("backend.auth.firebase_auth.verify_id_token") as mock_verify:
+        mock_verify.return_value = {"uid": "pilot_1", "email": "pilot@test.com"}
+        yield mock_verify
+
+
+def _profile(**extra):
+    return {
+        "licence_type": "NPPL(A)",
+        "total_hours": 50,
+        "supervised_solo_hours": 15,
+        "ratings": ["Microlight"],
+        "logbook": [{"date": "2025-01-10", "hours_pic": 10, "instruction": 1, "to_landings": 10}],
+        **extra,
+    }
+
+
+def _user_db(profile):
+    db = MagicMock()
+    snapshot = MagicMock(exists=True)
+    snapshot.to_dict.return_value = profile
+    doc_ref = db.collection.return_value.document.return_value
+    doc_ref.get.return_value = snapshot
+    return db, db.transaction.return_value
+
+
+def _written(transaction):
+    (_, data), kwargs = transaction.set.call_args
+    assert kwargs == {"merge": True}
+    return data
+
+
+class TestDerivedLegality:
+    def test_not_yet_current(self):
+        derived = derived_legality(_profile(), as_of=date(2026, 6, 1))
+        assert derived["legal_until"] is None
+        assert derived["recency_totals"] == {
+            "as_of": "2026-06-01", "hours_pic": 10.0, "instruction": 1.0, "to_landings": 10,
+        }
+
+    def test_legal_until_is_day_before_lapse(self):
+        profile = _profile()
+        profile["logbook"].append({"date": "2026-02-01", "hours_pic": 3, "instruction": 0, "to_landings": 3})
+        derived = derived_legality(profile, as_of=date(2026, 6, 1))
+        # The 2025-01-10 entry is last inside the 730-day window on 2027-01-10
+        assert derived["legal_until"] == "2027-01-10"
+
+    def test_licence_expiry_caps_legal_until(self):
+        profile = _profile(license_expiry="2026-09-30")
+        profile["logbook"].append({"date": "2026-02-01", "hours_pic": 3, "instruction": 0, "to_landings": 3})
+        assert derived_legality(profile, as_of=date(2026, 6, 1))["legal_until"] == "2026-09-30"
+
+    def test_gate_reads_single_field(self):
+        profile = _profile(legal_until="2027-01-10", legal_until_computed=True)
+        assert legal_on_from_profile(profile, date(2027, 1, 10)) is True
+        assert legal_on_from_profile(profile, date(2027, 1, 11)) is False
+        assert legal_on_from_profile({}, date(2027, 1, 1)) is None
+
+    def test_no_licence_data_is_not_computed(self):
+        derived = derived_legality({"role": "pilot", "medical_expiry": "2027-06-01"}, as_of=date(2026, 6, 1))
+        assert derived["legal_until"] is None
+        assert derived["legal_until_computed"] is False
+        assert legal_on({"role": "pilot", **derived}, date(2026, 6, 2)) is None
+
+    def test_falls_back_to_full_calculation(self):
+        # No stored fields: judged from the logbook (10h in 24 months is not enough)
+        assert legal_on(_profile(), date(2026, 6, 1)) is False
+        assert legal_on({"role": "pilot"}, date(2026, 6, 1)) is None
+
+
+def _recent_profile(**extra):
+    """10h flown 300 days ago; legal once 2 more hours are logged, until that entry ages out."""
+    first = datetime.utcnow().date() - timedelta(days=300)
+    profile = _profile(**extra)
+    profile["logbook"] = [{"date": first.isoformat(), "hours_pic": 10, "instruction": 1, "to_landings": 10}]
+    return profile, first + timedelta(days=730)
+
+
+class TestLogbookAppend:
+    def test_append_updates_legal_until(self, mock_verify_id_token):
+        from backend.main import app
+        profile, expected_until = _recent_profile()
+        db, transaction = _user_db(profile)
+        entry_date = (datetime.utcnow() - timedelta(days=10)).date().isoformat()
+
+        with patch("backend.users.get_db", return_value=db), patch("backend.logger.log_event"):
+            resp = TestClient(app).post(
+                "/api/v1/users/me/logbook",
+                json={"date": entry_date, "hours_pic": 3, "instruction": 0, "to_landings": 3},
+                headers={"Authorization": "Bearer tok"},
+            )
+
+        assert resp.status_code == 200
+        written = _written(transaction)
+        assert len(written["logbook"]) == 2
+        assert written["logbook"][-1]["date"] == entry_date
+        assert written["legal_until"] == expected_until.isoformat()
+        assert resp.json()["legal_until"] == expected_until.isoformat()
+
+    def test_medical_update_rederives(self, mock_verify_id_token):
+        from backend.main import app
+        profile, _ = _recent_profile()
+        profile["logbook"].append({"date": (datetime.utcnow() - timedelta(days=10)).date().isoformat(),
+                                   "hours_pic": 3, "instruction": 0, "to_landings": 3})
+        db, transaction = _user_db(profile)
+        medical = (datetime.utcnow() + timedelta(days=30)).date()
+
+        with patch("backend.users.get_db", return_value=db), patch("backend.logger.log_event"):
+            resp = TestClient(app).put(
+                "/api/v1/users/me/profile",
+                json={"medical_expiry": medical.isoformat()},
+                headers={"Authorization": "Bearer tok"},
+            )
+
+        assert resp.status_code == 200
+        written = _written(transaction)
+        assert written["medical_expiry"] == medical.isoformat()
+        assert written["legal_until"] == medical.isoformat()
+
+    def test_weight_update_skips_rederive(self, mock_verify_id_token):
+        from backend.main import app
+        db, transaction = _user_db(_profile())
+
+        with patch("backend.users.get_db", return_value=db), patch("backend.logger.log_event"):
+            resp = TestClient(app).put(
+                "/api/v1/users/me/profile", json={"weight_kg": 80},
+                headers={"Authorization": "Bearer tok"},
+            )
+
+        assert resp.status_code == 200
+        transaction.set.assert_not_called()
+        db.collection.return_value.document.return_value.set.assert_called_once_with({"weight_kg": 80}, merge=True)
+
+
+class TestCurrentUser:
+    def test_recency_totals_recomputed_on_read(self, mock_verify_id_token):
+        from backend.main import app
+        profile, _ = _recent_profile(legal_until=None, recency_totals={"as_of": "2020-01-01", "hours_pic": 99})
+
+        with patch("backend.users.get_user_profile", return_value=profile):
+            resp = TestClient(app).get("/api/v1/users/me", headers={"Authorization": "Bearer tok"})
+
+        assert resp.status_code == 200
+        totals = resp.json()["recency_totals"]
+        assert totals["as_of"] == datetime.utcnow().date().isoformat()
+        assert totals["hours_pic"] == 10.0
@@ -1,13 +1,14 @@
+import asyncio
 import pytest
 from datetime import datetime
 from unittest.mock import MagicMock, patch
-from backend.integrations.weather import get_forecast
+from backend.integrations.weather import get_forecast, get_forecasts
 from backend.schemas import WeatherForecast
 
 def test_get_mock_forecast_safe():
     """Test that safe site returns good weather."""
     t0 = datetime.now()
-    forecast = get_forecast("SAFE_SITE", t0, t0, mock=True)
+    forecast = asyncio.run(get_forecast("SAFE_SITE", t0, t0, mock=True))
     assert isinstance(forecast, WeatherForecast)
     assert forecast.wind_speed_kt == 5.0
     assert forecast.cloud_base_ft == 4000.0
@@ -15,19 +16,20 @@ def test_get_mock_forecast_safe():
 def test_get_mock_forecast_windy():
     """Test that windy site returns high wind."""
     t0 = datetime.now()
-    forecast = get_forecast("WINDY_SITE", t0, t0, mock=True)
+    forecast = asyncio.run(get_forecast("WINDY_SITE", t0, t0, mock=True))
     assert forecast.wind_speed_kt == 25.0
     assert forecast.gust_speed_kt == 35.0
 
 def test_get_mock_forecast_ifr():
     """Test that IFR site returns low visibility/cloud."""
     t0 = datetime.now()
-    forecast = get_forecast("IFR_SITE", t0, t0, mock=True)
+    forecast = asyncio.run(get_forecast("IFR_SITE", t0, t0, mock=True))
     assert forecast.cloud_base_ft < 1000
     assert forecast.visibility_m == 4000.0
 
+@patch("backend.integrations.weather.get_http_client")
 @patch("backend.integrations.weather.get_db")
-def test_real_forecast_fallback_on_bad_icao(mock_get_db_func):
+def test_real_forecast_fallback_on_bad_icao(mock_get_db_func, mock_get_client):
     """When real weather fetch fails (bad ICAO), should return safe defaults, not crash."""
     t0 = datetime.now()
     
@@ -39,7 +41,11 @@ def test_real_forecast_fallback_on_bad_icao(mock_get_db_func):
     mock_get_db_func.return_value = mock_db
 
     # "XXXX" is not a valid ICAO — AviationWeather.gov will error or return empty
-    forecast = get_forecast("XXXX", t0, t0, mock=False)
+    import httpx
+    mock_get_client.return_value = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+    )
+    forecast = asyncio.run(get_forecast("XXXX", t0, t0, mock=False))
     
     assert isinstance(forecast, WeatherForecast)
     # Should return cautious defaults (the _get_fallback_forecast or default values)
@@ -47,3 +53,274 @@ def test_real_forecast_fallback_on_bad_icao(mock_get_db_func):
     assert forecast.cloud_base_ft > 0
     assert forecast.visibility_m > 0
 
+
+@patch("backend.integrations.weather.get_db")
+def test_repeat_reads_hit_memory_cache(mock_get_db_func):
+    """A second lookup for the same site must not touch Firestore again."""
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+    t0 = datetime.now()
+
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = {"forecast": {
+        "wind_speed_kt": 7.0, "gust_speed_kt": 12.0, "cloud_base_ft": 3500.0,
+        "visibility_m": 9999.0, "precipitation_rate_mm_hr": 0.0,
+    }}
+    mock_db = MagicMock()
+    mock_db.collection.return_value.document.return_value.get.return_value = mock_doc
+    mock_get_db_func.return_value = mock_db
+
+    first = asyncio.run(get_forecast("EGPF", t0, t0, mock=False))
+    second = asyncio.run(get_forecast("EGPF", t0, t0, mock=False))
+
+    assert first == second
+    assert mock_db.collection.return_value.document.return_value.get.call_count == 1
+
+@patch("backend.integrations.weather.get_db")
+def test_updater_write_refreshes_memory_cache(mock_get_db_func):
+    """Writing a fresh forecast replaces whatever this instance had cached."""
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+    mock_get_db_func.return_value = MagicMock()
+
+    stale = WeatherForecast(wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+                            visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+    fresh = WeatherForecast(wind_speed_kt=22.0, gust_speed_kt=30.0, cloud_base_ft=1200.0,
+                            visibility_m=6000.0, precipitation_rate_mm_hr=1.0)
+    weather._forecast_cache.set("EGPF", stale)
+    weather._written_hashes.clear()
+    weather._write_forecasts({"EGPF": weather.SiteWeather(fresh)})
+    weather._written_hashes.clear()
+
+    t0 = datetime.now()
+    assert asyncio.run(get_forecast("EGPF", t0, t0, mock=False)) == fresh
+
+@patch("backend.integrations.weather.get_db")
+def test_get_forecasts_reads_firestore_once(mock_get_db_func):
+    """Resolving many intervals should cost one Firestore read, not one per slot."""
+    from datetime import timedelta
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = {"forecast": {
+        "wind_speed_kt": 7.0, "gust_speed_kt": 12.0, "cloud_base_ft": 3500.0,
+        "visibility_m": 9999.0, "precipitation_rate_mm_hr": 0.0,
+    }}
+    mock_db = MagicMock()
+    mock_db.collection.return_value.document.return_value.get.return_value = mock_doc
+    mock_get_db_func.return_value = mock_db
+
+    t0 = datetime(2026, 6, 15, 0, 0)
+    intervals = [(t0 + timedelta(hours=h), t0 + timedelta(hours=h + 1)) for h in range(168)]
+    forecasts = asyncio.run(get_forecasts("EGPF", intervals, mock=False))
+
+    assert len(forecasts) == 168
+    assert all(f.wind_speed_kt == 7.0 for f in forecasts)
+    assert mock_db.collection.return_value.document.return_value.get.call_count == 1
+
+def test_get_forecasts_mock_matches_single_lookup():
+    t0 = datetime.now()
+    assert asyncio.run(get_forecasts("WINDY_SITE", [(t0, t0), (t0, t0)], mock=True)) == [
+        asyncio.run(get_forecast("WINDY_SITE", t0, t0, mock=True))
+    ] * 2
+
+def test_updater_fetches_many_stations_per_request():
+    """120 stations should take three comma-joined upstream calls, not 120."""
+    import asyncio
+    import httpx
+    from backend.integrations import weather
+
+    seen_ids = []
+
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        seen_ids.append(ids)
+        return httpx.Response(200, json=[
+            {"icaoId": icao, "wspd": 12, "wgst": 18, "visib": "10+", "clouds": []}
+            for icao in ids
+        ])
+
+    sites = {f"EG{i:02d}" for i in range(120)}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await weather._fetch_aviation_weather_many(client, sites)
+
+    forecasts = asyncio.run(run())
+
+    assert len(seen_ids) == 3
+    assert max(len(ids) for ids in seen_ids) == weather.UPDATER_BATCH_SIZE
+    assert set(forecasts) == sites
+    assert all(f.wind_speed_kt == 12.0 for f in forecasts.values())
+
+def test_updater_skips_failed_batch():
+    """A failed upstream batch must not overwrite the cache with defaults."""
+    import asyncio
+    import httpx
+    from backend.integrations import weather
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await weather._fetch_aviation_weather_many(client, {"EGPF", "EGPH"})
+
+    assert asyncio.run(run()) == {}
+
+@patch("backend.integrations.weather.get_db")
+def test_updater_writes_in_one_batch_commit(mock_get_db_func):
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+    weather._written_hashes.clear()
+    mock_db = MagicMock()
+    mock_get_db_func.return_value = mock_db
+
+    forecast = WeatherForecast(wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+                               visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+    weather._write_forecasts({f"EG{i:02d}": weather.SiteWeather(forecast) for i in range(20)})
+
+    assert mock_db.batch.return_value.commit.call_count == 1
+    assert mock_db.batch.return_value.set.call_count == 20
+    assert weather._forecast_cache.get("EG07").snapshot == forecast
+
+@patch("backend.integrations.weather.get_db")
+def test_unchanged_weather_is_not_rewritten(mock_get_db_func):
+    """A second cycle with identical parsed weather should skip every write."""
+    from backend.integrations import weather
+    weather._written_hashes.clear()
+    mock_db = MagicMock()
+    mock_get_db_func.return_value = mock_db
+    batch = mock_db.batch.return_value
+
+    calm = WeatherForecast(wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+                           visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+    windy = calm.model_copy(update={"wind_speed_kt": 25.0})
+    sites = {"EGPF": weather.SiteWeather(calm), "EGPH": weather.SiteWeather(calm)}
+
+    assert weather._write_forecasts(sites) == {"written": 2, "touched": 0, "skipped": 0}
+    assert weather._write_forecasts(sites) == {"written": 0, "touched": 0, "skipped": 2}
+    assert batch.set.call_count == 2
+
+    sites["EGPH"] = weather.SiteWeather(windy)
+    assert weather._write_forecasts(sites) == {"written": 1, "touched": 0, "skipped": 1}
+    assert batch.set.call_count == 3
+    assert batch.set.call_args.args[1]["forecast"]["wind_speed_kt"] == 25.0
+    weather._written_hashes.clear()
+
+@patch("backend.integrations.weather.get_db")
+def test_cold_start_adopts_stored_hashes(mock_get_db_func):
+    """A fresh instance compares against the stored content_hash instead of rewriting."""
+    from datetime import timezone
+    from backend.integrations import weather
+    weather._written_hashes.clear()
+    mock_db = MagicMock()
+    mock_get_db_func.return_value = mock_db
+
+    calm = WeatherForecast(wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+                           visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+    sites = {"EGPF": weather.SiteWeather(calm), "EGPH": weather.SiteWeather(calm.model_copy(update={"wind_speed_kt": 9.0}))}
+    stored = MagicMock(id="EGPF", exists=True)
+    stored.to_dict.return_value = {"content_hash": sites["EGPF"].content_hash(),
+                                   "updated_at": datetime.now(timezone.utc)}
+    missing = MagicMock(id="EGPH", exists=False)
+    mock_db.get_all.return_value = [stored, missing]
+
+    assert weather._write_forecasts(sites) == {"written": 1, "touched": 0, "skipped": 1}
+    assert mock_db.get_all.call_args.kwargs["field_paths"] == ["content_hash", "updated_at"]
+    # Seeded once; later cycles don't re-read
+    weather._write_forecasts(sites)
+    assert mock_db.get_all.call_count == 1
+    weather._written_hashes.clear()
+
+@patch("backend.integrations.weather.get_db")
+def test_unchanged_weather_gets_heartbeat_touch(mock_get_db_func):
+    """Past WRITE_HEARTBEAT, unchanged docs get an updated_at-only update."""
+    from backend.integrations import weather
+    weather._written_hashes.clear()
+    mock_db = MagicMock()
+    mock_get_db_func.return_value = mock_db
+    batch = mock_db.batch.return_value
+
+    site = weather.SiteWeather(WeatherForecast(
+        wind_speed_kt=5.0, gust_speed_kt=8.0, cloud_base_ft=4000.0,
+        visibility_m=9999.0, precipitation_rate_mm_hr=0.0))
+    with patch("backend.integrations.weather.time.monotonic", return_value=1000.0):
+        weather._write_forecasts({"EGPF": site})
+    with patch("backend.integrations.weather.time.monotonic", return_value=1000.0 + weather.WRITE_HEARTBEAT):
+        assert weather._write_forecasts({"EGPF": site}) == {"written": 0, "touched": 1, "skipped": 0}
+
+    touched = batch.update.call_args.args[1]
+    assert set(touched) == {"updated_at", "expires_at"}
+    weather._written_hashes.clear()
+
+def _cache_doc(updated_at, wind=7.0):
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = {"updated_at": updated_at, "forecast": {
+        "wind_speed_kt": wind, "gust_speed_kt": 12.0, "cloud_base_ft": 3500.0,
+        "visibility_m": 9999.0, "precipitation_rate_mm_hr": 0.0,
+    }}
+    return mock_doc
+
+@patch("backend.integrations.weather.get_db")
+def test_stale_cache_served_while_refreshing(mock_get_db_func):
+    """Stale data comes back immediately; the refresh runs in the background."""
+    from datetime import timezone, timedelta
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+    weather._written_hashes.clear()
+
+    old = datetime.now(timezone.utc) - timedelta(seconds=weather.STALE_AFTER + 60)
+    mock_db = MagicMock()
+    mock_db.collection.return_value.document.return_value.get.return_value = _cache_doc(old, wind=7.0)
+    mock_get_db_func.return_value = mock_db
+
+    fresh = WeatherForecast(wind_speed_kt=15.0, gust_speed_kt=20.0, cloud_base_ft=3000.0,
+                            visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+
+    async def slow_fetch(site_id):
+        await asyncio.sleep(0.05)
+        return weather.SiteWeather(fresh)
+
+    async def run():
+        with patch("backend.integrations.weather._fetch_and_store_site", side_effect=slow_fetch) as mock_fetch:
+            served = await get_forecast("EGPF", datetime.now(), datetime.now(), mock=False)
+            pending = weather._refreshes.get("EGPF")
+            assert pending is not None and not pending.done()
+            await pending
+            return served, mock_fetch.call_count
+
+    served, fetches = asyncio.run(run())
+    assert served.wind_speed_kt == 7.0
+    assert fetches == 1
+    weather._forecast_cache.clear()
+
+@patch("backend.integrations.weather.get_db")
+def test_concurrent_hard_misses_share_one_refresh(mock_get_db_func):
+    from backend.integrations import weather
+    weather._forecast_cache.clear()
+    mock_doc = MagicMock()
+    mock_doc.exists = False
+    mock_db = MagicMock()
+    mock_db.collection.return_value.document.return_value.get.return_value = mock_doc
+    mock_get_db_func.return_value = mock_db
+
+    fresh = WeatherForecast(wind_speed_kt=15.0, gust_speed_kt=20.0, cloud_base_ft=3000.0,
+                            visibility_m=9999.0, precipitation_rate_mm_hr=0.0)
+
+    async def slow_fetch(site_id):
+        await asyncio.sleep(0.05)
+        return weather.SiteWeather(fresh)
+
+    async def run():
+        with patch("backend.integrations.weather._fetch_and_store_site", side_effect=slow_fetch) as mock_fetch:
+            t0 = datetime.now()
+            results = await asyncio.gather(*(get_forecast("EGPF", t0, t0, mock=False) for _ in range(5)))
+            return results, mock_fetch.call_count
+
+    results, fetches = asyncio.run(run())
+    assert fetches == 1
+    assert all(r == fresh for r in results)
+    assert weather._refreshes == {}
@@ -1,14 +1,28 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from google.cloud.firestore import transactional
 from backend.auth import verify_token, get_user_profile
 from backend.db import get_db
-from backend.schemas import UserProfileUpdate
+from backend.legality import derived_legality, recency_totals_on
+from backend.schemas import UserProfileUpdate, LogbookEntry
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
+# Profile fields that change the derived legal_until / recency_totals
+LEGALITY_FIELDS = ("medical_expiry", "license_expiry")
+
 @router.get("/me")
 async def get_current_user_profile(user: dict = Depends(verify_token)):
-    """Return the authenticated user's profile (role, club_slugs)."""
+    """Return the authenticated user's profile (role, club_slugs).
+
+    legal_until is stored and stays valid until the next logbook or expiry
+    write. recency_totals slide with the calendar, so they are recomputed
+    for today from the logbook rather than returned as of that last write.
+    """
     profile = get_user_profile(user["uid"])
+    recency_totals = profile.get("recency_totals")
+    if profile.get("logbook"):
+        recency_totals = recency_totals_on(profile, datetime.utcnow().date())
     return {
         "uid": user["uid"],
         "email": user.get("email"),
@@ -17,24 +31,64 @@ async def get_current_user_profile(user: dict = Depends(verify_token)):
         "weight_kg": profile.get("weight_kg"),
         "medical_expiry": profile.get("medical_expiry"),
         "license_expiry": profile.get("license_expiry"),
+        "legal_until": profile.get("legal_until"),
+        "recency_totals": recency_totals,
     }
 
 @router.put("/me/profile")
 async def update_user_profile(update_data: UserProfileUpdate, user: dict = Depends(verify_token)):
     """Update the authenticated user's profile fields."""
     db = get_db()
-    
+
     # Filter out None values to avoid overwriting with nulls
     data_to_update = {k: v for k, v in update_data.model_dump().items() if v is not None}
-    
+
     if not data_to_update:
         return {"status": "no_change", "message": "No fields provided to update"}
 
     # Update Firestore
     doc_ref = db.collection("users").document(user["uid"])
-    doc_ref.set(data_to_update, merge=True)
-    
+    if any(field in data_to_update for field in LEGALITY_FIELDS):
+        # Expiry dates move legal_until: write them together with the re-derived fields
+        _update_with_legality(db, doc_ref, lambda profile: data_to_update)
+    else:
+        doc_ref.set(data_to_update, merge=True)
+
     from backend.logger import log_event
     log_event("profile_updated", {"uid": user["uid"], "fields": list(data_to_update.keys())})
 
     return {"status": "success", "updated": data_to_update}
+
+@router.post("/me/logbook")
+async def append_logbook_entry(entry: LogbookEntry, user: dict = Depends(verify_token)):
+    """Append a logbook entry and refresh the stored legal_until / recency_totals."""
+    db = get_db()
+    doc_ref = db.collection("users").document(user["uid"])
+    new_entry = entry.model_dump()
+
+    derived = _update_with_legality(
+        db, doc_ref, lambda profile: {"logbook": list(profile.get("logbook") or []) + [new_entry]}
+    )
+
+    from backend.logger import log_event
+    log_event("logbook_appended", {"uid": user["uid"], "date": entry.date})
+
+    return {"status": "success", "entry": new_entry, **derived}
+
+
+def _update_with_legality(db, doc_ref, changes_for) -> dict:
+    """Apply changes_for(profile) and the re-derived legality fields in one transaction."""
+
+    @transactional
+    def _txn(transaction):
+        snapshot = doc_ref.get(transaction=transaction)
+        profile = snapshot.to_dict() if snapshot.exists else {}
+        changes = changes_for(profile)
+        try:
+            derived = derived_legality({**profile, **changes})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date. Use ISO format: YYYY-MM-DD")
+        transaction.set(doc_ref, {**changes, **derived}, merge=True)
+        return derived
+
+    return _txn(db.transaction())
@@ -40,7 +40,7 @@ async function fetchWithAuth(path, options = {}) {
 // Booking routes now live at /api/v1/bookings (consistent with other endpoints)
 const bookingsBaseUrl = `${config.apiBaseUrl}/bookings`;
 
-async function fetchBookings(path, options = {}) {
+async function requestBookings(path, options = {}) {
     const url = `${bookingsBaseUrl}${path}`;
     const headers = { 'Content-Type': 'application/json', ...options.headers };
 
@@ -68,6 +68,11 @@ async function fetchBookings(path, options = {}) {
         }
         throw new Error(errorMessage);
     }
+    return response;
+}
+
+async function fetchBookings(path, options = {}) {
+    const response = await requestBookings(path, options);
     return response.json();
 }
 
@@ -102,10 +107,24 @@ const MOCK_BRIEFING = {
 
 export const apiClient = {
     /**
-     * Get bookings for a club from Firestore (via backend)
+     * Get bookings for a club from Firestore (via backend).
+     * Defaults to the next month; pass { start, end } (ISO strings) for another window.
+     * Follows the X-Next-Cursor header until every page has been fetched.
      */
-    getBookings: async (clubSlug = 'strathaven') => {
-        return fetchBookings(`/${clubSlug}`);
+    getBookings: async (clubSlug = 'strathaven', { start, end } = {}) => {
+        const bookings = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams();
+            if (start) params.set('start', start);
+            if (end) params.set('end', end);
+            if (cursor) params.set('cursor', cursor);
+            const query = params.toString();
+            const response = await requestBookings(`/${clubSlug}${query ? `?${query}` : ''}`);
+            bookings.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
+        return bookings;
     },
 
     /**
@@ -118,6 +137,17 @@ export const apiClient = {
         });
     },
 
+    /**
+     * Create a recurring series or bulk block of bookings (instructors/admins).
+     * Returns { series_id, created, conflicts } — conflicting slots are skipped, not fatal.
+     */
+    createBookingSeries: async (series) => {
+        return fetchBookings('/series', {
+            method: 'POST',
+            body: JSON.stringify(series),
+        });
+    },
+
     /**
      * Cancel a booking
      */
@@ -251,4 +281,17 @@ export const apiClient = {
             }),
         });
     },
+
+    // Fleet flyability for the whole day grid in one call. status/score are one row
+    // of slots shared by every aircraft in `aircraft` (aircraft limits aren't modelled yet)
+    getFlyabilityMatrix: async (slug, start, end, pilot, durationMinutes = 60) => {
+        return fetchWithAuth(`/clubs/${slug}/flyability/matrix`, {
+            method: 'POST',
+            body: JSON.stringify({
+                start, end,
+                slot_duration_minutes: durationMinutes,
+                pilot,
+            }),
+        });
+    },
 };